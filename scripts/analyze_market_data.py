@@ -1,6 +1,8 @@
 import json
 import os
 
+from report_engine import render_market_analysis
+
 def analyze_market_data(input_file, output_file):
     """
     Lê dados de mercado de um arquivo JSON, processa e gera um resumo analítico em Markdown.
@@ -18,52 +20,7 @@ def analyze_market_data(input_file, output_file):
         return
 
     # 2. Processar os dados e formatar o resumo
-    summary = f"# Análise de Mercado - {data.get('date', 'Data Desconhecida')}\n\n"
-    summary += "## 📈 Crescimento do Setor de Comunicação e Avaliação\n\n"
-    summary += "Os dados de mercado confirmam o alto potencial de crescimento do setor, com taxas anuais compostas (CAGR) robustas em todas as áreas-chave:\n\n"
-    
-    # Tabela de Insights de Mercado
-    market_data = data.get('market_insights', {})
-    if market_data:
-        summary += "| Mercado | Tamanho (2024, USD Bilhões) | CAGR (%) | Tamanho Projetado (USD Bilhões) |\n"
-        summary += "| :--- | :--- | :--- | :--- |\n"
-        for market, metrics in market_data.items():
-            title = metrics.get('title', 'N/A')
-            size_2024 = metrics.get('size_2024_billion_usd', 'N/A')
-            cagr = metrics.get('cagr_percent', 'N/A')
-            size_proj = metrics.get('size_2031_billion_usd', metrics.get('size_2033_billion_usd', 'N/A'))
-            
-            # Formatação da projeção
-            if size_proj != 'N/A':
-                if 'size_2031_billion_usd' in metrics:
-                    proj_text = f"{size_proj} (até 2031)"
-                elif 'size_2033_billion_usd' in metrics:
-                    proj_text = f"{size_proj} (até 2033)"
-                else:
-                    proj_text = size_proj
-            else:
-                proj_text = 'N/A'
-                
-            summary += f"| {title} | {size_2024} | {cagr} | {proj_text} |\n"
-        summary += "\n"
-
-    # Tendências Chave
-    trends = data.get('trends', [])
-    if trends:
-        summary += "## 💡 Tendências Chave e Foco Estratégico\n\n"
-        summary += "A análise de mercado aponta para as seguintes tendências que devem guiar o desenvolvimento do ComunicaPro:\n"
-        for i, trend in enumerate(trends, 1):
-            summary += f"{i}. **{trend}**\n"
-        summary += "\n"
-    
-    # Foco em Recursos Avançados
-    advanced_features = data.get('advanced_feature_focus', [])
-    if advanced_features:
-        summary += "## 🚀 Próximos Recursos Avançados (Alinhamento com o Mercado)\n\n"
-        summary += "Para manter a competitividade, os esforços de desenvolvimento devem se concentrar em:\n"
-        for feature in advanced_features:
-            summary += f"- {feature}\n"
-        summary += "\n"
+    summary = render_market_analysis(data)
 
     # 3. Escrever o resultado no arquivo de saída
     try:
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de throughput dos scripts do ComunicaPro.
+
+Mede `batch_analyze` (simples e empacotado), `generate_papp` e os
+geradores de relatórios Markdown contra um backend de LLM falso e
+determinístico (latência log-normal, taxa de erro e tamanho de resposta
+configuráveis), usando corpora sintéticos de textos em português e de
+perfis VAK. O resultado é gravado em JSON com itens/s, latências
+p50/p95/p99 e pico de RSS, para acompanhar regressões entre versões.
+
+Uso:
+    python3 scripts/benchmark.py --texts 2000 --profiles 200 --latency-ms 150 --output bench_results.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import generate_papp
+from analyze_market_data import analyze_market_data
+from generate_market_summary import generate_summary
+from llm_backend import DEFAULT_BACKEND, LLMBackend, register_backend, simulated_content
+from sentiment_analysis import SentimentAnalyzer
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SUBJECTS = ["O produto", "O atendimento", "A entrega", "O aplicativo", "O curso", "O suporte", "A plataforma"]
+OPINIONS = [
+    "superou minhas expectativas", "é ok, nada de especial", "chegou com defeito",
+    "foi rápido e eficiente", "demorou demais", "é fácil de usar", "me deixou confuso",
+    "tem ótima qualidade", "não funciona como esperado", "foi atencioso e prestativo",
+]
+CLOSINGS = ["", "Recomendo.", "Não compraria de novo.", "Vou avaliar melhor depois.", "Parabéns à equipe!"]
+OBJECTIVES = [
+    "Aprender a programar em Python", "Melhorar a comunicação interpessoal",
+    "Falar em público com confiança", "Aprender React", "Preparar-se para entrevistas",
+    "Liderar reuniões com clareza",
+]
+
+
+class SimulatedAPIError(Exception):
+    """Erro transitório simulado (tratado como HTTP 429/5xx)."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Erro simulado {status_code}")
+        self.status_code = status_code
+
+
+class FakeLLMClient:
+    """
+    Cliente de chat completions falso e determinístico.
+
+    A latência e a ocorrência de erro de cada requisição são sorteadas por
+    um gerador semeado pelo conteúdo da requisição, de modo que a mesma
+    carga produz a mesma distribuição entre execuções.
+    """
+
+    def __init__(self, median_latency_ms: float = 150.0, latency_sigma: float = 0.5,
+                 error_rate: float = 0.0, response_size: int = 0, seed: int = 42):
+        self.median_latency_ms = median_latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.response_size = response_size
+        self.seed = seed
+        self.latencies_ms = []
+        self.calls = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        messages = kwargs.get("messages", [])
+        digest = hashlib.sha256(json.dumps(messages, ensure_ascii=False).encode("utf-8")).hexdigest()
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+        rng = random.Random(f"{self.seed}:{digest}:{attempt}")
+
+        start = time.perf_counter()
+        time.sleep(rng.lognormvariate(0, self.latency_sigma) * self.median_latency_ms / 1000)
+        if rng.random() < self.error_rate:
+            raise SimulatedAPIError(rng.choice((429, 500, 503)))
+
+        content = json.loads(simulated_content(messages))
+        if self.response_size and isinstance(content, dict):
+            content["padding"] = "x" * self.response_size
+        content = json.dumps(content, ensure_ascii=False)
+        with self._lock:
+            self.latencies_ms.append((time.perf_counter() - start) * 1000)
+
+        if kwargs.get("stream"):
+            return iter([_chunk(content[i:i + 16]) for i in range(0, len(content), 16)])
+        return _completion(content)
+
+
+def _completion(content: str):
+    message = type("Message", (), {"content": content, "role": "assistant"})()
+    choice = type("Choice", (), {"message": message, "finish_reason": "stop"})()
+    return type("Completion", (), {"choices": [choice], "usage": None})()
+
+
+def _chunk(content: str):
+    delta = type("Delta", (), {"content": content})()
+    choice = type("Choice", (), {"delta": delta})()
+    return type("Chunk", (), {"choices": [choice]})()
+
+
+def synthetic_texts(count: int, seed: int = 42) -> List[str]:
+    """Gera avaliações curtas em português a partir de modelos."""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(SUBJECTS)} {rng.choice(OPINIONS)}. {rng.choice(CLOSINGS)} (#{i})"
+        for i in range(count)
+    ]
+
+
+def synthetic_profiles(count: int, seed: int = 42) -> List[Dict]:
+    """Gera perfis VAK (somando 100%) com objetivos comuns."""
+    rng = random.Random(seed)
+    profiles = []
+    for _ in range(count):
+        visual = rng.randint(0, 100)
+        auditivo = rng.randint(0, 100 - visual)
+        profiles.append({
+            "visual": visual,
+            "auditivo": auditivo,
+            "cinestesico": 100 - visual - auditivo,
+            "objetivo": rng.choice(OBJECTIVES),
+        })
+    return profiles
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss é KB no Linux e bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _percentiles(values: List[float]) -> Dict:
+    if not values:
+        return {"p50": 0, "p95": 0, "p99": 0}
+    ordered = sorted(values)
+    return {
+        f"p{int(q * 100)}": round(ordered[min(len(ordered) - 1, int(q * (len(ordered) - 1) + 0.5))], 2)
+        for q in (0.50, 0.95, 0.99)
+    }
+
+
+def _run(name: str, items: int, func: Callable[[], List[float]]) -> Dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        latencies = func()
+        elapsed = time.perf_counter() - start
+    result = {
+        "name": name,
+        "items": items,
+        "elapsed_seconds": round(elapsed, 3),
+        "items_per_second": round(items / elapsed, 2) if elapsed else 0,
+        "latency_ms": _percentiles(latencies),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    print(f"{name:<28} {result['items_per_second']:>10.1f} itens/s  "
+          f"p50={result['latency_ms']['p50']}ms p99={result['latency_ms']['p99']}ms")
+    return result
+
+
+def run_benchmarks(texts: int = 1000, profiles: int = 100, latency_ms: float = 150.0,
+                   latency_sigma: float = 0.5, error_rate: float = 0.0, response_size: int = 0,
+                   concurrency: int = 16, report_iterations: int = 200, seed: int = 42) -> Dict:
+    """
+    Executa todos os benchmarks e retorna o relatório.
+    """
+    def fresh_client() -> FakeLLMClient:
+        client = FakeLLMClient(latency_ms, latency_sigma, error_rate, response_size, seed)
+        register_backend(LLMBackend(client, max_concurrency=concurrency, name=DEFAULT_BACKEND))
+        return client
+
+    corpus = synthetic_texts(texts, seed)
+    profile_corpus = synthetic_profiles(profiles, seed)
+    results = []
+
+    def batch(pack_token_budget=None) -> List[float]:
+        client = fresh_client()
+        SentimentAnalyzer(max_concurrency=concurrency).batch_analyze(corpus, pack_token_budget=pack_token_budget)
+        return client.latencies_ms
+
+    results.append(_run("batch_analyze", texts, batch))
+    results.append(_run("batch_analyze_packed", texts, lambda: batch(pack_token_budget=400)))
+
+    def papp() -> List[float]:
+        client = fresh_client()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda p: generate_papp.generate_papp(p, use_cache=False), profile_corpus))
+        return client.latencies_ms
+    results.append(_run("generate_papp", profiles, papp))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def render(func: Callable[[str, str], object], data_path: str) -> List[float]:
+            latencies = []
+            for i in range(report_iterations):
+                start = time.perf_counter()
+                func(data_path, os.path.join(tmp, f"report_{i}.md"))
+                latencies.append((time.perf_counter() - start) * 1000)
+            return latencies
+        results.append(_run("generate_market_summary", report_iterations, lambda: render(
+            generate_summary, os.path.join(PROJECT_ROOT, 'research_data', 'market_statistics.json'))))
+        results.append(_run("analyze_market_data", report_iterations, lambda: render(
+            analyze_market_data, os.path.join(PROJECT_ROOT, 'research_data', 'market_insights_30oct2025.json'))))
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "texts": texts, "profiles": profiles, "latency_ms": latency_ms,
+            "latency_sigma": latency_sigma, "error_rate": error_rate,
+            "response_size": response_size, "concurrency": concurrency,
+            "report_iterations": report_iterations, "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de throughput do ComunicaPro")
+    parser.add_argument("--texts", type=int, default=1000, help="Tamanho do corpus de textos")
+    parser.add_argument("--profiles", type=int, default=100, help="Quantidade de perfis VAK")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Latência mediana do LLM falso")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Sigma da latência log-normal")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 429/5xx")
+    parser.add_argument("--response-size", type=int, default=0, help="Bytes extras por resposta")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--report-iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json", help="Arquivo JSON de resultados")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.texts, args.profiles, args.latency_ms, args.latency_sigma,
+                            args.error_rate, args.response_size, args.concurrency,
+                            args.report_iterations, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,26 @@
 PROJECT_DIR="$(dirname "$0")/.."
 cd "$PROJECT_DIR"
 
-# 1. Executar o script de atualização Python
-echo "--- Executando script de atualização diária ---"
-python3 scripts/daily_update.py
+# 1. Executar o pipeline diário (passos com entradas inalteradas são pulados)
+echo "--- Executando pipeline diário ---"
+python3 scripts/pipeline.py
+STATUS=$?
 
-# Verifica se o arquivo de dados foi modificado
-if git diff --exit-code research_data/daily_trends.json > /dev/null; then
+# Código 3: nenhuma saída do pipeline mudou
+if [ $STATUS -eq 3 ]; then
     echo "Nenhuma mudança nos dados de pesquisa. Encerrando."
     exit 0
 fi
+if [ $STATUS -ne 0 ]; then
+    echo "Falha no pipeline diário. Encerrando sem commit."
+    exit 1
+fi
 
 # 2. Adicionar os arquivos modificados
 echo "--- Adicionando arquivos ao Git ---"
 git add research_data/daily_trends.json
 git add scripts/daily_update.py
+git add research_findings/daily_summary_*.md research_findings/market_summary_*.md
 git add src/types/research.d.ts
 git add src/lib/dailyTrends.ts
 
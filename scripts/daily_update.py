@@ -14,6 +14,9 @@ import json
 import requests
 from datetime import datetime
 
+from keyword_index import KeywordIndex
+from near_duplicates import DuplicateIndex, historical_snapshots, iter_insights, seed_from_snapshots
+
 # --- Configurações ---
 # URL do endpoint de pesquisa (simulado, pois o tool search não é acessível em runtime)
 # Em um ambiente real, este seria um endpoint de um serviço de busca ou API de notícias.
@@ -161,6 +164,49 @@ def update_research_data(data):
         print(f"Erro ao salvar dados de pesquisa: {e}")
         return False
 
+def select_new_insights(data):
+    """
+    Separa os insights genuinamente novos das quase-duplicatas já arquivadas.
+
+    O arquivo de assinaturas persiste entre execuções e é alimentado também
+    pelos snapshots diários existentes. Os insights novos são salvos em
+    research_findings/new_insights_<data>.json para resumo e análise de
+    sentimento; os repetidos não geram novas chamadas ao LLM. Os novos
+    ficam pendentes até `mark_insights_processed`, e reaparecem na próxima
+    seleção se o processamento falhar.
+    """
+    index = DuplicateIndex()
+    try:
+        seed_from_snapshots(index, historical_snapshots(RESEARCH_DATA_DIR))
+        new_insights, duplicates = index.filter_new(iter_insights(data), source=data.get("last_updated"))
+    finally:
+        index.close()
+    print(f"{len(new_insights)} insights novos, {len(duplicates)} quase-duplicatas ignoradas")
+
+    if new_insights:
+        os.makedirs(RESEARCH_FINDINGS_DIR, exist_ok=True)
+        filepath = os.path.join(RESEARCH_FINDINGS_DIR, f"new_insights_{datetime.now().strftime('%Y%m%d')}.json")
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(new_insights, f, indent=4, ensure_ascii=False)
+        print(f"Insights novos salvos em: {filepath}")
+    return new_insights
+
+def pending_insights():
+    """Insights selecionados em qualquer execução anterior e ainda não processados."""
+    index = DuplicateIndex()
+    try:
+        return index.pending()
+    finally:
+        index.close()
+
+def mark_insights_processed(insights):
+    """Tira da fila de pendentes os insights já resumidos e analisados."""
+    index = DuplicateIndex()
+    try:
+        return index.mark_processed(insights)
+    finally:
+        index.close()
+
 def main():
     """
     Função principal para executar a atualização diária.
@@ -171,8 +217,17 @@ def main():
     trends = fetch_latest_trends()
     
     if trends:
-        # 2. Salvar os dados
+        # 2. Filtrar insights já processados (antes de sobrescrever o snapshot atual)
+        select_new_insights(trends)
+
+        # 3. Salvar os dados
         update_research_data(trends)
+
+        # 4. Atualizar o índice de palavras-chave (só relê arquivos modificados)
+        index = KeywordIndex()
+        report = index.build()
+        index.close()
+        print(f"Índice de palavras-chave atualizado: {report['indexed']} arquivos reindexados")
     else:
         print("Nenhuma tendência nova encontrada ou erro na busca.")
         
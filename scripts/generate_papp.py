@@ -9,121 +9,532 @@ para gerar conteúdo personalizado com base no perfil de comunicação do usuár
 """
 
 import os
+import re
+import sys
+import csv
 import json
-from openai import OpenAI
-
-# Configuração da API (A chave é carregada automaticamente do ambiente)
-try:
-    client = OpenAI()
-except Exception as e:
-    print(f"Erro ao inicializar o cliente OpenAI: {e}")
-    # Fallback para simulação se a chave não estiver disponível
-    class MockClient:
-        class MockChat:
-            class MockCompletions:
-                def create(self, **kwargs):
-                    return {
-                        "choices": [
-                            {
-                                "message": {
-                                    "content": json.dumps({
-                                        "title": f"Plano de Ação (Simulado) para Perfil {kwargs['messages'][1]['content'].split('Perfil: ')[1].split(',')[0]}",
-                                        "introduction": "Este é um plano de ação simulado. Para um plano real, configure a chave da API OpenAI.",
-                                        "days": [
-                                            {"day": 1, "theme": "Foco na Atenção", "task": "Simulação: Revise anotações usando cores e diagramas (Visual)."},
-                                            {"day": 2, "theme": "Processamento Auditivo", "task": "Simulação: Transforme o conteúdo do dia 1 em um podcast curto (Auditivo)."},
-                                            {"day": 3, "theme": "Aprendizagem Ativa", "task": "Simulação: Construa um modelo físico ou faça um role-play (Cinestésico)."},
-                                            {"day": 4, "theme": "Revisão e Conexão", "task": "Simulação: Escreva um resumo à mão (Leitura/Escrita)."},
-                                            {"day": 5, "theme": "Feedback e Ajuste", "task": "Simulação: Peça a um amigo para testar seu conhecimento (Interpessoal)."},
-                                            {"day": 6, "theme": "Processamento Profundo", "task": "Simulação: Crie uma metáfora complexa para o tema (Elaboração)."},
-                                            {"day": 7, "theme": "Consolidação", "task": "Simulação: Medite sobre o que aprendeu, focando na emoção (Emocional/Cognitivo)."}
-                                        ]
-                                    })
-                                }
-                            }
-                        ]
-                    }
-            def __init__(self):
-                self.completions = self.MockCompletions()
-        def __init__(self):
-            self.chat = self.MockChat()
-    client = MockClient()
-
-def generate_papp(profile_data: dict) -> dict:
+import argparse
+import time
+import unicodedata
+from collections import Counter
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from llm_backend import get_backend
+from llm_scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from metrics import JSON_PARSE_FAILURES, JSON_REPAIRS, SCHEMA_REASKS, stage
+from rate_limiter import retry_with_backoff
+from response_cache import ResponseCache, make_key
+from response_parsing import PAPP_SCHEMA, invalid_fields, missing_papp_days, parse_json, valid_papp_days
+from single_flight import SingleFlight
+
+PAPP_MODEL = "gemini-2.5-flash"
+# Incrementar sempre que o prompt do PAPP mudar (invalida o cache de planos)
+PAPP_PROMPT_VERSION = "papp-v3"
+# Largura dos buckets de quantização dos percentuais VAK (só na chave de cache)
+VAK_BUCKET_SIZE = 10
+PAPP_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'papp_cache.sqlite')
+PAPP_CACHE_TTL_SECONDS = 7 * 24 * 3600
+PAPP_CACHE_MAX_ENTRIES = 20_000
+# Espera máxima por uma vaga no LLM para pedidos interativos (segundos)
+PAPP_QUEUE_DEADLINE_SECONDS = 30.0
+# Novas tentativas em 429/5xx, feitas fora da vaga do escalonador
+PAPP_MAX_RETRIES = 2
+
+def get_client():
+    """
+    Retorna o backend de LLM compartilhado (ver `llm_backend.py`).
+
+    Sem credenciais da OpenAI, usa respostas simuladas para que o fluxo
+    possa ser exercitado localmente.
+    """
+    return get_backend(fallback_to_offline=True)
+
+def _create_completion(**kwargs):
+    """`chat.completions.create` com novas tentativas em erros transitórios."""
+    return retry_with_backoff(lambda: get_client().chat.completions.create(**kwargs),
+                              max_retries=PAPP_MAX_RETRIES)
+
+_papp_cache = None
+
+def get_papp_cache() -> ResponseCache:
+    """Retorna o cache de planos compartilhado, criando-o na primeira chamada."""
+    global _papp_cache
+    if _papp_cache is None:
+        _papp_cache = ResponseCache(PAPP_CACHE_PATH, ttl_seconds=PAPP_CACHE_TTL_SECONDS,
+                                    max_entries=PAPP_CACHE_MAX_ENTRIES)
+    return _papp_cache
+
+# Gerações idênticas simultâneas (ex.: vários usuários no perfil padrão de um
+# link compartilhado) dividem uma única chamada ao LLM
+_papp_flight = SingleFlight("papp")
+
+def quantize_profile(profile_data: dict) -> Tuple[int, int, int]:
+    """
+    Bucket de `VAK_BUCKET_SIZE` de cada percentual VAK (limite inferior).
+
+    Buckets por piso são simétricos: 20-29 vira 20 e 30-39 vira 30.
+    """
+    return tuple(
+        int(min(max(float(profile_data.get(key, 0) or 0), 0), 100) // VAK_BUCKET_SIZE) * VAK_BUCKET_SIZE
+        for key in ("visual", "auditivo", "cinestesico")
+    )
+
+def normalize_objective(objetivo: str) -> str:
+    """Normaliza o objetivo (sem acentos, caixa, pontuação e espaços extras)."""
+    folded = unicodedata.normalize("NFD", objetivo).encode("ascii", "ignore").decode("ascii").lower()
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9]+", " ", folded)).strip()
+
+def papp_cache_key(profile_data: dict) -> str:
+    """
+    Chave de cache do PAPP: bucket VAK + objetivo normalizado.
+
+    O bucket só agrupa perfis na chave; o prompt leva sempre os percentuais
+    exatos. Um plano em cache foi gerado para o primeiro perfil do bucket
+    e é servido aos demais, que diferem dele em menos de `VAK_BUCKET_SIZE`
+    pontos por modalidade.
+    """
+    visual, auditivo, cinestesico = quantize_profile(profile_data)
+    objetivo = normalize_objective(profile_data.get("objetivo", "melhorar a comunicação interpessoal"))
+    return make_key(PAPP_MODEL, PAPP_PROMPT_VERSION, f"{visual}/{auditivo}/{cinestesico}|{objetivo}")
+
+def build_papp_messages(profile_data: dict) -> list:
+    """
+    Monta as mensagens de sistema e usuário do PAPP.
+
+    Args:
+        profile_data: Dados do perfil do usuário (percentuais enviados como informados)
+    """
+    # Extrair dados do perfil
+    visual = profile_data.get("visual", 0)
+    auditivo = profile_data.get("auditivo", 0)
+    cinestesico = profile_data.get("cinestesico", 0)
+    objetivo = profile_data.get("objetivo", "melhorar a comunicação interpessoal")
+
+    # Construir o prompt para o LLM
+    system_prompt = (
+        "Você é um Neurocientista Cognitivo e Coach de Aprendizagem. Sua tarefa é criar um "
+        "Plano de Ação de Processamento Profundo (PAPP) de 7 dias. O plano deve ser baseado "
+        "no perfil de comunicação VAK do usuário e em seu objetivo. O PAPP deve focar em "
+        "técnicas de aprendizado ativo e processamento profundo (como elaboração, auto-explicação, "
+        "e prática de recuperação), e não apenas no estilo preferido. "
+        "O resultado DEVE ser um objeto JSON válido no formato: "
+        "{'title': str, 'introduction': str, 'days': [{'day': int, 'theme': str, 'task': str}, ...]}. "
+        "A tarefa deve ser prática e acionável."
+    )
+
+    user_prompt = (
+        f"Crie um PAPP de 7 dias. Perfil: Visual: {visual}%, Auditivo: {auditivo}%, Cinestésico: {cinestesico}%. "
+        f"Objetivo do usuário: '{objetivo}'. "
+        "Foque em aplicar o processamento profundo para atingir o objetivo, usando as modalidades como ferramentas de engajamento."
+    )
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def parse_papp_content(content: str, component: str = "papp") -> dict:
+    """
+    Converte o texto da resposta em dict, removendo blocos de código markdown
+    e reparando respostas truncadas (ver `response_parsing.parse_json`).
+    Lança `json.JSONDecodeError` se nada puder ser aproveitado.
+    """
+    papp, repaired = parse_json(content)
+    if repaired:
+        JSON_REPAIRS.inc(component=component)
+    return papp if isinstance(papp, dict) else {}
+
+def is_complete_papp(papp: dict) -> bool:
+    """Verifica se o plano tem título, introdução e os 7 dias válidos."""
+    return not invalid_fields(papp, PAPP_SCHEMA) and not missing_papp_days(papp)
+
+def _queue_deadline(priority: str) -> Optional[float]:
+    return PAPP_QUEUE_DEADLINE_SECONDS if priority == PRIORITY_INTERACTIVE else None
+
+def complete_papp(profile_data: dict, papp: dict, priority: str = PRIORITY_INTERACTIVE) -> Tuple[dict, List[dict]]:
+    """
+    Completa um plano parcial pedindo ao LLM apenas o que falta.
+
+    A nova pergunta leva o plano parcial como contexto e pede somente os
+    campos ausentes e os dias ausentes ou inválidos; dias já válidos nunca
+    são regenerados. Se a nova pergunta falhar, o plano parcial é mantido.
+
+    Returns:
+        (plano com os dias em ordem, dias acrescentados pela nova pergunta)
+    """
+    missing_fields = [field for field in invalid_fields(papp, PAPP_SCHEMA) if field != "days"]
+    missing_days = missing_papp_days(papp)
+    if not missing_fields and not missing_days:
+        return papp, []
+
+    SCHEMA_REASKS.inc(component="papp")
+    days = valid_papp_days(papp)
+    requested = [f"'{field}'" for field in missing_fields]
+    if missing_days:
+        requested.append(f"'days' apenas com os dias {', '.join(map(str, missing_days))}")
+    messages = build_papp_messages(profile_data)
+    messages += [
+        {"role": "assistant", "content": json.dumps(
+            {**{key: papp[key] for key in ("title", "introduction") if key not in missing_fields},
+             "days": [days[day] for day in sorted(days)]}, ensure_ascii=False)},
+        {"role": "user", "content": (
+            "O plano acima ficou incompleto. Responda com um objeto JSON contendo somente "
+            f"{' e '.join(requested)}, no mesmo formato e coerentes com os dias já existentes."
+        )},
+    ]
+    try:
+        response = _create_completion(
+            model=PAPP_MODEL,
+            messages=messages,
+            response_format={"type": "json_object"},
+            priority=priority,
+            deadline=_queue_deadline(priority)
+        )
+        extra = parse_papp_content(response.choices[0].message.content, component="papp_reask")
+    except json.JSONDecodeError:
+        JSON_PARSE_FAILURES.inc(component="papp_reask")
+        return papp, []
+    except Exception as e:
+        print(f"Erro ao completar PAPP: {e}")
+        return papp, []
+
+    papp = dict(papp)
+    for field in missing_fields:
+        if field not in invalid_fields(extra, PAPP_SCHEMA):
+            papp[field] = extra[field]
+    added = [day for number, day in sorted(valid_papp_days(extra).items()) if number in missing_days]
+    days.update((day["day"], day) for day in added)
+    papp["days"] = [days[day] for day in sorted(days)]
+    return papp, added
+
+def generate_papp(profile_data: dict, use_cache: bool = True, bypass_cache: bool = False,
+                  cache: Optional[ResponseCache] = None, priority: str = PRIORITY_INTERACTIVE) -> dict:
     """
     Gera o Plano de Ação de Processamento Profundo (PAPP) usando um LLM.
 
+    Com cache ativo, a chave agrupa o perfil VAK em buckets e normaliza o
+    objetivo; perfis equivalentes recebem o plano já armazenado sem chamar
+    o LLM. O prompt sempre leva o perfil exato (ver `papp_cache_key`). Pedidos equivalentes simultâneos compartilham uma única
+    chamada (single-flight).
+
     Args:
         profile_data: Dicionário com os dados do perfil do usuário.
                       Ex: {"visual": 45, "auditivo": 30, "cinestesico": 25, "objetivo": "Aprender a programar em Python"}
+        use_cache: Consulta e alimenta o cache de planos
+        bypass_cache: Ignora entradas existentes e regenera o plano
+        cache: Cache a usar (padrão: `get_papp_cache()`)
+        priority: Faixa do escalonador do LLM; pedidos interativos esperam
+                  no máximo `PAPP_QUEUE_DEADLINE_SECONDS` por uma vaga
 
     Returns:
         Um dicionário representando o PAPP gerado.
     """
-    try:
-        # Extrair dados do perfil
-        visual = profile_data.get("visual", 0)
-        auditivo = profile_data.get("auditivo", 0)
-        cinestesico = profile_data.get("cinestesico", 0)
-        objetivo = profile_data.get("objetivo", "melhorar a comunicação interpessoal")
-
-        # Construir o prompt para o LLM
-        system_prompt = (
-            "Você é um Neurocientista Cognitivo e Coach de Aprendizagem. Sua tarefa é criar um "
-            "Plano de Ação de Processamento Profundo (PAPP) de 7 dias. O plano deve ser baseado "
-            "no perfil de comunicação VAK do usuário e em seu objetivo. O PAPP deve focar em "
-            "técnicas de aprendizado ativo e processamento profundo (como elaboração, auto-explicação, "
-            "e prática de recuperação), e não apenas no estilo preferido. "
-            "O resultado DEVE ser um objeto JSON válido no formato: "
-            "{'title': str, 'introduction': str, 'days': [{'day': int, 'theme': str, 'task': str}, ...]}. "
-            "A tarefa deve ser prática e acionável."
-        )
+    cache_key = None
+    recheck = None
+    if use_cache:
+        cache = cache or get_papp_cache()
+        cache_key = papp_cache_key(profile_data)
+        if not bypass_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            recheck = lambda: cache.peek(cache_key)
 
-        user_prompt = (
-            f"Crie um PAPP de 7 dias. Perfil: Visual: {visual}%, Auditivo: {auditivo}%, Cinestésico: {cinestesico}%. "
-            f"Objetivo do usuário: '{objetivo}'. "
-            "Foque em aplicar o processamento profundo para atingir o objetivo, usando as modalidades como ferramentas de engajamento."
-        )
+    messages = build_papp_messages(profile_data)
+    flight_key = cache_key or make_key(PAPP_MODEL, PAPP_PROMPT_VERSION, json.dumps(messages, ensure_ascii=False))
+    return _papp_flight.do(
+        flight_key, lambda: _request_papp(profile_data, messages, use_cache, cache, cache_key, priority),
+        recheck=recheck)
 
+def _request_papp(profile_data: dict, messages: list, use_cache: bool,
+                  cache: Optional[ResponseCache], cache_key: Optional[str], priority: str) -> dict:
+    """Chama o LLM, completa o plano se necessário e grava planos completos no cache."""
+    try:
         print(f"Enviando prompt para o LLM...")
         
         # Chamada à API
-        response = client.chat.completions.create(
-            model="gemini-2.5-flash", # Modelo otimizado para tarefas de geração
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"}
+        response = _create_completion(
+            model=PAPP_MODEL, # Modelo otimizado para tarefas de geração
+            messages=messages,
+            response_format={"type": "json_object"},
+            priority=priority,
+            deadline=_queue_deadline(priority)
         )
 
-        # Processar a resposta
-        content = response.choices[0].message.content
+        # Processar a resposta (campos ou dias faltando são pedidos novamente)
+        papp_result = parse_papp_content(response.choices[0].message.content)
+        papp_result, _ = complete_papp(profile_data, papp_result, priority=priority)
         
-        # Tenta limpar e carregar o JSON. O LLM pode ter truncado a resposta.
-        try:
-            # Tenta carregar diretamente (ideal)
-            papp_result = json.loads(content)
-        except json.JSONDecodeError:
-            # Tenta limpar o bloco de código markdown
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            
-            # Tenta carregar novamente
-            papp_result = json.loads(content.strip())
+        # Planos incompletos não vão para o cache
+        if cache_key is not None and is_complete_papp(papp_result):
+            cache.set(cache_key, papp_result)
         
         return papp_result
 
     except json.JSONDecodeError:
+        JSON_PARSE_FAILURES.inc(component="papp")
         print("Erro: A resposta do LLM não é um JSON válido.")
         return {"error": "JSON Decode Error"}
     except Exception as e:
         print(f"Erro ao gerar PAPP: {e}")
         return {"error": str(e)}
 
+class IncrementalPAPPParser:
+    """
+    Parser incremental do objeto PAPP recebido em streaming.
+
+    Acompanha strings, escapes e profundidade de chaves/colchetes à medida
+    que os trechos chegam e devolve cada item de "days" assim que seu objeto
+    JSON se fecha, sem esperar o restante da resposta.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        self._days_depth = None
+        self._item_start = None
+
+    def feed(self, chunk: str) -> List[dict]:
+        """
+        Acrescenta um trecho da resposta.
+
+        Returns:
+            Lista (possivelmente vazia) de dias concluídos neste trecho
+        """
+        self.buffer += chunk
+        completed = []
+        buffer = self.buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = buffer[self._string_start:pos]
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos + 1
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._last_string == "days":
+                    self._days_depth = self._depth + 1
+                elif char == "{" and self._days_depth is not None and self._depth == self._days_depth:
+                    self._item_start = pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._item_start is not None and self._depth == self._days_depth:
+                    try:
+                        completed.append(json.loads(buffer[self._item_start:pos + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item_start = None
+                elif self._days_depth is not None and self._depth < self._days_depth:
+                    self._days_depth = None
+        self._pos = len(buffer)
+        return completed
+
+def generate_papp_stream(profile_data: dict, use_cache: bool = True,
+                         cache: Optional[ResponseCache] = None) -> Iterator[dict]:
+    """
+    Variante em streaming de `generate_papp`.
+
+    Consome a resposta do LLM token a token e emite eventos:
+        - {"event": "day", "day": {...}} assim que cada dia é concluído e
+          validado (cada número de dia sai uma única vez)
+        - {"event": "complete", "papp": {...}} com o plano completo ao final
+        - {"event": "error", "error": str} em caso de falha
+
+    Em acertos de cache, todos os eventos são emitidos imediatamente.
+    """
+    cache_key = None
+    if use_cache:
+        cache = cache or get_papp_cache()
+        cache_key = papp_cache_key(profile_data)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            for day in cached.get("days", []):
+                yield {"event": "day", "day": day}
+            yield {"event": "complete", "papp": cached}
+            return
+
+    parser = IncrementalPAPPParser()
+    emitted = set()
+
+    def unsent(days: list) -> List[dict]:
+        # Só dias válidos e ainda não emitidos, na ordem em que aparecem
+        fresh = [day for number, day in valid_papp_days({"days": days}).items() if number not in emitted]
+        emitted.update(day["day"] for day in fresh)
+        return fresh
+
+    try:
+        stream = _create_completion(
+            model=PAPP_MODEL,
+            messages=build_papp_messages(profile_data),
+            response_format={"type": "json_object"},
+            stream=True,
+            priority=PRIORITY_INTERACTIVE,
+            deadline=PAPP_QUEUE_DEADLINE_SECONDS
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            for day in unsent(parser.feed(chunk.choices[0].delta.content or "")):
+                yield {"event": "day", "day": day}
+
+        papp_result = parse_papp_content(parser.buffer.strip(), component="papp_stream")
+        # Dias que o parser incremental não conseguiu isolar e os completados
+        # por nova pergunta saem no final, pelo número do dia
+        papp_result, _ = complete_papp(profile_data, papp_result)
+        for day in unsent(papp_result.get("days", [])):
+            yield {"event": "day", "day": day}
+        if cache_key is not None and is_complete_papp(papp_result):
+            cache.set(cache_key, papp_result)
+        yield {"event": "complete", "papp": papp_result}
+
+    except json.JSONDecodeError:
+        JSON_PARSE_FAILURES.inc(component="papp_stream")
+        yield {"event": "error", "error": "JSON Decode Error"}
+    except Exception as e:
+        yield {"event": "error", "error": str(e)}
+
+def iter_profiles(path: str) -> Iterator[dict]:
+    """
+    Lê perfis de um arquivo CSV ou JSONL, um por vez.
+
+    Colunas/campos esperados: visual, auditivo, cinestesico, objetivo.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield row
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def warm_cache(profiles_path: str, top: int = 100) -> Dict:
+    """
+    Pré-computa os planos dos pares bucket/objetivo mais populares.
+
+    Args:
+        profiles_path: Histórico de perfis (CSV/JSONL) usado para medir popularidade
+        top: Quantidade de pares a pré-computar
+
+    Returns:
+        Dict com totais de pares gerados, já em cache e com falha
+    """
+    cache = get_papp_cache()
+    popularity = Counter()
+    representative = {}
+    for profile in iter_profiles(profiles_path):
+        key = papp_cache_key(profile)
+        popularity[key] += 1
+        representative.setdefault(key, profile)
+
+    report = {"generated": 0, "already_cached": 0, "failed": 0}
+    for key, count in popularity.most_common(top):
+        if cache.get(key) is not None:
+            report["already_cached"] += 1
+            continue
+        result = generate_papp(representative[key], cache=cache, priority=PRIORITY_BATCH)
+        report["failed" if "error" in result else "generated"] += 1
+    print(f"Aquecimento concluído: {report}")
+    return report
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def bulk_generate(profiles_path: str, output_path: str, workers: int = 8) -> Dict:
+    """
+    Gera planos em lote para todos os perfis de um arquivo CSV/JSONL.
+
+    Os perfis são lidos sob demanda e distribuídos em um pool limitado de
+    `workers` threads (no máximo 2 * workers perfis em voo). Cada resultado
+    é gravado em JSONL assim que termina, com o índice do perfil de entrada.
+
+    Returns:
+        Relatório com totais, falhas, throughput e latências (p50/p95/p99)
+    """
+    latencies = []
+    report = {"total": 0, "succeeded": 0, "failed": 0}
+    start = time.perf_counter()
+
+    def run(index: int, profile: dict) -> dict:
+        began = time.perf_counter()
+        with stage("papp_bulk_item"):
+            papp = generate_papp(profile, priority=PRIORITY_BATCH)
+        return {"index": index, "profile": profile, "papp": papp,
+                "latency_ms": round((time.perf_counter() - began) * 1000, 1)}
+
+    def drain(futures, out, return_when) -> set:
+        done, pending = wait(futures, return_when=return_when)
+        for future in done:
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            latencies.append(record["latency_ms"])
+            report["failed" if "error" in record["papp"] else "succeeded"] += 1
+        return pending
+
+    with open(output_path, 'w', encoding='utf-8') as out, ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        for index, profile in enumerate(iter_profiles(profiles_path)):
+            report["total"] += 1
+            in_flight.add(executor.submit(run, index, profile))
+            if len(in_flight) >= 2 * workers:
+                in_flight = drain(in_flight, out, FIRST_COMPLETED)
+        if in_flight:
+            drain(in_flight, out, ALL_COMPLETED)
+
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    report.update({
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(report["total"] / elapsed, 2) if elapsed else 0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0,
+        },
+    })
+    print(json.dumps(report, indent=4, ensure_ascii=False))
+    return report
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Geração do PAPP do ComunicaPro")
+    subparsers = parser.add_subparsers(dest="command")
+    warm_parser = subparsers.add_parser("warm", help="Pré-computa planos dos perfis mais populares")
+    warm_parser.add_argument("profiles", help="Histórico de perfis (CSV/JSONL)")
+    warm_parser.add_argument("--top", type=int, default=100, help="Pares bucket/objetivo a pré-computar")
+    bulk_parser = subparsers.add_parser("bulk", help="Gera planos para todos os perfis de um arquivo")
+    bulk_parser.add_argument("profiles", help="Perfis de entrada (CSV/JSONL)")
+    bulk_parser.add_argument("--output", default="papp_bulk.jsonl", help="Arquivo JSONL de saída")
+    bulk_parser.add_argument("--workers", type=int, default=8, help="Requisições simultâneas")
+    args = parser.parse_args()
+
+    if args.command == "warm":
+        warm_cache(args.profiles, args.top)
+        sys.exit(0)
+    if args.command == "bulk":
+        bulk_generate(args.profiles, args.output, args.workers)
+        sys.exit(0)
+
     # Exemplo de dados de perfil para teste
     test_profile = {
         "visual": 60,
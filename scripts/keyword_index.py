@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice invertido de palavras-chave sobre tendências, insights e resultados de sentimento.
+
+Todo objeto JSON com uma lista `keywords` (insights de `daily_trends.json`,
+resultados de sentimento do armazém `result_store`, linhas de saídas JSONL
+de corpus) vira um documento. Cada palavra-chave é normalizada (sem acentos,
+caixa única) e indexada como frase completa e por termo, em SQLite, o que
+permite busca exata e por prefixo ("process" → "Processamento Profundo")
+sem varrer os arquivos. A reindexação só relê arquivos modificados.
+
+Uso:
+    python3 scripts/keyword_index.py build
+    python3 scripts/keyword_index.py search "processamento profundo"
+    python3 scripts/keyword_index.py search neuro --prefix
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from result_store import DEFAULT_RESULTS_PATH, ResultStore
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INDEX_PATH = os.path.join(SCRIPT_DIR, '.cache', 'keyword_index.sqlite')
+DEFAULT_SOURCE_DIRS = (
+    os.path.join(SCRIPT_DIR, '..', 'research_data'),
+    os.path.join(SCRIPT_DIR, '..', 'research_findings'),
+)
+SOURCE_PATTERNS = ("*.json", "*.jsonl")
+
+# Termos isolados menores que isto não são indexados (a frase completa sempre é)
+MIN_TERM_LENGTH = 3
+# Maior ponto de código, usado como limite superior das buscas por prefixo
+_PREFIX_END = "\U0010ffff"
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Remove acentos, aplica casefold e colapsa espaços ("Pausa  Cognitiva" → "pausa cognitiva")."""
+    decomposed = unicodedata.normalize("NFKD", keyword)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", stripped.casefold()).strip()
+
+
+def index_terms(keyword: str) -> List[str]:
+    """Termos indexados de uma palavra-chave: a frase normalizada e suas palavras."""
+    phrase = normalize_keyword(keyword)
+    if not phrase:
+        return []
+    terms = {phrase}
+    terms.update(word for word in re.findall(r"\w+", phrase) if len(word) >= MIN_TERM_LENGTH)
+    return sorted(terms)
+
+
+def iter_documents(data, pointer: str = "") -> Iterator[Tuple[str, Dict]]:
+    """Percorre um JSON e produz (ponteiro, objeto) para cada objeto com `keywords`."""
+    if isinstance(data, dict):
+        if isinstance(data.get("keywords"), list):
+            yield pointer or "/", data
+        for key, value in data.items():
+            if isinstance(value, (dict, list)):
+                yield from iter_documents(value, f"{pointer}/{key}")
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            if isinstance(value, (dict, list)):
+                yield from iter_documents(value, f"{pointer}/{i}")
+
+
+def iter_file_documents(path: str) -> Iterator[Tuple[str, Dict]]:
+    """Documentos de um arquivo JSON ou JSONL (ponteiros de JSONL começam por `L<linha>`)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(".jsonl"):
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield from iter_documents(json.loads(line), f"L{line_number}")
+        else:
+            yield from iter_documents(json.load(f))
+
+
+def _title(doc: Dict) -> str:
+    for key in ("title", "name", "text", "summary"):
+        value = doc.get(key)
+        if isinstance(value, str) and value:
+            return value[:120]
+    return ""
+
+
+def _relative_name(path: str) -> str:
+    return os.path.relpath(os.path.abspath(path), os.path.join(SCRIPT_DIR, '..'))
+
+
+def _document_rows(name: str, docs: Iterator[Tuple[str, Dict]]) -> Tuple[List[Tuple], List[Tuple]]:
+    documents, postings = [], []
+    for pointer, doc in docs:
+        doc_id = f"{name}#{pointer}"
+        documents.append((doc_id, name, _title(doc), json.dumps(doc, ensure_ascii=False)))
+        terms = {term for keyword in doc["keywords"] if isinstance(keyword, str)
+                 for term in index_terms(keyword)}
+        postings.extend((term, doc_id) for term in terms)
+    return documents, postings
+
+
+class KeywordIndex:
+    """
+    Índice palavra-chave → documentos em SQLite, atualizado por arquivo.
+
+    Os documentos guardam o objeto JSON original, então as consultas
+    devolvem o insight completo sem reabrir o arquivo de origem.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " doc_id TEXT PRIMARY KEY,"
+            " file TEXT NOT NULL,"
+            " title TEXT NOT NULL,"
+            " payload TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_documents_file ON documents(file);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL,"
+            " doc_id TEXT NOT NULL,"
+            " PRIMARY KEY (term, doc_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings(doc_id);"
+            "CREATE TABLE IF NOT EXISTS files ("
+            " file TEXT PRIMARY KEY,"
+            " mtime REAL NOT NULL,"
+            " size INTEGER NOT NULL);"
+        )
+        self._conn.commit()
+
+    def index_file(self, path: str, force: bool = False) -> Optional[int]:
+        """
+        Indexa um arquivo, substituindo seus documentos anteriores.
+
+        Returns:
+            Número de documentos indexados (None se o arquivo não mudou)
+        """
+        name = _relative_name(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute("SELECT mtime, size FROM files WHERE file = ?", (name,)).fetchone()
+        if not force and row == (stat.st_mtime, stat.st_size):
+            return None
+
+        documents, postings = _document_rows(name, iter_file_documents(path))
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM postings WHERE doc_id IN (SELECT doc_id FROM documents WHERE file = ?)", (name,))
+                self._conn.execute("DELETE FROM documents WHERE file = ?", (name,))
+                self._conn.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)", documents)
+                self._conn.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?)", postings)
+                self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                                   (name, stat.st_mtime, stat.st_size))
+        return len(documents)
+
+    def index_result_store(self, path: str = DEFAULT_RESULTS_PATH, force: bool = False) -> int:
+        """
+        Indexa os resultados do armazém append-only gravados desde a última execução.
+
+        O último id indexado fica na tabela `files` (coluna `mtime`).
+
+        Returns:
+            Número de documentos indexados
+        """
+        name = _relative_name(path)
+        with self._lock:
+            row = self._conn.execute("SELECT mtime FROM files WHERE file = ?", (name,)).fetchone()
+        last_id = 0 if force or row is None else int(row[0])
+
+        store = ResultStore(path, flush_interval=None, compact_interval=None)
+        try:
+            results, newest = [], last_id
+            for result in store.iter_all(after_id=last_id):
+                newest = result["store_id"]
+                if isinstance(result.get("keywords"), list) and result["keywords"]:
+                    results.append(result)
+            last_id = newest
+        finally:
+            store.close()
+        documents, postings = _document_rows(name, ((str(result["store_id"]), result) for result in results))
+
+        with self._lock:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)", documents)
+                self._conn.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?)", postings)
+                self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)", (name, last_id, 0))
+        return len(documents)
+
+    def build(self, source_dirs: Sequence[str] = DEFAULT_SOURCE_DIRS, force: bool = False,
+              results_path: str = DEFAULT_RESULTS_PATH) -> Dict:
+        """
+        Atualiza o índice com os arquivos JSON/JSONL dos diretórios de origem
+        e com os resultados novos do armazém de resultados.
+
+        Arquivos removidos do disco saem do índice.
+
+        Returns:
+            Dict com arquivos indexados, inalterados, removidos, documentos e falhas
+        """
+        report = {"indexed": 0, "unchanged": 0, "removed": 0, "documents": 0, "failed": {}}
+        seen = set()
+        for source_dir in source_dirs:
+            for pattern in SOURCE_PATTERNS:
+                for path in sorted(glob.glob(os.path.join(source_dir, pattern))):
+                    seen.add(_relative_name(path))
+                    try:
+                        count = self.index_file(path, force=force)
+                    except (OSError, json.JSONDecodeError) as e:
+                        report["failed"][path] = str(e)
+                        continue
+                    if count is None:
+                        report["unchanged"] += 1
+                    else:
+                        report["indexed"] += 1
+                        report["documents"] += count
+
+        if os.path.exists(results_path):
+            seen.add(_relative_name(results_path))
+            report["documents"] += self.index_result_store(results_path, force=force)
+
+        with self._lock:
+            stale = [r[0] for r in self._conn.execute("SELECT file FROM files") if r[0] not in seen]
+            with self._conn:
+                for name in stale:
+                    self._conn.execute(
+                        "DELETE FROM postings WHERE doc_id IN (SELECT doc_id FROM documents WHERE file = ?)", (name,))
+                    self._conn.execute("DELETE FROM documents WHERE file = ?", (name,))
+                    self._conn.execute("DELETE FROM files WHERE file = ?", (name,))
+        report["removed"] = len(stale)
+        return report
+
+    def _term_clause(self, keyword: str, prefix: bool) -> Tuple[str, Tuple]:
+        term = normalize_keyword(keyword)
+        if prefix:
+            return "term >= ? AND term < ?", (term, term + _PREFIX_END)
+        return "term = ?", (term,)
+
+    def search(self, keywords: Sequence[str], prefix: bool = False, limit: Optional[int] = 20) -> List[Dict]:
+        """
+        Documentos que casam com ao menos uma palavra-chave, ordenados por
+        número de palavras-chave casadas.
+
+        Args:
+            keywords: Palavras-chave (frases ou termos, em qualquer caixa/acentuação)
+            prefix: Casa termos que começam com cada palavra-chave
+            limit: Máximo de documentos (None = todos)
+
+        Returns:
+            Lista de dicts com doc_id, file, title, matches e document (objeto original)
+        """
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        clauses, params = [], []
+        for keyword in keywords:
+            clause, clause_params = self._term_clause(keyword, prefix)
+            clauses.append(f"SELECT DISTINCT doc_id FROM postings WHERE {clause}")
+            params.extend(clause_params)
+        if not clauses:
+            return []
+        query = (
+            "SELECT d.doc_id, d.file, d.title, d.payload, COUNT(*) AS matches"
+            f" FROM ({' UNION ALL '.join(clauses)}) AS m JOIN documents d ON d.doc_id = m.doc_id"
+            " GROUP BY d.doc_id ORDER BY matches DESC, d.doc_id"
+        )
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {"doc_id": r[0], "file": r[1], "title": r[2], "matches": r[4], "document": json.loads(r[3])}
+            for r in rows
+        ]
+
+    def terms(self, prefix: str = "", limit: int = 50) -> List[Tuple[str, int]]:
+        """Termos indexados com o prefixo dado e sua frequência de documentos."""
+        clause, params = self._term_clause(prefix, True)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE {clause} GROUP BY term ORDER BY term LIMIT ?",
+                params + (limit,),
+            ).fetchall()
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice invertido de palavras-chave")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Caminho do banco SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Atualiza o índice")
+    build_parser.add_argument("--dir", action="append", help="Diretório de origem (repetível)")
+    build_parser.add_argument("--force", action="store_true", help="Reindexa arquivos não modificados")
+
+    search_parser = subparsers.add_parser("search", help="Busca documentos por palavra-chave")
+    search_parser.add_argument("keywords", nargs="+")
+    search_parser.add_argument("--prefix", action="store_true", help="Busca por prefixo")
+    search_parser.add_argument("--limit", type=int, default=20)
+
+    terms_parser = subparsers.add_parser("terms", help="Lista termos indexados")
+    terms_parser.add_argument("prefix", nargs="?", default="")
+
+    args = parser.parse_args()
+    index = KeywordIndex(args.index)
+    try:
+        if args.command == "build":
+            report = index.build(args.dir or DEFAULT_SOURCE_DIRS, force=args.force)
+            print(f"{report['indexed']} arquivos indexados ({report['documents']} documentos), "
+                  f"{report['unchanged']} sem alteração, {report['removed']} removidos")
+            for path, error in report["failed"].items():
+                print(f"Erro em {path}: {error}")
+        elif args.command == "search":
+            for hit in index.search(args.keywords, prefix=args.prefix, limit=args.limit):
+                print(f"[{hit['matches']}] {hit['title']} ({hit['doc_id']})")
+        else:
+            for term, count in index.terms(args.prefix):
+                print(f"{term}: {count}")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
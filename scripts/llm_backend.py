@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Camada compartilhada de acesso ao LLM para os scripts do ComunicaPro.
+
+- `get_backend()` devolve um cliente único por backend, com pool de
+  conexões HTTP keep-alive, timeouts configuráveis e um escalonador de
+  prioridade com limite de concorrência adaptativo (ver `llm_scheduler.py`).
+  A interface `backend.chat.completions.create(...)` é a mesma do SDK
+  OpenAI, com os argumentos extras `priority` e `deadline`.
+- `OfflineClient` produz respostas simuladas quando não há credenciais.
+- O modo `serve` sobe um servidor HTTP local que imita a API de chat
+  completions, com latência e taxa de erro configuráveis, para testar
+  throughput sem acesso à rede.
+
+Configuração por ambiente:
+    LLM_BASE_URL          URL base da API (ex.: http://127.0.0.1:8089/v1)
+    LLM_TIMEOUT           Timeout total por requisição em segundos (padrão 60)
+    LLM_CONNECT_TIMEOUT   Timeout de conexão em segundos (padrão 10)
+    LLM_MAX_CONNECTIONS   Tamanho do pool de conexões (padrão 20)
+    LLM_MAX_CONCURRENCY   Teto de requisições simultâneas por backend (padrão 16)
+    LLM_MIN_CONCURRENCY   Piso do limite adaptativo após 429/503 (padrão 1)
+    LLM_MAX_RETRIES       Novas tentativas internas do SDK (padrão 0: as tentativas
+                          ficam com `retry_with_backoff`, fora da vaga do escalonador,
+                          para que os 429/503 cheguem ao limite adaptativo)
+
+Uso do servidor local:
+    python3 scripts/llm_backend.py serve --port 8089 --latency-ms 300 --error-rate 0.05
+    LLM_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=local python3 scripts/sentiment_analysis.py
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import types
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from llm_scheduler import PRIORITY_BATCH, LLMScheduler, is_overload
+from metrics import LLM_ERRORS, LLM_LATENCY, LLM_TOKENS
+
+DEFAULT_BACKEND = "openai"
+OFFLINE_BACKEND = "offline"
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+class _Completions:
+    def __init__(self, backend: "LLMBackend"):
+        self._backend = backend
+
+    def create(self, priority: str = PRIORITY_BATCH, deadline: Optional[float] = None, **kwargs):
+        """
+        Envia a requisição ao cliente quando o escalonador liberar uma vaga.
+
+        Args:
+            priority: Faixa do escalonador ("interactive" ou "batch")
+            deadline: Segundos máximos de espera por vaga (None = sem prazo)
+            **kwargs: Argumentos do SDK OpenAI
+        """
+        backend = self._backend
+        labels = {"backend": backend.name, "model": kwargs.get("model", "")}
+        lane = backend.scheduler.acquire(priority, deadline)
+        start = time.perf_counter()
+        try:
+            response = backend.client.chat.completions.create(**kwargs)
+        except BaseException as e:
+            backend.scheduler.release(lane, overloaded=is_overload(e), succeeded=False)
+            LLM_ERRORS.inc(status=str(getattr(e, "status_code", type(e).__name__)), **labels)
+            raise
+        if not kwargs.get("stream"):
+            backend.scheduler.release(lane)
+            LLM_LATENCY.observe(time.perf_counter() - start, **labels)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, kind="prompt", **labels)
+                LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, kind="completion", **labels)
+            return response
+        return _SlotStream(response, backend, lane, start, labels)
+
+
+class _SlotStream:
+    """
+    Stream de resposta que segura a vaga do escalonador até terminar.
+
+    A vaga é devolvida uma única vez: ao esgotar o stream, no primeiro erro,
+    em `close()` (ou na saída do `with`) e, como último recurso, quando o
+    objeto é coletado sem ter sido consumido.
+    """
+
+    def __init__(self, stream, backend: "LLMBackend", lane: str, start: float, labels: Dict):
+        self._stream = stream
+        self._iterator = None
+        self._backend = backend
+        self._lane = lane
+        self._start = start
+        self._labels = labels
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            if self._iterator is None:
+                self._iterator = iter(self._stream)
+            return next(self._iterator)
+        except StopIteration:
+            self._release()
+            raise
+        except BaseException as e:
+            self._release(overloaded=is_overload(e), succeeded=False)
+            raise
+
+    def close(self) -> None:
+        """Abandona o stream: fecha a conexão e devolve a vaga."""
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._release(succeeded=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        self._release(succeeded=False)
+
+    def _release(self, overloaded: bool = False, succeeded: bool = True) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._backend.scheduler.release(self._lane, overloaded=overloaded, succeeded=succeeded)
+        LLM_LATENCY.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class LLMBackend:
+    """
+    Cliente de LLM compartilhado com escalonador de prioridade.
+
+    Expõe `chat.completions.create(**kwargs)` como o SDK OpenAI.
+    """
+
+    def __init__(self, client, max_concurrency: int = 16, name: str = DEFAULT_BACKEND,
+                 min_concurrency: int = 1):
+        self.name = name
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.scheduler = LLMScheduler(max_concurrency, min_concurrency, name=name)
+        self.chat = types.SimpleNamespace(completions=_Completions(self))
+
+
+def build_openai_client(base_url: Optional[str] = None, timeout: Optional[float] = None,
+                        max_connections: Optional[int] = None, max_retries: Optional[int] = None):
+    """
+    Cria um cliente OpenAI com pool HTTP keep-alive dimensionado.
+
+    Os parâmetros ausentes são lidos das variáveis de ambiente `LLM_*`.
+    """
+    import httpx
+    from openai import DefaultHttpxClient, OpenAI
+
+    max_connections = max_connections or _env_int("LLM_MAX_CONNECTIONS", 20)
+    timeout = timeout or _env_float("LLM_TIMEOUT", 60.0)
+    http_client = DefaultHttpxClient(
+        limits=httpx.Limits(max_connections=max_connections,
+                            max_keepalive_connections=max_connections,
+                            keepalive_expiry=60.0),
+        timeout=httpx.Timeout(timeout, connect=_env_float("LLM_CONNECT_TIMEOUT", 10.0)),
+    )
+    return OpenAI(
+        base_url=base_url or os.environ.get("LLM_BASE_URL") or None,
+        max_retries=max_retries if max_retries is not None else _env_int("LLM_MAX_RETRIES", 0),
+        http_client=http_client,
+    )
+
+
+def get_backend(name: str = DEFAULT_BACKEND, fallback_to_offline: bool = False) -> LLMBackend:
+    """
+    Retorna o backend compartilhado `name`, criando-o na primeira chamada.
+
+    O backend simulado fica registrado à parte, como `OFFLINE_BACKEND`: a
+    falha de um chamador com fallback não contamina `name` para os demais,
+    que continuam recebendo o erro de inicialização.
+
+    Args:
+        name: Identificador do backend (um pool e um limite por nome)
+        fallback_to_offline: Devolve o backend `OfflineClient` se o cliente
+                             real não puder ser criado (ex.: sem OPENAI_API_KEY)
+    """
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is not None:
+            return backend
+        if name == OFFLINE_BACKEND:
+            client = OfflineClient()
+        else:
+            try:
+                client = build_openai_client()
+            except Exception as e:
+                if not fallback_to_offline:
+                    raise
+                backend = _backends.get(OFFLINE_BACKEND)
+                if backend is None:
+                    print(f"Erro ao inicializar o cliente OpenAI: {e}")
+                    print("Usando respostas simuladas (OfflineClient).")
+                    backend = _backends[OFFLINE_BACKEND] = _new_backend(OfflineClient(), OFFLINE_BACKEND)
+                return backend
+        backend = _backends[name] = _new_backend(client, name)
+        return backend
+
+
+def _new_backend(client, name: str) -> LLMBackend:
+    return LLMBackend(client, _env_int("LLM_MAX_CONCURRENCY", 16), name,
+                      min_concurrency=_env_int("LLM_MIN_CONCURRENCY", 1))
+
+
+def register_backend(backend: LLMBackend) -> None:
+    """Registra (ou substitui) um backend, útil para testes e benchmarks."""
+    with _backends_lock:
+        _backends[backend.name] = backend
+
+
+# --- Respostas simuladas ---
+
+def _simulated_papp(user_prompt: str) -> Dict:
+    match = re.search(r"Perfil: ([^,]+)", user_prompt)
+    perfil = match.group(1) if match else "Desconhecido"
+    return {
+        "title": f"Plano de Ação (Simulado) para Perfil {perfil}",
+        "introduction": "Este é um plano de ação simulado. Para um plano real, configure a chave da API OpenAI.",
+        "days": [
+            {"day": 1, "theme": "Foco na Atenção", "task": "Simulação: Revise anotações usando cores e diagramas (Visual)."},
+            {"day": 2, "theme": "Processamento Auditivo", "task": "Simulação: Transforme o conteúdo do dia 1 em um podcast curto (Auditivo)."},
+            {"day": 3, "theme": "Aprendizagem Ativa", "task": "Simulação: Construa um modelo físico ou faça um role-play (Cinestésico)."},
+            {"day": 4, "theme": "Revisão e Conexão", "task": "Simulação: Escreva um resumo à mão (Leitura/Escrita)."},
+            {"day": 5, "theme": "Feedback e Ajuste", "task": "Simulação: Peça a um amigo para testar seu conhecimento (Interpessoal)."},
+            {"day": 6, "theme": "Processamento Profundo", "task": "Simulação: Crie uma metáfora complexa para o tema (Elaboração)."},
+            {"day": 7, "theme": "Consolidação", "task": "Simulação: Medite sobre o que aprendeu, focando na emoção (Emocional/Cognitivo)."}
+        ]
+    }
+
+
+def _simulated_sentiment(text: str) -> Dict:
+    # Pseudoaleatório estável por texto: o mesmo texto recebe sempre o mesmo score
+    rng = random.Random(text)
+    score = round(rng.uniform(-1, 1), 2)
+    return {
+        "sentiment": "positive" if score > 0.2 else "negative" if score < -0.2 else "neutral",
+        "score": score,
+        "intensity": "high" if abs(score) >= 0.7 else "medium" if abs(score) >= 0.35 else "low",
+        "keywords": text.split()[:3],
+        "insights": "Resposta simulada.",
+        "tone": "neutro",
+        "confidence": round(rng.uniform(0.5, 1), 2)
+    }
+
+
+def simulated_content(messages: List[Dict]) -> str:
+    """
+    Gera o conteúdo de resposta simulado para um pedido de chat.
+
+    Reconhece os prompts de PAPP, de sentimento (individual e empacotado);
+    qualquer outro pedido recebe um objeto JSON vazio.
+    """
+    system = messages[0]["content"] if messages else ""
+    user = messages[-1]["content"] if messages else ""
+    if "PAPP" in system:
+        return json.dumps(_simulated_papp(user), ensure_ascii=False)
+    if "sentimento" in user:
+        items = [json.loads(line) for line in user.splitlines() if line.startswith('{"id"')]
+        if items:
+            results = [dict(_simulated_sentiment(item["text"]), id=item["id"]) for item in items]
+            return json.dumps({"results": results}, ensure_ascii=False)
+        match = re.search(r'^"(.*)"$', user, re.MULTILINE)
+        return json.dumps(_simulated_sentiment(match.group(1) if match else user), ensure_ascii=False)
+    return "{}"
+
+
+def _completion_object(content: str, model: str) -> types.SimpleNamespace:
+    message = types.SimpleNamespace(role="assistant", content=content)
+    usage = types.SimpleNamespace(prompt_tokens=0, completion_tokens=len(content) // 4,
+                                  total_tokens=len(content) // 4)
+    return types.SimpleNamespace(
+        id=f"chatcmpl-{uuid.uuid4().hex}", model=model, usage=usage,
+        choices=[types.SimpleNamespace(index=0, message=message, finish_reason="stop")],
+    )
+
+
+def _stream_chunks(content: str, chunk_size: int = 16):
+    for start in range(0, len(content), chunk_size):
+        delta = types.SimpleNamespace(content=content[start:start + chunk_size])
+        yield types.SimpleNamespace(choices=[types.SimpleNamespace(index=0, delta=delta)])
+
+
+class OfflineClient:
+    """Cliente sem rede com a interface do SDK, usando `simulated_content`."""
+
+    def __init__(self):
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        content = simulated_content(kwargs.get("messages", []))
+        if kwargs.get("stream"):
+            return _stream_chunks(content)
+        return _completion_object(content, kwargs.get("model", "offline"))
+
+
+# --- Servidor local que imita a API de chat completions ---
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        settings = self.server.settings
+        time.sleep(max(0.0, random.gauss(settings["latency_ms"], settings["jitter_ms"])) / 1000)
+        if random.random() < settings["error_rate"]:
+            status = random.choice((429, 500, 503))
+            self._send_json(status, {"error": {"message": "erro simulado", "type": "stand_in", "code": status}})
+            return
+
+        content = simulated_content(request.get("messages", []))
+        model = request.get("model", "stand-in")
+        if not request.get("stream"):
+            completion = {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": length // 4, "completion_tokens": len(content) // 4,
+                          "total_tokens": (length + len(content)) // 4},
+            }
+            self._send_json(200, completion)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        for start in range(0, len(content), 16):
+            chunk = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + 16]}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def serve_stand_in(host: str = "127.0.0.1", port: int = 8089, latency_ms: float = 200.0,
+                   jitter_ms: float = 50.0, error_rate: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Cria o servidor local de chat completions (chame `serve_forever()`).
+
+    Args:
+        latency_ms: Latência média simulada por requisição
+        jitter_ms: Desvio padrão da latência
+        error_rate: Fração de requisições respondidas com 429/5xx
+    """
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.settings = {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "error_rate": error_rate}
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend de LLM compartilhado do ComunicaPro")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="Sobe o servidor local que imita a API")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8089)
+    serve_parser.add_argument("--latency-ms", type=float, default=200.0)
+    serve_parser.add_argument("--jitter-ms", type=float, default=50.0)
+    serve_parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = serve_stand_in(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Servidor local de chat completions em http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Escalonador de prioridade com concorrência adaptativa para a cota do LLM.
+
+Todas as chamadas de um backend passam pelo `LLMScheduler`:
+
+- Duas faixas de prioridade: "interactive" (PAPP e pedidos de usuários)
+  sempre é atendida antes de "batch" (lotes de sentimento, pipeline). A
+  faixa batch nunca ocupa mais que `batch_share` das vagas, de modo que
+  um pedido interativo não espera um lote inteiro terminar.
+- Prazo por requisição: quem não consegue vaga até o prazo recebe
+  `DeadlineExceeded` em vez de ficar preso na fila.
+- Limite adaptativo AIMD: cada sucesso aumenta o limite em ~1 por
+  "janela" (1/limite por resposta) e cada 429/503 o multiplica por
+  `decrease_factor` (no máximo uma redução por `cooldown` segundos).
+
+O tempo de espera na fila é registrado por faixa no histograma
+`llm_queue_wait_seconds`.
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from metrics import counter, histogram
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITIES = {PRIORITY_INTERACTIVE: 0, PRIORITY_BATCH: 1}
+_LANES = {rank: lane for lane, rank in PRIORITIES.items()}
+
+# Status HTTP tratados como sinal de sobrecarga da cota
+OVERLOAD_STATUSES = (429, 503)
+
+QUEUE_WAIT = histogram("llm_queue_wait_seconds", "Espera na fila do escalonador do LLM")
+DEADLINES_EXCEEDED = counter("llm_deadline_exceeded", "Requisições que não conseguiram vaga no prazo")
+CONCURRENCY_CHANGES = counter("llm_concurrency_changes", "Ajustes do limite adaptativo (increase/decrease)")
+
+
+class DeadlineExceeded(TimeoutError):
+    """A requisição não obteve vaga no LLM antes do prazo."""
+
+
+def is_overload(exc: BaseException) -> bool:
+    """Indica se o erro sinaliza cota esgotada ou servidor sobrecarregado."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status in OVERLOAD_STATUSES
+
+
+class LLMScheduler:
+    """
+    Fila de prioridade com limite de concorrência AIMD.
+    """
+
+    def __init__(self, max_concurrency: int = 16, min_concurrency: int = 1,
+                 initial_concurrency: Optional[int] = None, batch_share: float = 0.75,
+                 decrease_factor: float = 0.5, cooldown: float = 2.0, name: str = "llm"):
+        """
+        Args:
+            max_concurrency: Teto do limite adaptativo
+            min_concurrency: Piso do limite adaptativo
+            initial_concurrency: Limite inicial (padrão: `max_concurrency`)
+            batch_share: Fração máxima das vagas que a faixa batch pode ocupar
+            decrease_factor: Fator multiplicativo aplicado a cada sobrecarga
+            cooldown: Intervalo mínimo entre duas reduções (segundos)
+            name: Nome usado nas métricas
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.batch_share = batch_share
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._limit = float(initial_concurrency or max_concurrency)
+        self._in_flight = {lane: 0 for lane in PRIORITIES}
+        self._queue = []  # (prioridade, ordem de chegada) dos que esperam
+        self._counter = itertools.count()
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Vagas simultâneas atuais."""
+        return max(self.min_concurrency, int(self._limit))
+
+    def _lane_limit(self, lane: str) -> int:
+        if lane == PRIORITY_BATCH:
+            return max(1, int(self.limit * self.batch_share))
+        return self.limit
+
+    def _can_start(self, lane: str, entry) -> bool:
+        total = sum(self._in_flight.values())
+        if total >= self.limit or self._in_flight[lane] >= self._lane_limit(lane):
+            return False
+        # Respeita a ordem da fila, exceto quando a cabeça está barrada pela cota da própria faixa
+        for head in sorted(self._queue):
+            if head == entry:
+                return True
+            head_lane = _LANES[head[0]]
+            if self._in_flight[head_lane] < self._lane_limit(head_lane):
+                return False
+        return True
+
+    def acquire(self, priority: str = PRIORITY_BATCH, deadline: Optional[float] = None) -> str:
+        """
+        Espera uma vaga na faixa `priority`.
+
+        Args:
+            priority: "interactive" ou "batch"
+            deadline: Segundos máximos de espera na fila (None = sem prazo)
+
+        Returns:
+            A faixa ocupada (passar para `release`)
+
+        Raises:
+            DeadlineExceeded: Se a vaga não sair dentro do prazo
+            ValueError: Prioridade desconhecida
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Prioridade desconhecida: {priority}")
+        start = time.monotonic()
+        expires = start + deadline if deadline is not None else None
+        entry = (PRIORITIES[priority], next(self._counter))
+        with self._cond:
+            self._queue.append(entry)
+            try:
+                while not self._can_start(priority, entry):
+                    remaining = None if expires is None else expires - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        DEADLINES_EXCEEDED.inc(name=self.name, lane=priority)
+                        raise DeadlineExceeded(
+                            f"Sem vaga no LLM após {deadline:.1f}s (faixa {priority})")
+                    self._cond.wait(remaining)
+                self._in_flight[priority] += 1
+            finally:
+                self._queue.remove(entry)
+                # A saída da fila (com ou sem vaga) pode liberar quem estava atrás
+                self._cond.notify_all()
+        QUEUE_WAIT.observe(time.monotonic() - start, name=self.name, lane=priority)
+        return priority
+
+    def release(self, priority: str, overloaded: bool = False, succeeded: bool = True) -> None:
+        """
+        Libera a vaga e ajusta o limite.
+
+        Args:
+            priority: Faixa devolvida por `acquire`
+            overloaded: A chamada recebeu 429/503 (redução multiplicativa)
+            succeeded: A chamada terminou bem (aumento aditivo)
+        """
+        with self._cond:
+            self._in_flight[priority] -= 1
+            now = time.monotonic()
+            if overloaded:
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(self.min_concurrency, self._limit * self.decrease_factor)
+                    self._last_decrease = now
+                    CONCURRENCY_CHANGES.inc(name=self.name, direction="decrease")
+            elif succeeded and self._limit < self.max_concurrency:
+                before = self.limit
+                self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+                if self.limit > before:
+                    CONCURRENCY_CHANGES.inc(name=self.name, direction="increase")
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: str = PRIORITY_BATCH, deadline: Optional[float] = None):
+        """
+        Ocupa uma vaga durante o bloco `with`.
+
+        Erros de sobrecarga (429/503) reduzem o limite; outros erros
+        apenas liberam a vaga.
+        """
+        lane = self.acquire(priority, deadline)
+        try:
+            yield
+        except BaseException as e:
+            self.release(lane, overloaded=is_overload(e), succeeded=False)
+            raise
+        self.release(lane)
+
+    def stats(self) -> Dict:
+        """Limite atual, vagas ocupadas e fila por faixa."""
+        with self._cond:
+            queued = {lane: 0 for lane in PRIORITIES}
+            for priority, _ in self._queue:
+                queued[_LANES[priority]] += 1
+            return {"limit": self.limit, "in_flight": dict(self._in_flight), "queued": queued}
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Worker persistente do ComunicaPro.
+
+Mantém um único processo com o SDK OpenAI importado, os clientes criados
+e os caches (respostas, planos PAPP, léxico) aquecidos, atendendo
+requisições por um socket Unix. Scripts de cron e shell usam o cliente
+leve `worker_client.py` e deixam de pagar a inicialização a cada chamada.
+
+Uso:
+    python3 scripts/llm_worker.py [--socket /tmp/comunicapro-worker.sock]
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import generate_papp
+from llm_scheduler import PRIORITY_INTERACTIVE
+from response_cache import ResponseCache
+from sentiment_analysis import SentimentAnalyzer
+from sentiment_lexicon import LexiconScorer
+from worker_client import DEFAULT_SOCKET_PATH
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class WorkerState:
+    """Recursos de longa duração compartilhados entre as conexões."""
+
+    def __init__(self):
+        # Sem credenciais o worker sobe mesmo assim, com respostas simuladas,
+        # como `generate_papp`: léxico, PAPP e relatórios continuam atendendo
+        self.analyzer = SentimentAnalyzer(cache=ResponseCache(), lexicon=LexiconScorer(),
+                                          fallback_to_offline=True)
+        # Pedidos avulsos vêm de usuários esperando a resposta: faixa interativa,
+        # com o mesmo cache, léxico e agrupamento do analisador de lotes
+        self.interactive_analyzer = SentimentAnalyzer(cache=self.analyzer.cache, lexicon=self.analyzer.lexicon,
+                                                      single_flight=self.analyzer.single_flight,
+                                                      priority=PRIORITY_INTERACTIVE, fallback_to_offline=True)
+        self.started_at = datetime.now().isoformat()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def handle(self, op: str, args: dict):
+        with self._lock:
+            self.requests += 1
+        if op == "ping":
+            return {"pong": True, "started_at": self.started_at}
+        if op == "shutdown":
+            return {"shutdown": True}
+        if op == "analyze":
+            return self.interactive_analyzer.analyze(args["text"], bypass_cache=args.get("bypass_cache", False))
+        if op == "batch_analyze":
+            return self.analyzer.batch_analyze(args["texts"],
+                                               bypass_cache=args.get("bypass_cache", False),
+                                               pack_token_budget=args.get("pack_token_budget"))
+        if op == "papp":
+            return generate_papp.generate_papp(args["profile"], bypass_cache=args.get("bypass_cache", False))
+        if op == "report":
+            return self.report(args.get("kind"), args.get("input"), args.get("output"))
+        if op == "stats":
+            return {
+                "started_at": self.started_at,
+                "requests": self.requests,
+                "routing": self.routing_stats(),
+                "sentiment_cache": self.analyzer.cache.stats(),
+                "papp_cache": generate_papp.get_papp_cache().stats(),
+            }
+        raise ValueError(f"Operação desconhecida: {op}")
+
+    def routing_stats(self) -> dict:
+        """Roteamento léxico/LLM somado das duas faixas."""
+        local = llm = 0
+        for analyzer in (self.interactive_analyzer, self.analyzer):
+            stats = analyzer.get_routing_stats()
+            local += stats["local"]
+            llm += stats["llm"]
+        total = local + llm
+        return {"local": local, "llm": llm, "local_percentage": (local / total * 100) if total else 0}
+
+    def report(self, kind: str, input_path: str = None, output_path: str = None) -> dict:
+        today = datetime.now().strftime("%Y%m%d")
+        if kind == "market_summary":
+            from generate_market_summary import generate_summary
+            input_path = input_path or os.path.join(PROJECT_ROOT, 'research_data', 'market_statistics.json')
+            output_path = output_path or os.path.join(PROJECT_ROOT, 'research_findings', f'market_summary_{today}.md')
+            return {"message": generate_summary(input_path, output_path), "output": output_path}
+        if kind == "market_analysis":
+            from analyze_market_data import analyze_market_data
+            input_path = input_path or os.path.join(PROJECT_ROOT, 'research_data', 'market_insights_30oct2025.json')
+            output_path = output_path or os.path.join(PROJECT_ROOT, 'research_data', 'market_analysis_30oct2025.md')
+            analyze_market_data(input_path, output_path)
+            return {"output": output_path}
+        if kind == "daily_summary":
+            import daily_update
+            summary = daily_update.generate_markdown_summary(daily_update.load_latest_trends())
+            return {"output": daily_update.update_research_findings(summary)}
+        raise ValueError(f"Relatório desconhecido: {kind}")
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    """Atende uma conexão: uma linha JSON de requisição por linha de resposta."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                op = request.get("op")
+                result = self.server.state.handle(op, request.get("args") or {})
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                op = None
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if op == "shutdown":
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+def socket_in_use(socket_path: str) -> bool:
+    """
+    Indica se algum processo está atendendo no socket `socket_path`.
+
+    Só conexão recusada (socket órfão) ou arquivo inexistente contam como
+    livre; qualquer outro erro, como falta de permissão, é propagado para
+    que o chamador não apague o socket ativo de outro usuário.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+
+class WorkerServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        """
+        Raises:
+            RuntimeError: Já existe um worker atendendo em `socket_path`, ou
+                          não foi possível confirmar que o socket está órfão
+        """
+        if os.path.exists(socket_path):
+            try:
+                in_use = socket_in_use(socket_path)
+            except OSError as e:
+                raise RuntimeError(f"Não foi possível verificar o socket {socket_path}: {e}") from e
+            if in_use:
+                raise RuntimeError(f"Já existe um worker ativo em {socket_path}")
+            # Socket órfão de uma execução anterior
+            os.unlink(socket_path)
+        # O socket já nasce com permissão 0600: não há janela entre o bind e um chmod
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, WorkerHandler)
+        finally:
+            os.umask(previous_umask)
+        self.socket_path = socket_path
+        self.state = WorkerState()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker persistente do ComunicaPro")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Caminho do socket Unix")
+    args = parser.parse_args()
+
+    try:
+        server = WorkerServer(args.socket)
+    except RuntimeError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    print(f"Worker ComunicaPro ouvindo em {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Worker encerrado.")
+
+
+if __name__ == "__main__":
+    main()
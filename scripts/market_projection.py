@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Projeções de tamanho de mercado e análise de sensibilidade Monte Carlo.
+
+A partir de um snapshot de mercado, monta para cada mercado o tamanho base
+(último ano observado até a data do snapshot), o CAGR (informado ou
+implícito entre dois tamanhos observados) e o horizonte da projeção. As
+projeções ano a ano de todos os mercados saem de uma única operação
+vetorizada com NumPy. A sensibilidade sorteia o CAGR de cada mercado
+(normal em torno do valor central) e, opcionalmente, o tamanho base
+(log-normal), e resume as trajetórias em faixas de percentis.
+
+Quando o CAGR informado diverge do implícito entre dois tamanhos
+observados, o mercado é sinalizado (`implied_cagr_percent`) e o desvio do
+CAGR é ampliado para que a faixa P5–P95 cubra os dois valores.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from market_store import CAGR_METRIC, MARKET_SECTIONS, SIZE_METRIC, extract_observations, market_id
+
+MONTE_CARLO_DRAWS = 1_000_000
+# Sorteios usados nos relatórios: os percentis P5/P50/P95 já ficam estáveis
+# na segunda casa decimal, a uma fração do custo de `MONTE_CARLO_DRAWS`
+REPORT_MONTE_CARLO_DRAWS = 20_000
+DEFAULT_PERCENTILES = (5, 50, 95)
+# Incerteza padrão do CAGR (pontos percentuais) quando há uma única fonte
+DEFAULT_CAGR_STDDEV = 2.0
+# Quantil 95% da normal padrão (metade da faixa P5–P95 em desvios)
+_Z_95 = 1.6448536269514722
+
+
+def markets_from_snapshot(data: Dict, snapshot_year: Optional[int] = None) -> List[Dict]:
+    """
+    Extrai os parâmetros de projeção de cada mercado de um snapshot.
+
+    Valores repetidos para o mesmo ano/métrica (várias fontes) são
+    combinados pela mediana; a dispersão entre CAGRs de fontes diferentes
+    vira a incerteza do mercado quando supera `DEFAULT_CAGR_STDDEV`. Um
+    CAGR informado que diverge do implícito nos tamanhos por mais que essa
+    incerteza é sinalizado e alarga a incerteza até cobrir o implícito.
+
+    Args:
+        data: Snapshot JSON já carregado
+        snapshot_year: Ano de referência do snapshot (padrão: campo `date`/`last_updated`)
+
+    Returns:
+        Lista de dicts com market, title, base_year, base_size, target_year,
+        cagr_percent, cagr_stddev e, em divergências, implied_cagr_percent
+    """
+    if snapshot_year is None:
+        stamp = str(data.get('date') or data.get('last_updated') or '')
+        snapshot_year = int(stamp[:4]) if stamp[:4].isdigit() else None
+
+    titles = {}
+    for section in MARKET_SECTIONS:
+        for name, fields in (data.get(section) or {}).items():
+            if isinstance(fields, dict) and fields.get('title'):
+                titles[market_id(name)] = fields['title']
+
+    sizes, cagrs = {}, {}
+    for market, (metric, year, value, _) in extract_observations(data):
+        if metric == SIZE_METRIC:
+            sizes.setdefault(market, {}).setdefault(year, []).append(value)
+        elif metric == CAGR_METRIC:
+            cagrs.setdefault(market, []).append(value)
+
+    markets = []
+    for market, by_year in sizes.items():
+        years = sorted(by_year)
+        observed = [y for y in years if snapshot_year is None or y <= snapshot_year]
+        base_year = observed[-1] if observed else years[0]
+        target_year = years[-1]
+        base_size = float(np.median(by_year[base_year]))
+        if base_size <= 0:
+            continue
+
+        implied = None
+        if target_year > base_year:
+            target_size = float(np.median(by_year[target_year]))
+            implied = ((target_size / base_size) ** (1 / (target_year - base_year)) - 1) * 100
+        reported = cagrs.get(market, [])
+        if reported:
+            cagr = float(np.median(reported))
+        elif implied is not None:
+            cagr = implied
+        else:
+            continue
+        spread = float(np.std(reported)) if len(reported) > 1 else 0.0
+        entry = {
+            "market": market,
+            "title": titles.get(market, market),
+            "base_year": base_year,
+            "base_size": base_size,
+            "target_year": max(target_year, base_year + 1),
+            "cagr_percent": round(cagr, 2),
+            "cagr_stddev": max(DEFAULT_CAGR_STDDEV, spread),
+        }
+        if implied is not None and abs(implied - cagr) > entry["cagr_stddev"]:
+            entry["implied_cagr_percent"] = round(implied, 2)
+            entry["cagr_stddev"] = abs(implied - cagr) / _Z_95
+        markets.append(entry)
+    return markets
+
+
+def projection_years(markets: Sequence[Dict]) -> np.ndarray:
+    """Grade comum de anos (do menor ano base ao maior horizonte)."""
+    return np.arange(min(m["base_year"] for m in markets), max(m["target_year"] for m in markets) + 1)
+
+
+def project_sizes(base_sizes, cagr_percent, base_years, years) -> np.ndarray:
+    """
+    Projeta os tamanhos de todos os mercados em todos os anos de uma vez.
+
+    Args:
+        base_sizes: Tamanho base por mercado, shape (M,)
+        cagr_percent: CAGR por mercado em %, shape (M,)
+        base_years: Ano base por mercado, shape (M,)
+        years: Anos da projeção, shape (Y,)
+
+    Returns:
+        Matriz (M, Y); anos anteriores ao ano base de cada mercado ficam NaN
+    """
+    base_sizes = np.asarray(base_sizes, dtype=np.float64)[:, None]
+    growth = 1 + np.asarray(cagr_percent, dtype=np.float64)[:, None] / 100
+    elapsed = np.asarray(years)[None, :] - np.asarray(base_years)[:, None]
+    sizes = base_sizes * growth ** elapsed
+    return np.where(elapsed >= 0, sizes, np.nan)
+
+
+def monte_carlo_bands(base_sizes, cagr_percent, base_years, years, cagr_stddev=DEFAULT_CAGR_STDDEV,
+                      size_rel_stddev: float = 0.0, draws: int = MONTE_CARLO_DRAWS,
+                      percentiles: Sequence[float] = DEFAULT_PERCENTILES, seed: int = 42) -> np.ndarray:
+    """
+    Faixas de percentis dos tamanhos projetados sob incerteza do CAGR e do tamanho base.
+
+    O CAGR de cada mercado é sorteado de uma normal (média `cagr_percent`,
+    desvio `cagr_stddev` em pontos percentuais, truncada acima de -100%) e o
+    tamanho base de uma log-normal com desvio relativo `size_rel_stddev`.
+    Sem incerteza no tamanho base, o tamanho em cada ano é monotônico no
+    CAGR e os percentis saem dos quantis do CAGR sorteado; caso contrário,
+    os quantis são calculados ano a ano no espaço logarítmico.
+
+    Returns:
+        Array (M, P, Y) com os percentis por mercado e ano (NaN antes do ano base)
+    """
+    rng = np.random.default_rng(seed)
+    base_sizes = np.asarray(base_sizes, dtype=np.float64)
+    cagr_percent = np.asarray(cagr_percent, dtype=np.float64)
+    cagr_stddev = np.broadcast_to(np.asarray(cagr_stddev, dtype=np.float64), cagr_percent.shape)
+    elapsed = np.asarray(years)[None, :] - np.asarray(base_years)[:, None]
+    quantiles = np.asarray(percentiles, dtype=np.float64) / 100
+    bands = np.empty((len(base_sizes), len(quantiles), elapsed.shape[1]))
+
+    for m in range(len(base_sizes)):
+        growth = np.log1p(np.maximum(rng.normal(cagr_percent[m], cagr_stddev[m], draws) / 100, -0.99))
+        if not size_rel_stddev:
+            # log(tamanho) = log(base) + t * log(1 + g) é crescente em g para t >= 0
+            bands[m] = base_sizes[m] * np.exp(np.quantile(growth, quantiles)[:, None] * elapsed[m][None, :])
+            continue
+        log_base = math.log(base_sizes[m]) + rng.normal(
+            -size_rel_stddev ** 2 / 2, size_rel_stddev, draws)
+        for y, t in enumerate(elapsed[m]):
+            if t < 0:
+                continue
+            bands[m, :, y] = np.exp(np.quantile(log_base + t * growth, quantiles))
+
+    bands[np.broadcast_to((elapsed < 0)[:, None, :], bands.shape)] = np.nan
+    return bands
+
+
+def run_projections(data: Dict, draws: int = MONTE_CARLO_DRAWS,
+                    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                    size_rel_stddev: float = 0.0, seed: int = 42) -> Optional[Dict]:
+    """
+    Executa projeções e sensibilidade para todos os mercados de um snapshot.
+
+    Returns:
+        Dict com markets, years, sizes (M, Y), percentiles e bands (M, P, Y),
+        ou None se o snapshot não tiver mercados projetáveis
+    """
+    markets = markets_from_snapshot(data)
+    if not markets:
+        return None
+    years = projection_years(markets)
+    columns = {key: [m[key] for m in markets] for key in ("base_size", "cagr_percent", "base_year", "cagr_stddev")}
+    return {
+        "markets": markets,
+        "years": years,
+        "sizes": project_sizes(columns["base_size"], columns["cagr_percent"], columns["base_year"], years),
+        "percentiles": tuple(percentiles),
+        "bands": monte_carlo_bands(columns["base_size"], columns["cagr_percent"], columns["base_year"], years,
+                                   cagr_stddev=columns["cagr_stddev"], size_rel_stddev=size_rel_stddev,
+                                   draws=draws, percentiles=percentiles, seed=seed),
+    }
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazém de séries temporais dos snapshots de mercado em `research_data/`.
+
+Os arquivos JSON datados (`market_insights_*.json`, `market_statistics.json`,
+`market_data_*.json`...) têm formatos diferentes. A ingestão normaliza todos
+eles em uma única tabela SQLite de observações indexada por mercado,
+métrica e data do snapshot, para que relatórios e dashboards consultem
+séries ("CAGR do mercado X em todos os snapshots") sem reler JSON.
+
+Cada snapshot precisa de uma data explícita, no conteúdo (`date`,
+`last_updated`) ou no nome do arquivo (`_2025_11_11`, `_20251111`,
+`_30oct2025`); arquivos sem data são rejeitados em vez de datados pelo
+mtime, que muda a cada checkout ou cópia.
+
+Métricas normalizadas:
+    size_billion_usd   Tamanho do mercado em bilhões de USD (`year` = ano de referência)
+    cagr_percent       CAGR em % (`year` = ano final da janela, quando informado)
+
+Uso:
+    python3 scripts/market_store.py ingest
+    python3 scripts/market_store.py query personality_assessment_solutions cagr_percent
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+DEFAULT_DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'research_data')
+DEFAULT_STORE_PATH = os.path.join(SCRIPT_DIR, '.cache', 'market_store.sqlite')
+
+SIZE_METRIC = "size_billion_usd"
+CAGR_METRIC = "cagr_percent"
+
+# Seções de mercado conhecidas: chave do snapshot com um dict {mercado: campos}
+MARKET_SECTIONS = ("market_insights", "market_data", "market_statistics")
+
+# Nomes distintos usados para o mesmo mercado entre snapshots
+MARKET_ALIASES = {
+    "personality_assessment": "personality_assessment_solutions",
+    "personality_assessment_solution": "personality_assessment_solutions",
+}
+
+_SIZE_KEY_RE = re.compile(
+    r"^(?:size|value|market_size|year)_(\d{4})(?:_projected)?(?:_(?:billion_usd|usd_billion|value|projection))?$"
+)
+_CAGR_KEY_RE = re.compile(r"^cagr(?:_(\d{4})_(\d{4}))?(?:_percent)*$")
+_DATE_VALUE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+_FILENAME_DATE_RES = (
+    re.compile(r"(?<!\d)(\d{4})[_-](\d{2})[_-](\d{2})(?!\d)"),           # 2025_11_11
+    re.compile(r"(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)"),                   # 20251111
+    re.compile(r"(?<![\da-z])(\d{1,2})([a-z]{3})(\d{4})(?!\d)", re.IGNORECASE),  # 30oct2025
+)
+_MONTHS = {name: number for number, names in enumerate(
+    [("jan",), ("feb", "fev"), ("mar",), ("apr", "abr"), ("may", "mai"), ("jun",), ("jul",),
+     ("aug", "ago"), ("sep", "set"), ("oct", "out"), ("nov",), ("dec", "dez")], start=1)
+    for name in names}
+# Versão do esquema: chaves por caminho relativo (antes: nome do arquivo)
+SCHEMA_VERSION = 1
+_AMOUNT_RE = re.compile(r"([\d.,]+)\s*(billion|million|bilh\w*|milh\w*)?", re.IGNORECASE)
+
+Observation = Tuple[str, Optional[int], float, Optional[str]]  # (métrica, ano, valor, fonte)
+
+
+def market_id(name: str) -> str:
+    """Normaliza o nome de um mercado para um identificador estável."""
+    slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+    slug = re.sub(r"^global_|_market$", "", slug)
+    return MARKET_ALIASES.get(slug, slug)
+
+
+def parse_amount(value) -> Optional[float]:
+    """
+    Converte valores numéricos ou textos como "USD 11.6 Billion", "663.9 Million"
+    ou "12.4%" em float (montantes em bilhões).
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = _AMOUNT_RE.search(value)
+    if not match:
+        return None
+    try:
+        number = float(match.group(1).replace(",", ""))
+    except ValueError:
+        return None
+    unit = (match.group(2) or "").lower()
+    if unit.startswith(("million", "milh")):
+        number = round(number / 1000, 6)
+    return number
+
+
+def _valid_date(year, month, day) -> Optional[str]:
+    try:
+        return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def snapshot_date(data: Dict, path: str) -> str:
+    """
+    Data do snapshot (AAAA-MM-DD): `date`, `last_updated` ou data no nome do arquivo.
+
+    Raises:
+        ValueError: O snapshot não informa data em nenhum dos dois lugares
+    """
+    for key in ("date", "last_updated"):
+        value = data.get(key)
+        match = _DATE_VALUE_RE.match(value) if isinstance(value, str) else None
+        if match and _valid_date(*match.groups()):
+            return match.group(0)
+    name = os.path.basename(path)
+    for pattern in _FILENAME_DATE_RES[:2]:
+        for match in pattern.finditer(name):
+            date = _valid_date(*match.groups())
+            if date:
+                return date
+    for day, month, year in _FILENAME_DATE_RES[2].findall(name):
+        date = _valid_date(year, _MONTHS.get(month.lower(), 0), day)
+        if date:
+            return date
+    raise ValueError(f"Snapshot sem data (campo `date`/`last_updated` ou data no nome): {name}")
+
+
+def relative_path(path: str) -> str:
+    """Chave do arquivo no armazém: caminho relativo à raiz do projeto."""
+    return os.path.relpath(os.path.abspath(path), PROJECT_ROOT)
+
+
+def _market_fields(fields: Dict, source: Optional[str]) -> Iterator[Observation]:
+    for key, value in fields.items():
+        size_match = _SIZE_KEY_RE.match(key)
+        cagr_match = _CAGR_KEY_RE.match(key)
+        if not size_match and not cagr_match:
+            continue
+        amount = parse_amount(value)
+        if amount is None:
+            continue
+        if size_match:
+            yield SIZE_METRIC, int(size_match.group(1)), amount, source
+        else:
+            end_year = cagr_match.group(2)
+            yield CAGR_METRIC, int(end_year) if end_year else None, amount, source
+
+
+def extract_observations(data: Dict) -> Iterator[Tuple[str, Observation]]:
+    """
+    Extrai (mercado, observação) de um snapshot em qualquer dos formatos conhecidos.
+
+    Arquivos sem seções de mercado (ex.: tendências diárias) não geram observações.
+    """
+    for section in MARKET_SECTIONS:
+        markets = data.get(section)
+        if not isinstance(markets, dict):
+            continue
+        for name, fields in markets.items():
+            if isinstance(fields, dict):
+                source = fields.get("source") or fields.get("cagr_source") or data.get("data_source")
+                for observation in _market_fields(fields, source):
+                    yield market_id(name), observation
+
+    # Formato "market_segment" + lista de fontes com detalhes textuais
+    segment = data.get("market_segment")
+    if segment and isinstance(data.get("data_sources"), list):
+        for entry in data["data_sources"]:
+            details = entry.get("details")
+            if isinstance(details, dict):
+                for observation in _market_fields(details, entry.get("source")):
+                    yield market_id(segment), observation
+
+
+class MarketStore:
+    """
+    Tabela de observações (snapshot, mercado, métrica, ano, valor, fonte) em SQLite.
+
+    Cada arquivo ingerido é registrado pelo caminho relativo à raiz do
+    projeto, com mtime/tamanho; a reingestão de um diretório só relê os
+    arquivos que mudaram.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS observations ("
+            " snapshot_date TEXT NOT NULL,"
+            " market TEXT NOT NULL,"
+            " metric TEXT NOT NULL,"
+            " year INTEGER,"
+            " value REAL NOT NULL,"
+            " source TEXT,"
+            " file TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_obs_series ON observations(market, metric, snapshot_date);"
+            "CREATE INDEX IF NOT EXISTS idx_obs_file ON observations(file);"
+            "CREATE TABLE IF NOT EXISTS files ("
+            " file TEXT PRIMARY KEY,"
+            " mtime REAL NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " snapshot_date TEXT NOT NULL);"
+        )
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Armazéns antigos usavam o nome do arquivo como chave: descarta e reingere
+            self._conn.execute("DELETE FROM observations")
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def ingest_file(self, path: str, force: bool = False) -> Optional[int]:
+        """
+        Ingere um snapshot JSON, substituindo observações anteriores do mesmo arquivo.
+
+        Returns:
+            Número de observações gravadas (None se o arquivo não mudou)
+
+        Raises:
+            ValueError: O snapshot não tem data explícita (ver `snapshot_date`)
+        """
+        name = relative_path(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute("SELECT mtime, size FROM files WHERE file = ?", (name,)).fetchone()
+        if not force and row == (stat.st_mtime, stat.st_size):
+            return None
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        date = snapshot_date(data, path)
+        rows = [
+            (date, market, metric, year, value, source, name)
+            for market, (metric, year, value, source) in extract_observations(data)
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM observations WHERE file = ?", (name,))
+                self._conn.executemany(
+                    "INSERT INTO observations (snapshot_date, market, metric, year, value, source, file)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (file, mtime, size, snapshot_date) VALUES (?, ?, ?, ?)",
+                    (name, stat.st_mtime, stat.st_size, date),
+                )
+        return len(rows)
+
+    def ingest_directory(self, data_dir: str = DEFAULT_DATA_DIR, pattern: str = "*.json",
+                         force: bool = False) -> Dict:
+        """
+        Ingere todos os snapshots de um diretório.
+
+        Returns:
+            Dict com arquivos lidos, ignorados (sem mudança), observações e falhas
+        """
+        report = {"ingested": 0, "unchanged": 0, "observations": 0, "failed": {}}
+        for path in sorted(glob.glob(os.path.join(data_dir, pattern))):
+            try:
+                count = self.ingest_file(path, force=force)
+            except (OSError, ValueError) as e:  # JSONDecodeError é um ValueError
+                report["failed"][relative_path(path)] = str(e)
+                continue
+            if count is None:
+                report["unchanged"] += 1
+            else:
+                report["ingested"] += 1
+                report["observations"] += count
+        return report
+
+    def series(self, market: str, metric: str, start: Optional[str] = None,
+               end: Optional[str] = None, year: Optional[int] = None) -> List[Dict]:
+        """
+        Série de uma métrica de um mercado ordenada por data do snapshot.
+
+        Args:
+            market: Identificador do mercado (aceita nomes não normalizados)
+            metric: `size_billion_usd` ou `cagr_percent`
+            start: Data inicial inclusiva (AAAA-MM-DD)
+            end: Data final inclusiva (AAAA-MM-DD)
+            year: Filtra pelo ano de referência da observação
+        """
+        query = ["SELECT snapshot_date, year, value, source, file FROM observations"
+                 " WHERE market = ? AND metric = ?"]
+        params = [market_id(market), metric]
+        if start:
+            query.append("AND snapshot_date >= ?")
+            params.append(start)
+        if end:
+            query.append("AND snapshot_date <= ?")
+            params.append(end)
+        if year is not None:
+            query.append("AND year = ?")
+            params.append(year)
+        query.append("ORDER BY snapshot_date, year")
+        with self._lock:
+            rows = self._conn.execute(" ".join(query), params).fetchall()
+        return [
+            {"snapshot_date": r[0], "year": r[1], "value": r[2], "source": r[3], "file": r[4]}
+            for r in rows
+        ]
+
+    def latest(self, market: str, metric: str) -> Optional[Dict]:
+        """Observação mais recente (último snapshot, maior ano) de uma métrica."""
+        rows = self.series(market, metric)
+        return max(rows, key=lambda r: (r["snapshot_date"], r["year"] or 0)) if rows else None
+
+    def markets(self) -> List[str]:
+        """Mercados presentes no armazém."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT market FROM observations ORDER BY market").fetchall()
+        return [r[0] for r in rows]
+
+    def metrics(self, market: str) -> List[str]:
+        """Métricas disponíveis para um mercado."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT metric FROM observations WHERE market = ? ORDER BY metric",
+                (market_id(market),),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Séries temporais dos snapshots de mercado")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Caminho do banco SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Ingere os snapshots JSON")
+    ingest_parser.add_argument("--dir", default=DEFAULT_DATA_DIR, help="Diretório dos snapshots")
+    ingest_parser.add_argument("--force", action="store_true", help="Relê arquivos não modificados")
+
+    subparsers.add_parser("markets", help="Lista mercados e métricas")
+
+    query_parser = subparsers.add_parser("query", help="Consulta a série de um mercado")
+    query_parser.add_argument("market")
+    query_parser.add_argument("metric", choices=[SIZE_METRIC, CAGR_METRIC])
+    query_parser.add_argument("--start", help="Data inicial (AAAA-MM-DD)")
+    query_parser.add_argument("--end", help="Data final (AAAA-MM-DD)")
+    query_parser.add_argument("--year", type=int, help="Ano de referência")
+
+    args = parser.parse_args()
+    store = MarketStore(args.store)
+    try:
+        if args.command == "ingest":
+            report = store.ingest_directory(args.dir, force=args.force)
+            print(f"{report['ingested']} arquivos ingeridos ({report['observations']} observações), "
+                  f"{report['unchanged']} sem alteração")
+            for name, error in report["failed"].items():
+                print(f"Erro em {name}: {error}")
+        elif args.command == "markets":
+            for market in store.markets():
+                print(f"{market}: {', '.join(store.metrics(market))}")
+        else:
+            rows = store.series(args.market, args.metric, args.start, args.end, args.year)
+            print(json.dumps(rows, indent=4, ensure_ascii=False))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentação leve dos scripts do ComunicaPro.
+
+Registra contadores (tokens, erros, falhas de JSON, retries, cache) e
+histogramas (latência das chamadas ao LLM, duração de etapas) em memória,
+sem dependências externas. Na saída do processo, as métricas podem ser
+exportadas como textfile do Prometheus (node_exporter textfile collector)
+e como resumo JSON, conforme as variáveis de ambiente:
+
+    COMUNICAPRO_METRICS_PROM   Caminho do arquivo .prom a gravar
+    COMUNICAPRO_METRICS_JSON   Caminho do resumo JSON a gravar
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+PREFIX = "comunicapro"
+
+# Limites (em segundos) dos buckets de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_metrics = {}
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> Tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: Tuple, extra: Tuple = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    """Contador monotônico com rótulos."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, value: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return "\n".join(lines)
+
+    def summary(self) -> Dict:
+        return {_format_labels(key) or "total": value for key, value in self.values.items()}
+
+
+class Histogram:
+    """Histograma de buckets fixos com rótulos."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with _lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            entry["counts"][index] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mede a duração do bloco `with` em segundos."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _quantile(self, entry: Dict, q: float) -> float:
+        target = q * entry["count"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), entry["counts"]):
+            cumulative += count
+            if cumulative >= target:
+                return bound if bound != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, entry in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry["counts"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, (('le', '+Inf'),))} {entry['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {entry['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {entry['count']}")
+        return "\n".join(lines)
+
+    def summary(self) -> Dict:
+        return {
+            _format_labels(key) or "total": {
+                "count": entry["count"],
+                "sum": round(entry["sum"], 6),
+                "mean": round(entry["sum"] / entry["count"], 6) if entry["count"] else 0,
+                # Percentis aproximados pelo limite superior do bucket
+                "p50": self._quantile(entry, 0.50),
+                "p95": self._quantile(entry, 0.95),
+                "p99": self._quantile(entry, 0.99),
+            }
+            for key, entry in self.values.items()
+        }
+
+
+def counter(name: str, help_text: str) -> Counter:
+    """Retorna (criando se necessário) o contador `comunicapro_<name>_total`."""
+    full_name = f"{PREFIX}_{name}_total"
+    with _lock:
+        metric = _metrics.get(full_name)
+        if metric is None:
+            metric = _metrics[full_name] = Counter(full_name, help_text)
+    return metric
+
+
+def histogram(name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    """Retorna (criando se necessário) o histograma `comunicapro_<name>`."""
+    full_name = f"{PREFIX}_{name}"
+    with _lock:
+        metric = _metrics.get(full_name)
+        if metric is None:
+            metric = _metrics[full_name] = Histogram(full_name, help_text, buckets)
+    return metric
+
+
+# Métricas compartilhadas pelos scripts
+LLM_LATENCY = histogram("llm_request_duration_seconds", "Latência das chamadas ao LLM")
+LLM_TOKENS = counter("llm_tokens", "Tokens consumidos nas chamadas ao LLM")
+LLM_ERRORS = counter("llm_errors", "Chamadas ao LLM que falharam")
+LLM_RETRIES = counter("llm_retries", "Novas tentativas após erros transitórios")
+JSON_PARSE_FAILURES = counter("json_parse_failures", "Respostas do LLM que não eram JSON válido")
+JSON_REPAIRS = counter("json_repairs", "Respostas do LLM aproveitadas após limpeza ou reparo do JSON")
+SCHEMA_REASKS = counter("schema_reasks", "Novas perguntas ao LLM restritas aos campos ausentes do esquema")
+CACHE_REQUESTS = counter("cache_requests", "Consultas ao cache por resultado (hit/miss)")
+STAGE_DURATION = histogram("stage_duration_seconds", "Duração das etapas dos scripts")
+
+
+@contextmanager
+def stage(name: str):
+    """Mede a duração de uma etapa nomeada (ex.: "corpus_batch")."""
+    with STAGE_DURATION.time(stage=name):
+        yield
+
+
+def render_prometheus() -> str:
+    """Renderiza todas as métricas no formato de exposição do Prometheus."""
+    with _lock:
+        metrics = list(_metrics.values())
+    return "\n".join(metric.render() for metric in metrics if metric.values) + "\n"
+
+
+def summary() -> Dict:
+    """Retorna um resumo JSON-serializável de todas as métricas."""
+    with _lock:
+        metrics = list(_metrics.values())
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "metrics": {metric.name: metric.summary() for metric in metrics if metric.values},
+    }
+
+
+def _write_atomic(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def export(prom_path: Optional[str] = None, json_path: Optional[str] = None) -> None:
+    """
+    Grava as métricas nos caminhos informados (ou nos das variáveis de ambiente).
+
+    A escrita é atômica para que o coletor nunca leia um arquivo pela metade.
+    """
+    prom_path = prom_path or os.environ.get("COMUNICAPRO_METRICS_PROM")
+    json_path = json_path or os.environ.get("COMUNICAPRO_METRICS_JSON")
+    if prom_path:
+        _write_atomic(prom_path, render_prometheus())
+    if json_path:
+        _write_atomic(json_path, json.dumps(summary(), indent=4, ensure_ascii=False))
+
+
+if os.environ.get("COMUNICAPRO_METRICS_PROM") or os.environ.get("COMUNICAPRO_METRICS_JSON"):
+    atexit.register(export)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detecção de quase-duplicatas entre insights diários com MinHash + LSH.
+
+Cada insight (título + resumo) vira um conjunto de shingles de palavras,
+resumido em uma assinatura MinHash calculada com NumPy. As assinaturas
+ficam em SQLite junto com as chaves de banda do LSH, de modo que um
+insight novo é comparado só com os candidatos que compartilham alguma
+banda, e o arquivo histórico persiste entre execuções do job diário.
+Apenas insights genuinamente novos seguem para resumo e análise de
+sentimento, sem pagar chamadas ao LLM por conteúdo já processado.
+
+"Visto" e "processado" são estados separados: `filter_new` arquiva os
+novos como pendentes, e só `mark_processed` (chamado depois que o
+processamento seguinte termina) os tira da fila. Um pendente que
+reaparece continua sendo tratado como novo, e `pending` devolve os
+pendentes arquivados para que um dia que falhou seja retomado mesmo que
+o snapshot seguinte não traga nada novo.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from keyword_index import normalize_keyword
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INDEX_PATH = os.path.join(SCRIPT_DIR, '.cache', 'near_duplicates.sqlite')
+
+NUM_PERM = 128
+LSH_BANDS = 32  # 32 bandas x 4 linhas: candidatos a partir de Jaccard ~0.4
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.7
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+# Permutações fixas: assinaturas gravadas continuam comparáveis entre execuções
+_PERM_A = _rng.randint(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+
+def insight_text(item: Dict) -> str:
+    """Texto comparado de um insight: título/nome + resumo/descrição."""
+    parts = [item.get(key) for key in ("title", "name", "summary", "description")]
+    return " ".join(part for part in parts if isinstance(part, str))
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """Shingles de `size` palavras do texto normalizado (sem acentos, caixa única)."""
+    words = re.findall(r"\w+", normalize_keyword(text))
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def minhash(text: str) -> np.ndarray:
+    """Assinatura MinHash (NUM_PERM valores uint32) do texto."""
+    values = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+         for s in set(shingles(text))),
+        dtype=np.uint64,
+    )
+    if not len(values):
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    permuted = (values[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def jaccard(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Similaridade de Jaccard estimada entre duas assinaturas."""
+    return float(np.mean(signature_a == signature_b))
+
+
+def band_keys(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    """Chaves (banda, hash da faixa) usadas como buckets do LSH."""
+    rows = NUM_PERM // LSH_BANDS
+    return [
+        (band, hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest())
+        for band in range(LSH_BANDS)
+    ]
+
+
+class DuplicateIndex:
+    """
+    Arquivo persistente de assinaturas MinHash com consulta por LSH.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Args:
+            path: Caminho do arquivo SQLite (":memory:" para índice volátil)
+            threshold: Jaccard estimado mínimo para considerar duplicata
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS signatures ("
+            " key TEXT PRIMARY KEY,"
+            " signature BLOB NOT NULL,"
+            " source TEXT,"
+            " created_at REAL NOT NULL,"
+            " processed_at REAL,"
+            " payload TEXT);"
+            "CREATE TABLE IF NOT EXISTS bands ("
+            " band INTEGER NOT NULL,"
+            " bucket BLOB NOT NULL,"
+            " key TEXT NOT NULL,"
+            " PRIMARY KEY (band, bucket, key)) WITHOUT ROWID;"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(signatures)")]
+        if "processed_at" not in columns:
+            # Arquivos antigos não distinguiam os estados: tudo já arquivado conta como processado
+            self._conn.execute("ALTER TABLE signatures ADD COLUMN processed_at REAL")
+            self._conn.execute("UPDATE signatures SET processed_at = created_at")
+        if "payload" not in columns:
+            self._conn.execute("ALTER TABLE signatures ADD COLUMN payload TEXT")
+        self._conn.commit()
+
+    @staticmethod
+    def content_key(text: str) -> str:
+        """Chave estável do conteúdo normalizado (duplicatas exatas colidem)."""
+        return hashlib.sha256(normalize_keyword(text).encode("utf-8")).hexdigest()[:32]
+
+    def find(self, text: str, signature: Optional[np.ndarray] = None) -> Optional[Tuple[str, float]]:
+        """
+        Procura um insight já arquivado parecido com `text`.
+
+        Returns:
+            (chave, similaridade) do candidato mais parecido acima do limiar, ou None
+        """
+        signature = minhash(text) if signature is None else signature
+        keys = band_keys(signature)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT s.key, s.signature FROM bands b JOIN signatures s ON s.key = b.key"
+                f" WHERE {' OR '.join('(b.band = ? AND b.bucket = ?)' for _ in keys)}",
+                [value for key in keys for value in key],
+            ).fetchall()
+        best = None
+        for key, blob in rows:
+            similarity = jaccard(signature, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def add(self, text: str, source: Optional[str] = None, signature: Optional[np.ndarray] = None,
+            processed: bool = True, item: Optional[Dict] = None) -> str:
+        """
+        Arquiva um insight e retorna sua chave (idempotente para o mesmo conteúdo).
+
+        Args:
+            processed: False arquiva o insight como pendente (ver `mark_processed`)
+            item: Insight original, guardado enquanto pendente (ver `pending`)
+        """
+        signature = minhash(text) if signature is None else signature
+        key = self.content_key(text)
+        now = time.time()
+        payload = None if processed or item is None else json.dumps(item, ensure_ascii=False)
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO signatures (key, signature, source, created_at, processed_at, payload)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, signature.tobytes(), source, now, now if processed else None, payload),
+                )
+                if cursor.rowcount:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO bands (band, bucket, key) VALUES (?, ?, ?)",
+                        [(band, bucket, key) for band, bucket in band_keys(signature)],
+                    )
+        return key
+
+    def filter_new(self, items: Iterable[Dict], source: Optional[str] = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Separa insights novos de quase-duplicatas do arquivo e os arquiva como pendentes.
+
+        Itens repetidos dentro do próprio lote também contam como duplicatas.
+        Um item parecido com um insight ainda pendente volta como novo, para
+        que uma execução que falhou antes de processá-lo não o perca.
+
+        Returns:
+            (novos, duplicados); cada duplicado traz `duplicate_of` e `similarity`
+        """
+        new, duplicates = [], []
+        pending = set()  # chaves já devolvidas neste lote
+        for item in items:
+            text = insight_text(item)
+            if not text:
+                continue
+            signature = minhash(text)
+            match = self.find(text, signature)
+            if match is None:
+                pending.add(self.add(text, source, signature, processed=False, item=item))
+                new.append(item)
+            elif match[0] not in pending and not self.is_processed(match[0]):
+                pending.add(match[0])
+                new.append(item)
+            else:
+                duplicates.append({**item, "duplicate_of": match[0], "similarity": round(match[1], 3)})
+        return new, duplicates
+
+    def is_processed(self, key: str) -> bool:
+        """Indica se o insight `key` já passou pelo processamento seguinte."""
+        with self._lock:
+            row = self._conn.execute("SELECT processed_at FROM signatures WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] is not None
+
+    def pending(self) -> List[Dict]:
+        """Insights arquivados por `filter_new` que ainda não foram processados, do mais antigo ao mais novo."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM signatures WHERE processed_at IS NULL AND payload IS NOT NULL"
+                " ORDER BY created_at, key"
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def mark_processed(self, items: Iterable[Dict]) -> int:
+        """
+        Marca como processados os insights devolvidos por `filter_new`.
+
+        Returns:
+            Número de registros marcados
+        """
+        keys = set()
+        for item in items:
+            text = insight_text(item)
+            if not text:
+                continue
+            key = self.content_key(text)
+            if not self._has_key(key):
+                match = self.find(text)
+                if match is None:
+                    continue
+                key = match[0]
+            keys.add(key)
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.executemany(
+                    "UPDATE signatures SET processed_at = ?, payload = NULL WHERE key = ? AND processed_at IS NULL",
+                    [(time.time(), key) for key in keys],
+                )
+        return cursor.rowcount
+
+    def _has_key(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM signatures WHERE key = ?", (key,)).fetchone() is not None
+
+    def count(self) -> int:
+        """Número de insights arquivados."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
+
+
+def iter_insights(data: Dict) -> Iterable[Dict]:
+    """Insights de um snapshot diário: objetos com título/nome nas listas de primeiro nível."""
+    for value in data.values():
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict) and insight_text(item):
+                    yield item
+
+
+def seed_from_snapshots(index: DuplicateIndex, paths: Iterable[str]) -> int:
+    """Arquiva os insights de snapshots históricos (idempotente). Retorna o total arquivado."""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for item in iter_insights(data):
+            index.add(insight_text(item), source=os.path.basename(path))
+    return index.count()
+
+
+def historical_snapshots(data_dir: str) -> List[str]:
+    """Snapshots diários existentes em `data_dir` (`daily_trends*.json`)."""
+    return sorted(glob.glob(os.path.join(data_dir, 'daily_trends*.json')))
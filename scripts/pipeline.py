@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orquestrador incremental do pipeline diário do ComunicaPro.
+
+Os passos são declarados como um DAG, cada um com arquivos de entrada,
+arquivos de saída e dependências. Antes de executar um passo, o
+orquestrador calcula o hash do conteúdo das entradas e do código do passo;
+se for igual ao da última execução bem-sucedida e as saídas gravadas nela
+continuarem intactas, o passo é pulado, mesmo que o nome das saídas (com
+a data do dia) tenha mudado. Passos independentes rodam em paralelo, de
+modo que o job termina no tempo da cadeia mais longa. As saídas são gravadas de forma atômica
+(arquivo temporário + `os.replace`).
+
+Uso:
+    python3 scripts/pipeline.py [--force] [--workers 4]
+
+Código de saída: 0 se alguma saída mudou, 3 se nada mudou, 1 em caso de falha.
+Só os passos essenciais decidem o código; passos opcionais (enriquecimento
+via LLM) que falham são reportados e tentados de novo na próxima execução.
+"""
+
+import argparse
+import glob
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from daily_update import (fetch_latest_trends, generate_markdown_summary, mark_insights_processed,
+                          pending_insights, select_new_insights)
+from keyword_index import DEFAULT_SOURCE_DIRS, SOURCE_PATTERNS, KeywordIndex
+from metrics import stage
+from near_duplicates import insight_text
+from report_engine import render_market_summary
+from response_cache import ResponseCache
+from result_store import DEFAULT_RESULTS_PATH, ResultStore
+from sentiment_analysis import SentimentAnalyzer
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+RESEARCH_DATA_DIR = os.path.join(PROJECT_ROOT, 'research_data')
+RESEARCH_FINDINGS_DIR = os.path.join(PROJECT_ROOT, 'research_findings')
+PIPELINE_STATE_PATH = os.path.join(SCRIPT_DIR, '.cache', 'pipeline_state.json')
+
+EXIT_UNCHANGED = 3
+
+
+def file_hash(path: str) -> Optional[str]:
+    """SHA-256 do conteúdo do arquivo (None se não existir)."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def atomic_write(path: str, content: str) -> None:
+    """Grava `content` em `path` sem nunca expor um arquivo pela metade."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def atomic_write_json(path: str, data) -> None:
+    """Variante de `atomic_write` para objetos JSON."""
+    atomic_write(path, json.dumps(data, indent=4, ensure_ascii=False))
+
+
+def _relative(path: str) -> str:
+    return os.path.relpath(os.path.abspath(path), PROJECT_ROOT)
+
+
+class Step:
+    """
+    Passo do pipeline.
+
+    Args:
+        name: Nome único do passo
+        run: Função sem argumentos que produz as saídas
+        inputs: Arquivos lidos pelo passo (o hash deles e o código de `run`
+                decidem se o passo roda), ou função que devolve a lista no
+                momento em que o passo fica pronto
+        outputs: Arquivos gravados pelo passo
+        deps: Passos que precisam terminar antes deste
+        always: Executa sempre (passos de origem, como buscas externas)
+        optional: A falha do passo não afeta o código de saída do job nem
+                  bloqueia os passos que dependem dele
+    """
+
+    def __init__(self, name: str, run: Callable[[], None],
+                 inputs: Union[Sequence[str], Callable[[], Sequence[str]]] = (),
+                 outputs: Sequence[str] = (), deps: Sequence[str] = (), always: bool = False,
+                 optional: bool = False):
+        self.name = name
+        self.run = run
+        self.inputs = inputs if callable(inputs) else list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.always = always
+        self.optional = optional
+
+    def input_paths(self) -> List[str]:
+        return list(self.inputs() if callable(self.inputs) else self.inputs)
+
+    def code_hash(self) -> str:
+        """Hash do código de `run` (mudar o passo invalida as execuções anteriores)."""
+        try:
+            source = inspect.getsource(self.run).encode("utf-8")
+        except (OSError, TypeError):
+            source = getattr(getattr(self.run, "__code__", None), "co_code", b"")
+        return hashlib.sha256(source).hexdigest()
+
+    def input_key(self) -> str:
+        """Hash combinado do nome e do código do passo e do conteúdo das entradas."""
+        digest = hashlib.sha256(f"{self.name}\x1f{self.code_hash()}".encode("utf-8"))
+        for path in sorted(self.input_paths()):
+            digest.update(f"\x1f{_relative(path)}={file_hash(path)}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def output_hashes(self) -> Dict[str, Optional[str]]:
+        return {_relative(path): file_hash(path) for path in self.outputs}
+
+
+class Pipeline:
+    """
+    Executor de DAG com execução incremental por hash de conteúdo.
+    """
+
+    def __init__(self, steps: Iterable[Step], state_path: str = PIPELINE_STATE_PATH, max_workers: int = 4):
+        """
+        Args:
+            steps: Passos do pipeline
+            state_path: Arquivo JSON com os hashes da última execução de cada passo
+            max_workers: Passos executados simultaneamente
+
+        Raises:
+            ValueError: Nome repetido, dependência inexistente ou ciclo
+        """
+        self.steps = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Passo duplicado: {step.name}")
+            self.steps[step.name] = step
+        self.order = self._topological_order()
+        self.state_path = state_path
+        self.max_workers = max_workers
+
+    def _topological_order(self) -> List[str]:
+        for step in self.steps.values():
+            for dep in step.deps:
+                if dep not in self.steps:
+                    raise ValueError(f"Passo '{step.name}' depende de '{dep}', que não existe")
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo no pipeline envolvendo '{name}'")
+            visiting.add(name)
+            for dep in self.steps[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.steps:
+            visit(name)
+        return order
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _is_fresh(self, step: Step, state: Dict, key: str) -> bool:
+        # As saídas conferidas são as gravadas na última execução (pelo caminho
+        # de então): um relatório de ontem intacto vale para as mesmas entradas
+        previous = state.get(step.name)
+        return (
+            previous is not None
+            and previous.get("key") == key
+            and all(file_hash(os.path.join(PROJECT_ROOT, path)) == digest
+                    for path, digest in previous.get("outputs", {}).items())
+        )
+
+    def _execute(self, step: Step) -> Dict:
+        before = step.output_hashes()
+        began = time.perf_counter()
+        with stage(f"pipeline_{step.name}"):
+            step.run()
+        after = step.output_hashes()
+        return {"outputs": after, "changed": after != before,
+                "seconds": round(time.perf_counter() - began, 3)}
+
+    def run(self, force: bool = False) -> Dict[str, Dict]:
+        """
+        Executa o pipeline.
+
+        Um passo fica pronto quando todas as dependências terminaram. Se uma
+        dependência essencial falhar, os passos que dependem dela são bloqueados.
+
+        Args:
+            force: Executa todos os passos, ignorando os hashes gravados
+
+        Returns:
+            Relatório por passo: status ("ran", "skipped", "failed" ou
+            "blocked"), changed, seconds e, em falhas, error
+        """
+        state = self._load_state()
+        report = {}
+        keys = {}
+        pending = {name: set(self.steps[name].deps) for name in self.order}
+
+        def ready() -> List[str]:
+            names = [name for name, deps in pending.items() if not deps]
+            for name in names:
+                del pending[name]
+            return names
+
+        def finish(name: str) -> None:
+            failed = report[name]["status"] in ("failed", "blocked") and not self.steps[name].optional
+            for other, deps in list(pending.items()):
+                if name in deps:
+                    if failed:
+                        del pending[other]
+                        report[other] = {"status": "blocked", "changed": False, "seconds": 0.0}
+                        finish(other)
+                    else:
+                        deps.discard(name)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                for name in ready():
+                    step = self.steps[name]
+                    keys[name] = step.input_key()
+                    if not force and not step.always and self._is_fresh(step, state, keys[name]):
+                        print(f"[pipeline] {name}: entradas inalteradas, pulando")
+                        report[name] = {"status": "skipped", "changed": False, "seconds": 0.0}
+                        finish(name)
+                        continue
+                    print(f"[pipeline] {name}: executando")
+                    running[executor.submit(self._execute, step)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"[pipeline] {name}: falhou ({e})")
+                        report[name] = {"status": "failed", "changed": False, "seconds": 0.0, "error": str(e)}
+                        state.pop(name, None)
+                    else:
+                        report[name] = {"status": "ran", "changed": result["changed"], "seconds": result["seconds"]}
+                        state[name] = {"key": keys[name], "outputs": result["outputs"],
+                                       "finished_at": datetime.now().isoformat()}
+                    finish(name)
+
+        atomic_write_json(self.state_path, state)
+        return report
+
+
+# --- Passos do pipeline diário ---
+
+def _without_timestamp(data: Dict) -> Dict:
+    return {key: value for key, value in data.items() if key != "last_updated"}
+
+
+def daily_pipeline(day: Optional[datetime] = None) -> List[Step]:
+    """
+    Passos do job diário.
+
+    fetch_trends → daily_summary / sentiment_new_insights → keyword_index;
+    market_summary é independente e roda em paralelo com a cadeia de tendências.
+    sentiment_new_insights é opcional: sem chave do LLM, o job publica as
+    tendências e os resumos mesmo assim. Ele lê os pendentes direto do
+    arquivo de quase-duplicatas (não do new_insights do dia), então um dia
+    que falhou é retomado na execução seguinte mesmo sem tendências novas.
+    """
+    stamp = (day or datetime.now()).strftime("%Y%m%d")
+    trends_path = os.path.join(RESEARCH_DATA_DIR, 'daily_trends.json')
+    new_insights_path = os.path.join(RESEARCH_FINDINGS_DIR, f'new_insights_{stamp}.json')
+    summary_path = os.path.join(RESEARCH_FINDINGS_DIR, f'daily_summary_{stamp}.md')
+    market_data_path = os.path.join(RESEARCH_DATA_DIR, 'market_statistics.json')
+    market_summary_path = os.path.join(RESEARCH_FINDINGS_DIR, f'market_summary_{stamp}.md')
+
+    def fetch_trends():
+        trends = fetch_latest_trends()
+        if not trends:
+            raise RuntimeError("Nenhuma tendência retornada pela busca")
+        if os.path.exists(trends_path):
+            with open(trends_path, 'r', encoding='utf-8') as f:
+                current = json.load(f)
+            # Só o carimbo de data mudou: mantém o arquivo e não dispara os passos seguintes
+            if _without_timestamp(current) == _without_timestamp(trends):
+                print("Nenhuma tendência nova desde a última busca")
+                return
+        select_new_insights(trends)
+        atomic_write_json(trends_path, trends)
+
+    def daily_summary():
+        with open(trends_path, 'r', encoding='utf-8') as f:
+            trends = json.load(f)
+        atomic_write(summary_path, generate_markdown_summary(trends))
+
+    def sentiment_new_insights():
+        insights = pending_insights()
+        if not insights:
+            print("Nenhum insight pendente para analisar")
+            return
+        results = SentimentAnalyzer(cache=ResponseCache()).batch_analyze([insight_text(item) for item in insights])
+        store = ResultStore()
+        try:
+            store.append_many(results, source=os.path.basename(new_insights_path))
+        finally:
+            store.close()
+        # Só agora os insights saem da fila; se algo acima falhar, continuam pendentes
+        mark_insights_processed(insights)
+        print(f"{len(results)} insights pendentes analisados")
+
+    def keyword_sources() -> List[str]:
+        # Tudo o que `KeywordIndex.build` lê, inclusive o armazém de resultados
+        paths = [path for source_dir in DEFAULT_SOURCE_DIRS for pattern in SOURCE_PATTERNS
+                 for path in glob.glob(os.path.join(source_dir, pattern))]
+        return paths + [DEFAULT_RESULTS_PATH]
+
+    def keyword_index():
+        index = KeywordIndex()
+        try:
+            report = index.build()
+        finally:
+            index.close()
+        print(f"Índice de palavras-chave atualizado: {report['indexed']} arquivos reindexados")
+
+    def market_summary():
+        with open(market_data_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        atomic_write(market_summary_path, render_market_summary(data))
+
+    return [
+        Step("fetch_trends", fetch_trends, outputs=[trends_path, new_insights_path], always=True),
+        Step("daily_summary", daily_summary, inputs=[trends_path], outputs=[summary_path],
+             deps=["fetch_trends"]),
+        Step("sentiment_new_insights", sentiment_new_insights, deps=["fetch_trends"],
+             always=True, optional=True),
+        Step("keyword_index", keyword_index, inputs=keyword_sources,
+             deps=["fetch_trends", "sentiment_new_insights"]),
+        Step("market_summary", market_summary, inputs=[market_data_path], outputs=[market_summary_path]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline diário incremental do ComunicaPro")
+    parser.add_argument("--force", action="store_true", help="Executa todos os passos")
+    parser.add_argument("--workers", type=int, default=4, help="Passos simultâneos")
+    parser.add_argument("--state", default=PIPELINE_STATE_PATH, help="Arquivo de estado do pipeline")
+    args = parser.parse_args()
+
+    print("--- Iniciando pipeline diário ComunicaPro ---")
+    began = time.perf_counter()
+    steps = daily_pipeline()
+    report = Pipeline(steps, args.state, args.workers).run(force=args.force)
+    print(json.dumps(report, indent=4, ensure_ascii=False))
+    print(f"--- Pipeline concluído em {time.perf_counter() - began:.2f}s ---")
+
+    core = [report[step.name] for step in steps if not step.optional]
+    for step in steps:
+        if step.optional and report[step.name]["status"] in ("failed", "blocked"):
+            print(f"Aviso: passo opcional '{step.name}' não concluído; será tentado na próxima execução")
+    if any(entry["status"] in ("failed", "blocked") for entry in core):
+        sys.exit(1)
+    if not any(entry["changed"] for entry in core):
+        sys.exit(EXIT_UNCHANGED)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Controle de taxa e novas tentativas para chamadas ao LLM.
+
+Fornece um limitador por requisições/minuto e tokens/minuto (RPM/TPM),
+seguro para uso entre threads, e um helper de retry com backoff exponencial
+e jitter para erros transitórios (HTTP 429 e 5xx).
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional, TypeVar
+
+from metrics import LLM_RETRIES
+
+T = TypeVar("T")
+
+# Janela usada pelos orçamentos de RPM/TPM (em segundos)
+WINDOW_SECONDS = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estima o número de tokens de um texto sem depender de um tokenizador.
+
+    Usa a heurística de ~4 caracteres por token, suficiente para orçamento.
+    """
+    return max(1, len(text) // 4)
+
+
+def is_retryable(exc: Exception) -> bool:
+    """
+    Indica se o erro é transitório e a chamada pode ser repetida.
+
+    Considera limites de taxa (429), erros de servidor (5xx) e falhas de
+    conexão/timeout do SDK OpenAI.
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    if status is not None:
+        return status == 429 or 500 <= status < 600
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+class RateLimiter:
+    """
+    Limitador de janela deslizante para requisições e tokens por minuto.
+
+    `acquire` bloqueia a thread chamadora até que a requisição caiba nos
+    orçamentos configurados. Orçamentos `None` são ilimitados.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._events = deque()  # (instante, tokens)
+        self._tokens_in_window = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._events and now - self._events[0][0] >= WINDOW_SECONDS:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        wait = 0.0
+        if self.requests_per_minute and len(self._events) >= self.requests_per_minute:
+            oldest = self._events[len(self._events) - self.requests_per_minute][0]
+            wait = max(wait, oldest + WINDOW_SECONDS - now)
+        if self.tokens_per_minute and self._events:
+            # Requisições maiores que o orçamento inteiro passam sozinhas na janela
+            budget = max(self.tokens_per_minute, tokens)
+            excess = self._tokens_in_window + tokens - budget
+            for instant, event_tokens in self._events:
+                if excess <= 0:
+                    break
+                excess -= event_tokens
+                wait = max(wait, instant + WINDOW_SECONDS - now)
+        return wait
+
+    def acquire(self, tokens: int = 1) -> None:
+        """
+        Reserva capacidade para uma requisição de `tokens` tokens.
+
+        Args:
+            tokens: Tokens estimados (entrada + saída) da requisição
+        """
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                wait = self._wait_time(tokens, now)
+                if wait <= 0:
+                    self._events.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+            time.sleep(wait)
+
+
+def retry_with_backoff(func: Callable[[], T], max_retries: int = 3,
+                       base_delay: float = 1.0, max_delay: float = 30.0) -> T:
+    """
+    Executa `func` repetindo em erros transitórios.
+
+    Usa backoff exponencial com "full jitter": a espera da tentativa n é
+    sorteada entre 0 e min(max_delay, base_delay * 2**n).
+
+    Args:
+        func: Função sem argumentos a executar
+        max_retries: Número máximo de novas tentativas
+        base_delay: Espera base em segundos
+        max_delay: Teto da espera em segundos
+
+    Returns:
+        O valor retornado por `func`
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            LLM_RETRIES.inc()
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+            attempt += 1
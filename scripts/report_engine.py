@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor único de relatórios Markdown de mercado do ComunicaPro.
+
+Centraliza a renderização usada por `analyze_market_data.py` e
+`generate_market_summary.py`: os trechos fixos ficam em templates
+pré-compilados (métodos `str.format` já vinculados) e a saída é montada
+em uma lista de partes unida com `"".join`, sem concatenações sucessivas.
+
+Também renderiza um diretório inteiro de snapshots JSON datados em uma
+única execução, distribuindo os arquivos entre processos:
+
+    python3 scripts/report_engine.py research_data --output-dir research_findings/reports
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from market_projection import REPORT_MONTE_CARLO_DRAWS, run_projections
+
+# --- Análise de mercado (market_insights) ---
+
+_ANALYSIS_HEADER = (
+    "# Análise de Mercado - {date}\n\n"
+    "## 📈 Crescimento do Setor de Comunicação e Avaliação\n\n"
+    "Os dados de mercado confirmam o alto potencial de crescimento do setor, com taxas anuais compostas (CAGR) robustas em todas as áreas-chave:\n\n"
+).format
+_ANALYSIS_TABLE_HEADER = (
+    "| Mercado | Tamanho (2024, USD Bilhões) | CAGR (%) | Tamanho Projetado (USD Bilhões) |\n"
+    "| :--- | :--- | :--- | :--- |\n"
+)
+_ANALYSIS_ROW = "| {} | {} | {} | {} |\n".format
+_PROJECTION_HEADER = (
+    "## 🔮 Projeções e Sensibilidade (Monte Carlo)\n\n"
+    "Projeções ano a ano a partir do último tamanho observado de cada mercado, com faixas de percentis de {draws} simulações do CAGR:\n\n"
+).format
+_PROJECTION_MARKET = (
+    "### {title}\n\n"
+    "Base: US$ {base_size:g} Bilhões em {base_year} · CAGR {cagr_percent:g}% (±{cagr_stddev:.1f} p.p.)\n\n"
+).format
+_PROJECTION_CONFLICT = (
+    "> ⚠️ O CAGR informado ({cagr_percent:g}%) diverge do CAGR implícito nos tamanhos informados "
+    "({implied_cagr_percent:g}% entre {base_year} e {target_year}); a faixa de percentis foi ampliada "
+    "para cobrir os dois valores.\n\n"
+).format
+_PROJECTION_ROW = "| {} | {:.2f} | {} |\n".format
+_ANALYSIS_TRENDS_HEADER = (
+    "## 💡 Tendências Chave e Foco Estratégico\n\n"
+    "A análise de mercado aponta para as seguintes tendências que devem guiar o desenvolvimento do ComunicaPro:\n"
+)
+_ANALYSIS_FEATURES_HEADER = (
+    "## 🚀 Próximos Recursos Avançados (Alinhamento com o Mercado)\n\n"
+    "Para manter a competitividade, os esforços de desenvolvimento devem se concentrar em:\n"
+)
+
+# --- Resumo de mercado (market_statistics) ---
+
+_SUMMARY_HEADER = (
+    "# Resumo Analítico de Mercado - {0}\n\n"
+    "## 📈 Tendências e Estatísticas do Setor de Avaliação de Personalidade\n\n"
+    "**Última Atualização dos Dados:** {0}\n\n"
+    "Os dados de mercado mais recentes reforçam a importância estratégica do ComunicaPro, que atua em um setor de alto crescimento e valorização.\n\n"
+).format
+_SUMMARY_PERSONALITY = (
+    "### Soluções de Avaliação de Personalidade (Personality Assessment Solutions)\n\n"
+    "- **Tamanho do Mercado (2025):** US$ {} Bilhões\n"
+    "- **Projeção para 2030:** US$ {} Bilhões\n"
+    "- **Taxa de Crescimento Anual Composta (CAGR):** {}% (Fonte: {})\n\n"
+).format
+_SUMMARY_TRENDS_HEADER = (
+    "## 💡 Tendências Chave do Mercado\n\n"
+    "O crescimento do setor é impulsionado por:\n"
+)
+_SUMMARY_TRENDS_FOOTER = (
+    "\n"
+    "A integração de recursos avançados, como o **Plano de Ação de Processamento Profundo (PAPP)**, alinha o ComunicaPro com a principal tendência de mercado: o uso de IA para análises mais profundas e personalizadas.\n"
+)
+
+_NUMBERED_BOLD = "{}. **{}**\n".format
+_BULLET = "- {}\n".format
+
+# Base das projeções: tamanhos em anos posteriores contam como projetados
+BASE_YEAR = 2024
+_SIZE_KEY_RE = re.compile(r"^size_(\d{4})_billion_usd$")
+
+
+def projected_size(metrics: Dict) -> Tuple[object, Optional[int]]:
+    """
+    Encontra o tamanho projetado de um mercado entre os campos `size_<ano>_billion_usd`.
+
+    Returns:
+        (valor, ano) do primeiro ano posterior a `BASE_YEAR`, ou ('N/A', None)
+    """
+    years = sorted(
+        int(match.group(1)) for match in map(_SIZE_KEY_RE.match, metrics) if match
+    )
+    for year in years:
+        if year > BASE_YEAR:
+            return metrics[f"size_{year}_billion_usd"], year
+    return 'N/A', None
+
+
+def render_projections(projection: Dict, draws: int) -> List[str]:
+    """Partes Markdown das projeções ano a ano com as faixas de percentis."""
+    labels = [f"P{p:g}" for p in projection["percentiles"]]
+    table_header = (
+        f"| Ano | Projeção (USD Bilhões) | {' | '.join(labels)} |\n"
+        f"| :--- | :--- | {' | '.join(':---' for _ in labels)} |\n"
+    )
+    parts = [_PROJECTION_HEADER(draws=f"{draws:,}".replace(",", "."))]
+    for m, market in enumerate(projection["markets"]):
+        parts.append(_PROJECTION_MARKET(**market))
+        if "implied_cagr_percent" in market:
+            parts.append(_PROJECTION_CONFLICT(**market))
+        parts.append(table_header)
+        for y, year in enumerate(projection["years"]):
+            if market["base_year"] < year <= market["target_year"]:
+                band = " | ".join(f"{value:.2f}" for value in projection["bands"][m, :, y])
+                parts.append(_PROJECTION_ROW(year, projection["sizes"][m, y], band))
+        parts.append("\n")
+    return parts
+
+
+def render_market_analysis(data: Dict, draws: int = REPORT_MONTE_CARLO_DRAWS) -> str:
+    """
+    Renderiza a análise de mercado a partir de um snapshot com `market_insights`.
+
+    Args:
+        data: Snapshot JSON já carregado
+        draws: Simulações Monte Carlo por mercado (0 desativa as projeções)
+    """
+    parts = [_ANALYSIS_HEADER(date=data.get('date', 'Data Desconhecida'))]
+
+    market_data = data.get('market_insights', {})
+    if market_data:
+        parts.append(_ANALYSIS_TABLE_HEADER)
+        for metrics in market_data.values():
+            size_proj, year = projected_size(metrics)
+            proj_text = f"{size_proj} (até {year})" if year is not None else 'N/A'
+            parts.append(_ANALYSIS_ROW(
+                metrics.get('title', 'N/A'),
+                metrics.get('size_2024_billion_usd', 'N/A'),
+                metrics.get('cagr_percent', 'N/A'),
+                proj_text,
+            ))
+        parts.append("\n")
+
+    projection = run_projections(data, draws=draws) if draws else None
+    if projection:
+        parts.extend(render_projections(projection, draws))
+
+    trends = data.get('trends', [])
+    if trends:
+        parts.append(_ANALYSIS_TRENDS_HEADER)
+        parts.extend(_NUMBERED_BOLD(i, trend) for i, trend in enumerate(trends, 1))
+        parts.append("\n")
+
+    advanced_features = data.get('advanced_feature_focus', [])
+    if advanced_features:
+        parts.append(_ANALYSIS_FEATURES_HEADER)
+        parts.extend(_BULLET(feature) for feature in advanced_features)
+        parts.append("\n")
+
+    return "".join(parts)
+
+
+def render_market_summary(data: Dict) -> str:
+    """Renderiza o resumo analítico a partir de um snapshot com `market_statistics`."""
+    market_data = data.get('market_statistics', {})
+    trends = data.get('key_trends', [])
+    parts = [_SUMMARY_HEADER(data.get('last_updated', 'Data Desconhecida'))]
+
+    pa_data = market_data.get('personality_assessment_solutions', {})
+    if pa_data:
+        parts.append(_SUMMARY_PERSONALITY(
+            pa_data.get('market_size_2025_usd_billion', 'N/A'),
+            pa_data.get('market_size_2030_projected_usd_billion', 'N/A'),
+            pa_data.get('cagr_2025_2030_percent', 'N/A'),
+            pa_data.get('cagr_source', 'Fontes Diversas'),
+        ))
+
+    if trends:
+        parts.append(_SUMMARY_TRENDS_HEADER)
+        parts.extend(_NUMBERED_BOLD(i, trend) for i, trend in enumerate(trends, 1))
+        parts.append(_SUMMARY_TRENDS_FOOTER)
+
+    return "".join(parts)
+
+
+# Tipo de relatório -> (renderizador, chave que identifica snapshots compatíveis)
+RENDERERS: Dict[str, Tuple[Callable[[Dict], str], str]] = {
+    "market_analysis": (render_market_analysis, "market_insights"),
+    "market_summary": (render_market_summary, "market_statistics"),
+}
+
+
+def detect_kinds(data: Dict) -> List[str]:
+    """Lista os tipos de relatório aplicáveis a um snapshot."""
+    return [kind for kind, (_, key) in RENDERERS.items() if key in data]
+
+
+def render_file(input_path: str, output_dir: str, kinds: Optional[List[str]] = None) -> List[str]:
+    """
+    Lê um snapshot JSON e grava os relatórios aplicáveis em `output_dir`.
+
+    Os arquivos gerados seguem o padrão `<tipo>_<nome do snapshot>.md`.
+
+    Returns:
+        Caminhos dos relatórios gravados
+    """
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    written = []
+    for kind in kinds or detect_kinds(data):
+        output_path = os.path.join(output_dir, f"{kind}_{stem}.md")
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(RENDERERS[kind][0](data))
+        written.append(output_path)
+    return written
+
+
+def render_directory(input_dir: str, output_dir: str, workers: Optional[int] = None,
+                     pattern: str = "*.json") -> Dict:
+    """
+    Renderiza todos os snapshots de `input_dir` em uma única passada.
+
+    Args:
+        input_dir: Diretório com snapshots JSON datados
+        output_dir: Diretório de saída dos relatórios
+        workers: Processos paralelos (padrão: número de núcleos; 1 = serial)
+        pattern: Padrão glob dos snapshots
+
+    Returns:
+        Dict com arquivos lidos, relatórios gerados, falhas e tempo total;
+        um snapshot que falha por qualquer motivo entra em `failed` e os
+        demais continuam sendo renderizados
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = sorted(glob.glob(os.path.join(input_dir, pattern)))
+    start = time.perf_counter()
+    report = {"snapshots": len(paths), "reports": [], "failed": {}}
+
+    def collect(path: str, outcome) -> None:
+        if isinstance(outcome, Exception):
+            report["failed"][path] = f"{type(outcome).__name__}: {outcome}"
+        else:
+            report["reports"].extend(outcome)
+
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            try:
+                collect(path, render_file(path, output_dir))
+            except Exception as e:
+                collect(path, e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {path: executor.submit(render_file, path, output_dir) for path in paths}
+            for path, future in futures.items():
+                try:
+                    collect(path, future.result())
+                except Exception as e:
+                    # Snapshot com estrutura inesperada (KeyError, TypeError...) não derruba o lote
+                    collect(path, e)
+
+    report["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renderiza relatórios de mercado a partir de snapshots JSON")
+    parser.add_argument("input_dir", help="Diretório com os snapshots JSON")
+    parser.add_argument("--output-dir", required=True, help="Diretório de saída dos relatórios")
+    parser.add_argument("--workers", type=int, help="Processos paralelos (padrão: núcleos)")
+    parser.add_argument("--pattern", default="*.json", help="Padrão glob dos snapshots")
+    args = parser.parse_args()
+
+    report = render_directory(args.input_dir, args.output_dir, args.workers, args.pattern)
+    print(f"{len(report['reports'])} relatórios gerados a partir de {report['snapshots']} snapshots "
+          f"em {report['elapsed_seconds']}s")
+    for path, error in report["failed"].items():
+        print(f"Erro em {path}: {error}")
+
+
+if __name__ == "__main__":
+    main()
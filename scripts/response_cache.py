@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache persistente de respostas do LLM endereçado por conteúdo.
+
+As entradas ficam em um banco SQLite e são indexadas por um hash de
+modelo + versão do template de prompt + texto normalizado. Suporta TTL,
+despejo LRU limitado por número de entradas e contadores de acerto/erro.
+
+O despejo roda em lotes, só quando a contagem de entradas passa de
+`max_entries`, e os horários de acesso dos acertos são acumulados em
+memória e gravados de uma vez, sem um commit por leitura.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional
+
+from metrics import CACHE_REQUESTS
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'llm_cache.sqlite')
+# Fração de `max_entries` removida a cada despejo
+EVICTION_FRACTION = 0.05
+# Acessos acumulados antes de gravar `accessed_at`
+ACCESS_FLUSH_SIZE = 256
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza Unicode (NFC) e espaços em branco para gerar chaves estáveis."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def make_key(model: str, prompt_version: str, text: str) -> str:
+    """
+    Gera a chave de cache de uma requisição.
+
+    Args:
+        model: Nome do modelo usado
+        prompt_version: Versão do template de prompt
+        text: Texto de entrada (será normalizado)
+
+    Returns:
+        Hash SHA-256 hexadecimal
+    """
+    payload = "\x1f".join((model, prompt_version, normalize_text(text)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache SQLite com TTL e despejo LRU, seguro para uso entre threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: Optional[float] = 30 * 24 * 3600,
+                 max_entries: Optional[int] = 100_000, name: Optional[str] = None):
+        """
+        Args:
+            path: Caminho do arquivo SQLite (":memory:" para cache volátil)
+            ttl_seconds: Validade das entradas (None = sem expiração)
+            max_entries: Máximo de entradas antes do despejo LRU (None = ilimitado)
+            name: Nome usado nas métricas (padrão: nome do arquivo)
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.name = name or os.path.splitext(os.path.basename(path))[0] or "memory"
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._pending_access = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Com WAL, NORMAL só arrisca as últimas gravações numa queda de energia; aceitável para um cache
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna o valor armazenado ou None se ausente/expirado."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                cursor = self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= cursor.rowcount
+                self._pending_access.pop(key, None)
+                row = None
+            if row is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache=self.name, result="miss")
+                return None
+            self._pending_access[key] = now
+            if len(self._pending_access) >= ACCESS_FLUSH_SIZE:
+                self._flush_access()
+                self._conn.commit()
+            self.hits += 1
+        CACHE_REQUESTS.inc(cache=self.name, result="hit")
+        return json.loads(row[0])
+
+    def peek(self, key: str) -> Optional[Dict]:
+        """Como `get`, mas sem contar acerto/erro nem atualizar o acesso (para reconsultas)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (self.ttl_seconds is not None and time.time() - row[1] > self.ttl_seconds):
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict) -> None:
+        """Armazena `value` e aplica o limite de entradas."""
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            if cursor.rowcount:
+                self._count += 1
+            else:
+                self._conn.execute(
+                    "UPDATE cache SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                    (payload, now, now, key),
+                )
+                self._pending_access.pop(key, None)
+            if self.max_entries is not None and self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_access(self) -> None:
+        # Chamado com `_lock` adquirido; o commit fica com quem chama
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+
+    def _evict(self) -> None:
+        # Chamado com `_lock` adquirido. Recontar corrige a contagem quando
+        # outro processo grava no mesmo arquivo; o custo se dilui no lote
+        self._flush_access()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return
+        batch = excess + max(1, int(self.max_entries * EVICTION_FRACTION))
+        cursor = self._conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+            (min(batch, self._count),),
+        )
+        self._count -= cursor.rowcount
+
+    def purge_expired(self) -> int:
+        """Remove entradas expiradas e retorna quantas foram removidas."""
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            self._count -= cursor.rowcount
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove todas as entradas e zera os contadores."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+            self._count = 0
+            self._pending_access.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Retorna contadores de acerto/erro e o tamanho atual do cache."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "entries": size,
+        }
+
+    def close(self) -> None:
+        """Grava os acessos pendentes e fecha a conexão com o banco."""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+            self._conn.close()
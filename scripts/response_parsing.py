@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Camada compartilhada de leitura das respostas estruturadas do LLM.
+
+`parse_json` tenta o JSON direto, depois remove blocos de código markdown
+e texto em volta e, por fim, repara respostas truncadas: descarta o último
+par chave/valor incompleto e fecha os objetos e listas pendentes. Assim
+uma resposta cortada por `max_tokens` ainda aproveita os campos completos,
+e os validadores de esquema (sentimento e PAPP) indicam exatamente quais
+campos faltam para uma nova pergunta direcionada, em vez de descartar a
+resposta inteira.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+VALID_SENTIMENTS = ("positive", "neutral", "negative")
+
+# Campo -> (tipos aceitos, valores permitidos ou None)
+Schema = Dict[str, Tuple[Any, Optional[Tuple]]]
+
+SENTIMENT_SCHEMA: Schema = {
+    "sentiment": (str, VALID_SENTIMENTS),
+    "score": ((int, float), None),
+    "intensity": (str, ("low", "medium", "high")),
+    "keywords": (list, None),
+    "insights": (str, None),
+    "tone": (str, None),
+    "confidence": ((int, float), None),
+}
+
+PAPP_SCHEMA: Schema = {
+    "title": (str, None),
+    "introduction": (str, None),
+    "days": (list, None),
+}
+PAPP_DAY_SCHEMA: Schema = {
+    "day": (int, None),
+    "theme": (str, None),
+    "task": (str, None),
+}
+PAPP_DAYS = 7
+
+# Tentativas de corte ao reparar (a partir do fim da resposta)
+MAX_REPAIR_CANDIDATES = 64
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",\s*$")
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove blocos ```json ... ``` e texto antes do primeiro `{`/`[`."""
+    match = _FENCE_RE.search(text)
+    if match:
+        text = match.group(1)
+    starts = [pos for pos in (text.find("{"), text.find("[")) if pos >= 0]
+    return text[min(starts):].strip() if starts else text.strip()
+
+
+def _closers(stack: List[str]) -> str:
+    return "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """
+    Recupera o maior prefixo válido de um JSON truncado.
+
+    Percorre o texto registrando os pontos em que um valor acabou de ser
+    concluído (antes de uma vírgula ou após fechar um objeto/lista) e tenta,
+    do fim para o começo, fechar a estrutura a partir de cada ponto. Um
+    valor de texto cortado no meio é descartado, não fechado.
+
+    Returns:
+        O valor recuperado, ou None se nenhum prefixo for válido
+    """
+    text = strip_code_fences(text)
+    stack = []
+    in_string = False
+    escape = False
+    cuts = []  # (posição, pilha no ponto)
+    for pos, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+        elif char in "}]":
+            if not stack:
+                break
+            stack.pop()
+            cuts.append((pos + 1, list(stack)))
+            if not stack:
+                break
+        elif char == ",":
+            cuts.append((pos, list(stack)))
+
+    candidates = []
+    if stack and not in_string:
+        # Strings cortadas no meio são descartadas em vez de fechadas
+        candidates.append(_TRAILING_COMMA_RE.sub("", text.rstrip()) + _closers(stack))
+    for pos, cut_stack in reversed(cuts[-MAX_REPAIR_CANDIDATES:]):
+        candidates.append(_TRAILING_COMMA_RE.sub("", text[:pos].rstrip()) + _closers(cut_stack))
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def parse_json(text: str) -> Tuple[Any, bool]:
+    """
+    Converte a resposta do LLM em objeto, reparando-a se necessário.
+
+    Returns:
+        (valor, reparado) — `reparado` indica que houve limpeza ou reparo
+
+    Raises:
+        json.JSONDecodeError: Se nem o reparo produzir JSON válido
+    """
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError as e:
+        error = e
+    try:
+        return json.loads(strip_code_fences(text)), True
+    except json.JSONDecodeError:
+        pass
+    repaired = repair_json(text)
+    if repaired is None:
+        raise error
+    return repaired, True
+
+
+def _valid(value, types, choices) -> bool:
+    if isinstance(value, bool) or not isinstance(value, types):
+        return False
+    return choices is None or value in choices
+
+
+def invalid_fields(obj: Any, schema: Schema) -> List[str]:
+    """Campos do esquema ausentes ou com tipo/valor inválido em `obj` (todos, se não for dict)."""
+    if not isinstance(obj, dict):
+        return list(schema)
+    return [field for field, (types, choices) in schema.items() if not _valid(obj.get(field), types, choices)]
+
+
+def valid_papp_days(papp: Dict) -> Dict[int, Dict]:
+    """Dias válidos do PAPP indexados pelo número do dia (1 a `PAPP_DAYS`)."""
+    days = {}
+    for item in papp.get("days") or []:
+        if not invalid_fields(item, PAPP_DAY_SCHEMA) and 1 <= item["day"] <= PAPP_DAYS:
+            days.setdefault(item["day"], item)
+    return days
+
+
+def missing_papp_days(papp: Dict) -> List[int]:
+    """Números dos dias ausentes ou inválidos no PAPP."""
+    present = valid_papp_days(papp)
+    return [day for day in range(1, PAPP_DAYS + 1) if day not in present]
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazém append-only dos resultados de análise de sentimento.
+
+Substitui o arquivo `sentiment_analysis_result_<timestamp>.json` por
+análise: os resultados são acumulados em memória e gravados em lote em
+um único banco SQLite em modo WAL (`synchronous=NORMAL`, ou seja, o fsync
+acontece nos checkpoints e não a cada gravação). Uma thread de fundo
+descarrega o buffer periodicamente e compacta o WAL. As consultas por
+intervalo de tempo e por sentimento usam índices, sem varrer diretórios.
+
+Uso:
+    python3 scripts/result_store.py import research_findings
+    python3 scripts/result_store.py query --sentiment negative --start 2025-12-01
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS_PATH = os.path.join(SCRIPT_DIR, '..', 'research_findings', 'sentiment_results.sqlite')
+LEGACY_PATTERN = "sentiment_analysis_result_*.json"
+
+Timestamp = Union[str, float, None]
+
+
+def _epoch(value: Timestamp) -> Optional[float]:
+    """Converte ISO 8601 (ou epoch) em segundos desde a época."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return datetime.fromisoformat(value).timestamp()
+
+
+class ResultStore:
+    """
+    Log append-only de resultados com gravação em lote e índices por tempo e sentimento.
+
+    `append` só enfileira o resultado; ele fica visível para consultas após
+    `flush`, que ocorre ao encher o buffer, a cada `flush_interval` segundos
+    (thread de fundo), antes de cada consulta e em `close`. As descargas são
+    serializadas, então os ids seguem a ordem de `append`.
+
+    Os resultados lidos trazem o id do armazém em `store_id`; um campo `id`
+    do próprio resultado (ex.: o índice do corpus) é preservado.
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULTS_PATH, flush_every: int = 500,
+                 flush_interval: Optional[float] = 1.0, compact_interval: Optional[float] = 300.0):
+        """
+        Args:
+            path: Caminho do arquivo SQLite (":memory:" para armazém volátil)
+            flush_every: Tamanho do buffer que força uma gravação
+            flush_interval: Período da descarga em segundo plano (None = só manual)
+            compact_interval: Período da compactação do WAL (None = só manual)
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " id INTEGER PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " sentiment TEXT,"
+            " score REAL,"
+            " source TEXT,"
+            " payload TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_results_created ON results(created_at);"
+            "CREATE INDEX IF NOT EXISTS idx_results_sentiment ON results(sentiment, created_at);"
+        )
+        self._conn.commit()
+
+        self._stop = threading.Event()
+        self._worker = None
+        if flush_interval or compact_interval:
+            self._worker = threading.Thread(
+                target=self._background, args=(flush_interval, compact_interval), daemon=True)
+            self._worker.start()
+
+    def _background(self, flush_interval: Optional[float], compact_interval: Optional[float]) -> None:
+        period = min(p for p in (flush_interval, compact_interval) if p)
+        last_compact = time.monotonic()
+        while not self._stop.wait(period):
+            if flush_interval:
+                self.flush()
+            if compact_interval and time.monotonic() - last_compact >= compact_interval:
+                self.compact()
+                last_compact = time.monotonic()
+
+    def append(self, result: Dict, source: Optional[str] = None) -> None:
+        """Enfileira um resultado (formato de `SentimentAnalyzer.analyze`)."""
+        try:
+            created_at = _epoch(result.get("timestamp")) or time.time()
+        except (TypeError, ValueError):
+            created_at = time.time()
+        row = (created_at, result.get("sentiment"), result.get("score"), source,
+               json.dumps(result, ensure_ascii=False))
+        with self._buffer_lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.flush_every
+        if full:
+            self.flush()
+
+    def append_many(self, results: Iterable[Dict], source: Optional[str] = None) -> None:
+        """Enfileira vários resultados."""
+        for result in results:
+            self.append(result, source)
+
+    def flush(self) -> int:
+        """Grava o buffer em uma única transação e retorna quantos resultados foram gravados."""
+        # A troca do buffer acontece sob `_lock` para que duas descargas
+        # simultâneas não gravem lotes fora de ordem
+        with self._lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO results (created_at, sentiment, score, source, payload) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def compact(self) -> None:
+        """Aplica o WAL ao banco principal (com fsync) e trunca o arquivo de WAL."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA optimize")
+
+    def query(self, start: Timestamp = None, end: Timestamp = None, sentiment: Optional[str] = None,
+              after_id: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Resultados filtrados por intervalo de tempo e sentimento, em ordem de gravação.
+
+        Args:
+            start: Início inclusivo (ISO 8601 ou epoch)
+            end: Fim exclusivo (ISO 8601 ou epoch)
+            sentiment: "positive", "negative" ou "neutral"
+            after_id: Retorna apenas `store_id` maiores (paginação/leitura incremental)
+            limit: Máximo de resultados
+
+        Returns:
+            Lista de resultados, cada um com o campo `store_id` do armazém
+        """
+        self.flush()
+        query, params = ["SELECT id, payload FROM results WHERE id > ?"], [after_id]
+        if start is not None:
+            query.append("AND created_at >= ?")
+            params.append(_epoch(start))
+        if end is not None:
+            query.append("AND created_at < ?")
+            params.append(_epoch(end))
+        if sentiment:
+            query.append("AND sentiment = ?")
+            params.append(sentiment)
+        query.append("ORDER BY id")
+        if limit is not None:
+            query.append("LIMIT ?")
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(" ".join(query), params).fetchall()
+        return [{**json.loads(row[1]), "store_id": row[0]} for row in rows]
+
+    def iter_all(self, after_id: int = 0, batch_size: int = 1000) -> Iterator[Dict]:
+        """Percorre todos os resultados em páginas, sem carregar o armazém inteiro."""
+        while True:
+            page = self.query(after_id=after_id, limit=batch_size)
+            if not page:
+                return
+            yield from page
+            after_id = page[-1]["store_id"]
+
+    def get(self, result_id: int) -> Optional[Dict]:
+        """Resultado pelo `store_id` (busca direta pela chave primária)."""
+        self.flush()
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM results WHERE id = ?", (result_id,)).fetchone()
+        return {**json.loads(row[0]), "store_id": result_id} if row else None
+
+    def stats(self) -> Dict:
+        """Total de resultados e contagem por sentimento."""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute("SELECT sentiment, COUNT(*) FROM results GROUP BY sentiment").fetchall()
+        by_sentiment = {sentiment or "unknown": count for sentiment, count in rows}
+        return {"total": sum(by_sentiment.values()), "by_sentiment": by_sentiment}
+
+    def import_json_files(self, directory: str, pattern: str = LEGACY_PATTERN, remove: bool = False) -> int:
+        """
+        Migra resultados salvos como um arquivo JSON por análise.
+
+        Args:
+            directory: Diretório com os arquivos antigos
+            pattern: Padrão glob dos arquivos
+            remove: Apaga cada arquivo depois de gravado no armazém
+
+        Returns:
+            Número de resultados importados
+        """
+        paths = sorted(glob.glob(os.path.join(directory, pattern)))
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.append(json.load(f), source=os.path.basename(path))
+        self.flush()
+        if remove:
+            for path in paths:
+                os.remove(path)
+        return len(paths)
+
+    def close(self) -> None:
+        """Descarrega o buffer, compacta o WAL e fecha a conexão."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+        self.flush()
+        self.compact()
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Armazém de resultados de sentimento")
+    parser.add_argument("--store", default=DEFAULT_RESULTS_PATH, help="Caminho do banco SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Migra arquivos sentiment_analysis_result_*.json")
+    import_parser.add_argument("directory")
+    import_parser.add_argument("--remove", action="store_true", help="Apaga os arquivos migrados")
+
+    query_parser = subparsers.add_parser("query", help="Consulta resultados")
+    query_parser.add_argument("--start", help="Início (ISO 8601)")
+    query_parser.add_argument("--end", help="Fim exclusivo (ISO 8601)")
+    query_parser.add_argument("--sentiment")
+    query_parser.add_argument("--limit", type=int, default=20)
+
+    subparsers.add_parser("stats", help="Contagem por sentimento")
+    subparsers.add_parser("compact", help="Compacta o WAL")
+
+    args = parser.parse_args()
+    store = ResultStore(args.store, flush_interval=None, compact_interval=None)
+    try:
+        if args.command == "import":
+            count = store.import_json_files(args.directory, remove=args.remove)
+            print(f"{count} resultados importados para {store.path}")
+        elif args.command == "query":
+            rows = store.query(args.start, args.end, args.sentiment, limit=args.limit)
+            print(json.dumps(rows, indent=4, ensure_ascii=False))
+        elif args.command == "stats":
+            print(json.dumps(store.stats(), indent=4, ensure_ascii=False))
+        else:
+            store.compact()
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,232 @@
 import sys
 import os
+import csv
+import hashlib
 import json
+import argparse
+import warnings
 from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, Optional
 
 # Adiciona o diretório 'scripts' ao path para importar sentiment_analysis
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from sentiment_analysis import SentimentAnalyzer
+from response_cache import ResponseCache
+from result_store import ResultStore
+from sentiment_stats import SentimentAggregator
+from metrics import stage
 
-def run_analysis_and_save(text_to_analyze: str, output_dir: str = "../research_findings"):
+def run_analysis_and_save(text_to_analyze: str, output_dir: Optional[str] = None,
+                          store: Optional[ResultStore] = None) -> Optional[str]:
     """
-    Executa a análise de sentimento em um texto e salva o resultado em um arquivo JSON.
+    Executa a análise de sentimento em um texto e grava o resultado no armazém de resultados.
+
+    Args:
+        text_to_analyze: Texto a analisar
+        output_dir: Obsoleto; se informado, o resultado também é exportado para
+                    `sentiment_analysis_result_<timestamp>.json` nesse diretório,
+                    como antes do armazém
+        store: Armazém já aberto (padrão: abre e fecha o `ResultStore` padrão)
+
+    Returns:
+        Caminho do JSON exportado (com `output_dir`) ou do banco do armazém; None em caso de erro
     """
     
-    # Garante que o diretório de saída exista
-    os.makedirs(output_dir, exist_ok=True)
-    
-    analyzer = SentimentAnalyzer()
+    # Cache persistente: textos já analisados não voltam a chamar a API
+    analyzer = SentimentAnalyzer(cache=ResponseCache())
     
     print(f"Iniciando análise de sentimento para o texto: '{text_to_analyze[:50]}...'")
     
     # Executa a análise
     result = analyzer.analyze(text_to_analyze)
     
-    # Define o nome do arquivo
-    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"sentiment_analysis_result_{timestamp_str}.json"
-    output_path = os.path.join(output_dir, filename)
-    
-    # Salva o resultado
+    # Grava no armazém append-only (um único banco, não um arquivo por análise)
+    owns_store = store is None
+    store = store or ResultStore()
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=4, ensure_ascii=False)
+        store.append(result, source="run_analysis_and_save")
+        store.flush()
+        output_path = store.path
+        if output_dir is not None:
+            warnings.warn("output_dir está obsoleto: os resultados ficam no ResultStore",
+                          DeprecationWarning, stacklevel=2)
+            os.makedirs(output_dir, exist_ok=True)
+            filename = f"sentiment_analysis_result_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            output_path = os.path.join(output_dir, filename)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=4, ensure_ascii=False)
         print(f"Análise concluída e salva em: {output_path}")
         return output_path
     except Exception as e:
-        print(f"Erro ao salvar o arquivo: {e}")
+        print(f"Erro ao salvar o resultado: {e}")
+        return None
+    finally:
+        if owns_store:
+            store.close()
+
+CORPUS_FORMATS = ("jsonl", "csv")
+# Bytes iniciais do corpus incluídos na impressão digital do checkpoint
+FINGERPRINT_HEAD_BYTES = 1 << 20
+
+def corpus_format(input_path: str, input_format: Optional[str] = None) -> str:
+    """Formato do corpus: `input_format` ou, sem ele, a extensão do arquivo (stdin = JSONL)."""
+    if input_format is not None:
+        if input_format not in CORPUS_FORMATS:
+            raise ValueError(f"Formato de corpus desconhecido: {input_format}")
+        return input_format
+    return "csv" if input_path != "-" and input_path.lower().endswith(".csv") else "jsonl"
+
+def iter_corpus(input_path: str, text_field: str = "text", input_format: Optional[str] = None) -> Iterator[str]:
+    """
+    Lê um corpus de forma preguiçosa, um registro por vez.
+    
+    Aceita JSONL (objetos com `text_field` ou strings JSON) e CSV (coluna
+    `text_field`). Use "-" para ler da entrada padrão; o formato vem de
+    `input_format` ("jsonl" ou "csv") ou da extensão do arquivo, e a
+    entrada padrão sem `input_format` é lida como JSONL.
+    """
+    input_format = corpus_format(input_path, input_format)
+    if input_path == "-":
+        source = sys.stdin
+    else:
+        source = open(input_path, 'r', encoding='utf-8', newline='')
+    try:
+        if input_format == "csv":
+            for row in csv.DictReader(source):
+                yield row.get(text_field) or ""
+            return
+        for line in source:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield record.get(text_field, "") if isinstance(record, dict) else str(record)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+def input_fingerprint(input_path: str) -> Optional[str]:
+    """
+    Impressão digital do corpus gravada no checkpoint: tamanho + SHA-256 do
+    primeiro MB. None para a entrada padrão, que não pode ser conferida.
+    """
+    if input_path == "-":
         return None
+    digest = hashlib.sha256()
+    with open(input_path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_HEAD_BYTES))
+    return f"{os.path.getsize(input_path)}:{digest.hexdigest()}"
+
+def _load_checkpoint(checkpoint_path: str) -> Dict:
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"processed": 0, "output_bytes": 0}
+
+def _save_checkpoint(checkpoint_path: str, checkpoint: Dict) -> None:
+    # Escrita atômica: um crash no meio nunca deixa o checkpoint corrompido
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+def run_corpus_analysis(input_path: str, output_path: str, checkpoint_path: Optional[str] = None,
+                        text_field: str = "text", batch_size: int = 100,
+                        analyzer: Optional[SentimentAnalyzer] = None,
+                        pack_token_budget: Optional[int] = None,
+                        aggregator: Optional[SentimentAggregator] = None,
+                        input_format: Optional[str] = None) -> int:
+    """
+    Analisa um corpus JSONL/CSV em streaming, gravando resultados em JSONL.
+    
+    Os registros são processados em lotes de `batch_size`; após cada lote o
+    arquivo de saída é sincronizado e o checkpoint é atualizado. Ao reiniciar,
+    os registros já processados são pulados e qualquer escrita parcial após o
+    último checkpoint é descartada. O uso de memória é limitado ao lote atual.
+    Se `aggregator` for informado, cada resultado desta execução é agregado.
+    O checkpoint guarda a impressão digital do corpus (ver `input_fingerprint`),
+    e a retomada com outro arquivo de entrada é recusada.
+    
+    Returns:
+        Total de registros processados (incluindo execuções anteriores)
+
+    Raises:
+        ValueError: O checkpoint pertence a outro corpus, ou o formato é desconhecido
+    """
+    checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+    checkpoint = _load_checkpoint(checkpoint_path)
+    processed = checkpoint["processed"]
+    fingerprint = input_fingerprint(input_path)
+    if processed:
+        recorded = checkpoint.get("input")
+        if fingerprint is not None and recorded is not None and recorded != fingerprint:
+            raise ValueError(
+                f"O checkpoint {checkpoint_path} é de outro corpus; apague-o ou use outro --output"
+            )
+        if fingerprint is None or recorded is None:
+            print("Aviso: não é possível confirmar que o checkpoint é deste corpus")
+        print(f"Retomando a partir do registro {processed}...")
+    
+    if analyzer is None:
+        analyzer = SentimentAnalyzer(cache=ResponseCache())
+    
+    records = islice(iter_corpus(input_path, text_field, input_format), processed, None)
+    mode = 'r+' if os.path.exists(output_path) else 'w'
+    with open(output_path, mode, encoding='utf-8') as out:
+        out.seek(checkpoint["output_bytes"])
+        out.truncate()
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            with stage("corpus_batch"):
+                results = analyzer.batch_analyze(batch, pack_token_budget=pack_token_budget)
+            for offset, result in enumerate(results):
+                result["id"] = processed + offset
+                if aggregator is not None:
+                    aggregator.add(result)
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            processed += len(batch)
+            _save_checkpoint(checkpoint_path, {"processed": processed, "output_bytes": out.tell(),
+                                               "input": fingerprint})
+            print(f"  {processed} registros processados")
+    
+    print(f"Análise do corpus concluída: {processed} registros em {output_path}")
+    return processed
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análise de sentimento do ComunicaPro")
+    parser.add_argument("--input", help="Corpus JSONL/CSV a analisar em streaming ('-' para stdin)")
+    parser.add_argument("--output", help="Arquivo JSONL de saída (modo corpus)")
+    parser.add_argument("--checkpoint", help="Arquivo de checkpoint (padrão: <output>.checkpoint)")
+    parser.add_argument("--format", choices=CORPUS_FORMATS, dest="input_format",
+                        help="Formato do corpus (padrão: extensão do arquivo; stdin = jsonl)")
+    parser.add_argument("--text-field", default="text", help="Campo/coluna com o texto")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--pack-token-budget", type=int, help="Agrupa textos curtos por requisição")
+    args = parser.parse_args()
+    
+    if args.input:
+        if not args.output:
+            parser.error("--output é obrigatório com --input")
+        aggregator = SentimentAggregator()
+        try:
+            run_corpus_analysis(args.input, args.output, args.checkpoint, args.text_field,
+                                args.batch_size, pack_token_budget=args.pack_token_budget,
+                                aggregator=aggregator, input_format=args.input_format)
+        except ValueError as e:
+            print(f"Erro: {e}")
+            sys.exit(1)
+        print(json.dumps(aggregator.summary(), indent=2, ensure_ascii=False))
+        sys.exit(0)
+    
     # Texto de exemplo que simula uma nova informação ou dado
     new_data_text = "A integração da Inteligência Artificial nas estratégias de comunicação corporativa não é mais uma opção, mas uma necessidade urgente. Empresas que adotam a IA para personalizar mensagens e automatizar o atendimento ao cliente estão vendo um aumento significativo na satisfação e retenção. No entanto, a preocupação com a ética e a transparência algorítmica continua sendo um ponto de atenção crucial para manter a confiança do público."
     
-    # O diretório de saída é ../research_findings, que é DialogaMente/research_findings
     run_analysis_and_save(new_data_text)
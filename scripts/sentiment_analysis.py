@@ -7,10 +7,181 @@ Tendência: Inteligência Artificial na Comunicação
 """
 
 import os
+import re
+import sys
 import json
-from typing import Dict, List, Optional
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
 from datetime import datetime
-from openai import OpenAI
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from llm_backend import get_backend
+from llm_scheduler import PRIORITY_BATCH
+from metrics import JSON_PARSE_FAILURES, JSON_REPAIRS, SCHEMA_REASKS, stage
+from rate_limiter import RateLimiter, estimate_tokens, retry_with_backoff
+from response_cache import ResponseCache, make_key
+from response_parsing import SENTIMENT_SCHEMA, VALID_SENTIMENTS, invalid_fields, parse_json
+from sentiment_batch import SentimentResultBatch
+from sentiment_lexicon import LexiconScorer
+from sentiment_stats import SentimentAggregator
+from single_flight import SingleFlight
+
+# Incrementar sempre que o prompt ou o esquema de resposta mudar (invalida o cache)
+PROMPT_VERSION = "sentiment-v1"
+SYSTEM_PROMPT = "Você é um especialista em análise de sentimento e processamento de linguagem natural. Sempre responda em JSON válido."
+MAX_TOKENS = 500
+# Orçamento de saída por item no modo empacotado (vários textos por requisição)
+PACKED_TOKENS_PER_ITEM = 150
+# Orçamento de saída por campo ao pedir novamente só os campos ausentes
+REASK_TOKENS_PER_FIELD = 80
+
+RESPONSE_FIELDS = """    "sentiment": "positive" | "neutral" | "negative",
+    "score": <número entre -1 e 1>,
+    "intensity": "low" | "medium" | "high",
+    "keywords": [<lista de palavras-chave>],
+    "insights": "<análise detalhada em 1-2 frases>",
+    "tone": "<tom detectado: formal, informal, agressivo, amigável, etc>",
+    "confidence": <número entre 0 e 1>"""
+
+# Textos acima deste tamanho estimado são analisados em trechos (modo documento longo)
+LONG_DOCUMENT_TOKENS = 3000
+# Tokens de entrada por trecho no modo documento longo
+CHUNK_TOKENS = 1500
+# Máximo de palavras-chave no resultado mesclado de um documento longo
+MAX_MERGED_KEYWORDS = 10
+
+_SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+
+
+def pack_texts(texts: List[str], token_budget: int) -> List[List[int]]:
+    """
+    Agrupa índices de textos em pacotes cujo total estimado de tokens de
+    entrada não ultrapassa `token_budget`.
+
+    Textos maiores que o orçamento ficam sozinhos em seu próprio pacote.
+
+    Returns:
+        Lista de pacotes, cada um com os índices dos textos em `texts`
+    """
+    packs = []
+    current = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > token_budget:
+            packs.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+def split_into_chunks(text: str, chunk_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """
+    Divide um texto em trechos nas fronteiras de frase, cada um com até
+    `chunk_tokens` tokens estimados.
+
+    Frases maiores que o orçamento são cortadas no último espaço antes do limite.
+    """
+    max_chars = chunk_tokens * 4
+    sentences = []
+    for sentence in _SENTENCE_BOUNDARY_RE.split(text):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            sentences.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        if sentence:
+            sentences.append(sentence)
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append(" ".join(current))
+            current = []
+            current_tokens = 0
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def merge_chunk_results(chunks: List[str], results: List[Dict]) -> Dict:
+    """
+    Combina os resultados dos trechos de um documento no esquema de `analyze`.
+
+    Score e confiança são médias ponderadas pelo tamanho do trecho; o
+    sentimento e a intensidade são derivados do score mesclado com os mesmos
+    limites do léxico local. Palavras-chave são ranqueadas pelo peso somado
+    dos trechos em que aparecem e os insights vêm dos maiores trechos.
+    Trechos que falharam são ignorados.
+    """
+    valid = [(len(chunk), result) for chunk, result in zip(chunks, results) if is_valid_result(result)]
+    if not valid:
+        errors = [result.get("error") for result in results if result.get("error")]
+        return {
+            "error": errors[0] if errors else "Nenhum trecho analisado com sucesso",
+            "sentiment": "unknown",
+            "timestamp": datetime.now().isoformat()
+        }
+
+    total = sum(weight for weight, _ in valid)
+    score = sum(weight * result["score"] for weight, result in valid) / total
+    confidence = sum(weight * float(result.get("confidence", 0)) for weight, result in valid) / total
+
+    keyword_weights = Counter()
+    display = {}
+    tones = Counter()
+    for weight, result in valid:
+        for keyword in result.get("keywords") or []:
+            if isinstance(keyword, str) and keyword.strip():
+                key = keyword.strip().casefold()
+                keyword_weights[key] += weight
+                display.setdefault(key, keyword.strip())
+        if result.get("tone"):
+            tones[result["tone"]] += weight
+
+    heaviest = sorted(valid, key=lambda item: item[0], reverse=True)[:3]
+    return {
+        "sentiment": "positive" if score > 0.2 else "negative" if score < -0.2 else "neutral",
+        "score": round(score, 4),
+        "intensity": "high" if abs(score) >= 0.7 else "medium" if abs(score) >= 0.35 else "low",
+        "keywords": [display[key] for key, _ in keyword_weights.most_common(MAX_MERGED_KEYWORDS)],
+        "insights": " ".join(result["insights"] for _, result in heaviest if result.get("insights")),
+        "tone": tones.most_common(1)[0][0] if tones else "indeterminado",
+        "confidence": round(confidence, 4),
+        "chunks": len(chunks),
+        "failed_chunks": len(chunks) - len(valid),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def response_fields(fields: List[str]) -> str:
+    """Linhas de `RESPONSE_FIELDS` restritas aos campos pedidos."""
+    return ",\n".join(
+        line.rstrip(",") for line in RESPONSE_FIELDS.splitlines()
+        if line.strip().split(":", 1)[0].strip('"') in fields
+    )
+
+
+def is_valid_result(result) -> bool:
+    """Verifica se um item de resposta tem os campos mínimos do esquema."""
+    return (
+        isinstance(result, dict)
+        and result.get("sentiment") in VALID_SENTIMENTS
+        and isinstance(result.get("score"), (int, float))
+    )
 
 
 class SentimentAnalyzer:
@@ -19,17 +190,55 @@ class SentimentAnalyzer:
     Fornece classificação de sentimento, intensidade e insights.
     """
     
-    def __init__(self):
-        """Inicializa o cliente OpenAI com credenciais do ambiente."""
-        self.client = OpenAI()
+    def __init__(self, max_concurrency: int = 8,
+                 requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None,
+                 max_retries: int = 3,
+                 cache: Optional[ResponseCache] = None,
+                 lexicon: Optional[LexiconScorer] = None,
+                 lexicon_threshold: float = 0.7,
+                 single_flight: Optional[SingleFlight] = None,
+                 priority: str = PRIORITY_BATCH,
+                 fallback_to_offline: bool = False):
+        """
+        Inicializa o analisador usando o backend de LLM compartilhado.
+
+        Args:
+            max_concurrency: Número máximo de requisições simultâneas em lote
+            requests_per_minute: Orçamento de requisições por minuto (None = ilimitado)
+            tokens_per_minute: Orçamento de tokens por minuto (None = ilimitado)
+            max_retries: Novas tentativas em erros 429/5xx
+            cache: Cache persistente de respostas (None = desativado)
+            lexicon: Classificador local; textos com confiança >= `lexicon_threshold`
+                     não são enviados ao LLM (None = tudo vai ao LLM)
+            lexicon_threshold: Confiança mínima para aceitar o resultado local
+            single_flight: Agrupador de análises idênticas simultâneas
+                           (padrão: um por analisador, só dentro do processo)
+            priority: Faixa do escalonador do LLM ("batch" para lotes,
+                      "interactive" para pedidos de usuários)
+            fallback_to_offline: Usa respostas simuladas se o cliente real não
+                                 puder ser criado (ver `get_backend`)
+        """
+        self.client = get_backend(fallback_to_offline=fallback_to_offline)
         self.model = "gpt-4.1-mini"
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.cache = cache
+        self.lexicon = lexicon
+        self.lexicon_threshold = lexicon_threshold
+        self.routing_stats = {"local": 0, "llm": 0}
+        self._stats_lock = threading.Lock()
+        self.single_flight = single_flight or SingleFlight("sentiment")
+        self.priority = priority
         
-    def analyze(self, text: str) -> Dict:
+    def analyze(self, text: str, bypass_cache: bool = False) -> Dict:
         """
         Analisa o sentimento de um texto.
         
         Args:
             text: Texto a ser analisado
+            bypass_cache: Ignora o cache e força uma nova chamada ao modelo
             
         Returns:
             Dict contendo:
@@ -39,50 +248,128 @@ class SentimentAnalyzer:
                 - keywords: Palavras-chave identificadas
                 - insights: Análise detalhada
         """
-        
+        if self.lexicon is not None:
+            local = self.lexicon.score([text])[0]
+            if local["confidence"] >= self.lexicon_threshold:
+                self._count_route("local")
+                local["timestamp"] = datetime.now().isoformat()
+                return local
+        self._count_route("llm")
+        return self._analyze_text(text, bypass_cache=bypass_cache)
+
+    def _analyze_text(self, text: str, bypass_cache: bool = False) -> Dict:
+        """Envia um texto ao LLM, em trechos se passar de `LONG_DOCUMENT_TOKENS`."""
+        if estimate_tokens(text) > LONG_DOCUMENT_TOKENS:
+            return self.analyze_long(text, bypass_cache=bypass_cache)
+        return self._analyze_llm(text, bypass_cache=bypass_cache)
+
+    def analyze_long(self, text: str, chunk_tokens: int = CHUNK_TOKENS,
+                     max_concurrency: Optional[int] = None, bypass_cache: bool = False) -> Dict:
+        """
+        Analisa um documento longo em trechos paralelos.
+
+        O texto é dividido nas fronteiras de frase em trechos de até
+        `chunk_tokens` tokens, analisados concorrentemente (cada um com
+        cache próprio), e os resultados são mesclados por
+        `merge_chunk_results`. A latência fica limitada pelo trecho mais
+        lento, não pela soma dos trechos.
+
+        Returns:
+            Resultado no esquema de `analyze`, com `chunks` e `failed_chunks`
+        """
+        chunks = split_into_chunks(text, chunk_tokens)
+        if len(chunks) <= 1:
+            return self._analyze_llm(text, bypass_cache=bypass_cache)
+        workers = min(max_concurrency or self.max_concurrency, len(chunks))
+        run = lambda chunk: self._analyze_llm(chunk, bypass_cache=bypass_cache)
+        with stage("analyze_long_chunks"):
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(run, chunks))
+        merged = merge_chunk_results(chunks, results)
+        if "error" not in merged:
+            merged["text_length"] = len(text)
+        return merged
+    
+    def _count_route(self, route: str, count: int = 1) -> None:
+        with self._stats_lock:
+            self.routing_stats[route] += count
+    
+    def get_routing_stats(self) -> Dict:
+        """
+        Retorna quantos textos foram resolvidos localmente pelo léxico e
+        quantos foram enviados ao LLM.
+        """
+        with self._stats_lock:
+            local = self.routing_stats["local"]
+            llm = self.routing_stats["llm"]
+        total = local + llm
+        return {
+            "local": local,
+            "llm": llm,
+            "local_percentage": (local / total * 100) if total else 0,
+        }
+    
+    def _analyze_llm(self, text: str, bypass_cache: bool = False) -> Dict:
+        """
+        Analisa um texto com o LLM (consultando o cache, se houver).
+
+        Análises simultâneas do mesmo texto compartilham uma única chamada
+        ao modelo via `single_flight`.
+        """
+        key = make_key(self.model, PROMPT_VERSION, text)
+        cache_key = key if self.cache is not None else None
+        recheck = None
+        if cache_key is not None and not bypass_cache:
+            cached = self._get_cached(cache_key, text)
+            if cached is not None:
+                return cached
+            # Reconsulta sem contar outro "miss" para o mesmo pedido
+            recheck = lambda: self._get_cached(cache_key, text, peek=True)
+        return self.single_flight.do(key, lambda: self._request_analysis(text, cache_key), recheck=recheck)
+
+    def _get_cached(self, cache_key: str, text: str, peek: bool = False) -> Optional[Dict]:
+        cached = self.cache.peek(cache_key) if peek else self.cache.get(cache_key)
+        if cached is not None:
+            cached["timestamp"] = datetime.now().isoformat()
+            cached["text_length"] = len(text)
+        return cached
+
+    def _request_analysis(self, text: str, cache_key: Optional[str]) -> Dict:
+        """Chama o LLM para um texto e grava o resultado completo no cache."""
         prompt = f"""Analise o sentimento do seguinte texto em português:
 
 "{text}"
 
 Forneça uma resposta em JSON com a seguinte estrutura:
 {{
-    "sentiment": "positive" | "neutral" | "negative",
-    "score": <número entre -1 e 1>,
-    "intensity": "low" | "medium" | "high",
-    "keywords": [<lista de palavras-chave>],
-    "insights": "<análise detalhada em 1-2 frases>",
-    "tone": "<tom detectado: formal, informal, agressivo, amigável, etc>",
-    "confidence": <número entre 0 e 1>
+{RESPONSE_FIELDS}
 }}"""
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um especialista em análise de sentimento e processamento de linguagem natural. Sempre responda em JSON válido."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=500
-            )
-            
-            # Extrair a resposta JSON
-            response_text = response.choices[0].message.content
-            result = json.loads(response_text)
+            response_text = self._complete(prompt)
+            result, repaired = parse_json(response_text)
+            if repaired:
+                JSON_REPAIRS.inc(component="sentiment")
+            result = self._fill_missing(text, result if isinstance(result, dict) else {})
+            if not is_valid_result(result):
+                return {
+                    "error": "Resposta sem os campos obrigatórios",
+                    "sentiment": "unknown",
+                    "timestamp": datetime.now().isoformat()
+                }
             
             # Adicionar metadados
             result["timestamp"] = datetime.now().isoformat()
             result["text_length"] = len(text)
             
+            # Resultados parciais não vão para o cache
+            if cache_key is not None and not invalid_fields(result, SENTIMENT_SCHEMA):
+                self.cache.set(cache_key, result)
+            
             return result
             
         except json.JSONDecodeError:
+            JSON_PARSE_FAILURES.inc(component="sentiment")
             return {
                 "error": "Falha ao processar resposta JSON",
                 "sentiment": "unknown",
@@ -95,55 +382,230 @@ Forneça uma resposta em JSON com a seguinte estrutura:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def batch_analyze(self, texts: List[str]) -> List[Dict]:
+    def _fill_missing(self, text: str, result: Dict) -> Dict:
+        """
+        Pede ao modelo apenas os campos ausentes ou inválidos de uma resposta.
+
+        Os campos já válidos são mantidos; se a nova pergunta falhar, o
+        resultado parcial é devolvido como está.
+        """
+        missing = invalid_fields(result, SENTIMENT_SCHEMA)
+        if not missing:
+            return result
+        SCHEMA_REASKS.inc(component="sentiment")
+        prompt = f"""Analise o sentimento do seguinte texto em português:
+
+"{text}"
+
+Forneça uma resposta em JSON apenas com os campos abaixo:
+{{
+{response_fields(missing)}
+}}"""
+        try:
+            extra, repaired = parse_json(self._complete(prompt, max_tokens=REASK_TOKENS_PER_FIELD * len(missing)))
+            if repaired:
+                JSON_REPAIRS.inc(component="sentiment_reask")
+        except json.JSONDecodeError:
+            JSON_PARSE_FAILURES.inc(component="sentiment_reask")
+            return result
+        except Exception:
+            return result
+        if isinstance(extra, dict):
+            for field in missing:
+                if field not in invalid_fields(extra, SENTIMENT_SCHEMA):
+                    result[field] = extra[field]
+        return result
+
+    def _complete(self, prompt: str, max_tokens: int = MAX_TOKENS) -> str:
+        """
+        Envia o prompt ao modelo respeitando RPM/TPM e repetindo em 429/5xx.
+
+        Returns:
+            Conteúdo textual da resposta do modelo
+        """
+        tokens = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt) + max_tokens
+
+        def request() -> str:
+            self.rate_limiter.acquire(tokens)
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.3,
+                max_tokens=max_tokens,
+                priority=self.priority
+            )
+            return response.choices[0].message.content
+
+        return retry_with_backoff(request, max_retries=self.max_retries)
+
+    def _analyze_pack(self, texts: List[str], bypass_cache: bool = False) -> List[Dict]:
+        """
+        Analisa vários textos em uma única requisição.
+        
+        Respostas truncadas são reparadas: itens com campos faltando recebem
+        uma nova pergunta só com esses campos, e itens ausentes são
+        reenviados individualmente.
+        
+        Returns:
+            Lista de resultados na mesma ordem de `texts`
+        """
+        if len(texts) == 1:
+            return [self._analyze_text(texts[0], bypass_cache=bypass_cache)]
+        
+        items = "\n".join(
+            json.dumps({"id": i, "text": text}, ensure_ascii=False)
+            for i, text in enumerate(texts)
+        )
+        prompt = f"""Analise o sentimento de cada um dos textos em português abaixo (um objeto JSON por linha, com "id" e "text"):
+
+{items}
+
+Forneça uma resposta em JSON no formato {{"results": [...]}}, com exatamente um item por texto e a seguinte estrutura:
+{{
+    "id": <id do texto>,
+{RESPONSE_FIELDS}
+}}"""
+
+        by_id = {}
+        try:
+            response_text = self._complete(prompt, max_tokens=PACKED_TOKENS_PER_ITEM * len(texts))
+            parsed, repaired = parse_json(response_text)
+            if repaired:
+                JSON_REPAIRS.inc(component="sentiment_packed")
+            if isinstance(parsed, dict):
+                parsed = parsed.get("results", [])
+            for item in parsed if isinstance(parsed, list) else []:
+                if isinstance(item, dict) and isinstance(item.get("id"), int):
+                    by_id[item.pop("id")] = item
+        except json.JSONDecodeError:
+            JSON_PARSE_FAILURES.inc(component="sentiment_packed")
+        except Exception:
+            # Falha do pacote inteiro: todos os itens são reenviados individualmente
+            pass
+        
+        results = []
+        for i, text in enumerate(texts):
+            result = by_id.get(i)
+            if result is not None:
+                result = self._fill_missing(text, result)
+            if not is_valid_result(result):
+                results.append(self._analyze_llm(text, bypass_cache=bypass_cache))
+                continue
+            result["timestamp"] = datetime.now().isoformat()
+            result["text_length"] = len(text)
+            if self.cache is not None and not invalid_fields(result, SENTIMENT_SCHEMA):
+                self.cache.set(make_key(self.model, PROMPT_VERSION, text), result)
+            results.append(result)
+        return results
+    
+    def batch_analyze(self, texts: List[str],
+                      max_concurrency: Optional[int] = None,
+                      bypass_cache: bool = False,
+                      pack_token_budget: Optional[int] = None,
+                      columnar: bool = False) -> Union[List[Dict], SentimentResultBatch]:
         """
-        Analisa múltiplos textos.
+        Analisa múltiplos textos em paralelo.
+        
+        As requisições são distribuídas em um pool de threads limitado por
+        `max_concurrency` e pelos orçamentos de RPM/TPM do analisador.
+        Com `pack_token_budget`, vários textos curtos são agrupados em uma
+        mesma requisição até o orçamento de tokens de entrada. Se houver um
+        léxico configurado, o lote inteiro é pontuado localmente primeiro e
+        só os textos de baixa confiança seguem para o LLM.
         
         Args:
             texts: Lista de textos a analisar
+            max_concurrency: Sobrescreve o limite de concorrência da instância
+            bypass_cache: Ignora o cache e força novas chamadas ao modelo
+            pack_token_budget: Tokens de entrada por requisição no modo empacotado
+                               (None = um texto por requisição)
+            columnar: Devolve um `SentimentResultBatch` em vez da lista de dicts
             
         Returns:
-            Lista de resultados de análise
+            Resultados de análise, na mesma ordem de `texts`
         """
-        results = []
-        for text in texts:
-            results.append(self.analyze(text))
-        return results
+        if not texts:
+            return SentimentResultBatch.from_results([]) if columnar else []
+        
+        results: List[Optional[Dict]] = [None] * len(texts)
+        pending = list(range(len(texts)))
+        if self.lexicon is not None:
+            timestamp = datetime.now().isoformat()
+            pending = []
+            for i, local in enumerate(self.lexicon.score(texts)):
+                if local["confidence"] >= self.lexicon_threshold:
+                    local["timestamp"] = timestamp
+                    results[i] = local
+                else:
+                    pending.append(i)
+            self._count_route("local", len(texts) - len(pending))
+        self._count_route("llm", len(pending))
+        
+        if pack_token_budget and self.cache is not None and not bypass_cache:
+            # Acertos de cache não ocupam espaço nos pacotes
+            misses = []
+            for i in pending:
+                text = texts[i]
+                cached = self.cache.get(make_key(self.model, PROMPT_VERSION, text))
+                if cached is None:
+                    misses.append(i)
+                else:
+                    cached["timestamp"] = datetime.now().isoformat()
+                    cached["text_length"] = len(text)
+                    results[i] = cached
+            pending = misses
+        
+        if pack_token_budget:
+            pending_texts = [texts[i] for i in pending]
+            jobs = [[pending[i] for i in pack] for pack in pack_texts(pending_texts, pack_token_budget)]
+            run = lambda job: self._analyze_pack([texts[i] for i in job], bypass_cache=bypass_cache)
+        else:
+            jobs = [[i] for i in pending]
+            run = lambda job: [self._analyze_text(texts[job[0]], bypass_cache=bypass_cache)]
+        
+        if jobs:
+            workers = min(max_concurrency or self.max_concurrency, len(jobs))
+            with stage("batch_analyze_llm"):
+                if workers <= 1:
+                    outputs = [run(job) for job in jobs]
+                else:
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        outputs = list(executor.map(run, jobs))
+            for job, output in zip(jobs, outputs):
+                for i, result in zip(job, output):
+                    results[i] = result
+        return SentimentResultBatch.from_results(results) if columnar else results
     
-    def get_summary_statistics(self, results: List[Dict]) -> Dict:
+    def get_summary_statistics(self, results: Union[List[Dict], SentimentResultBatch]) -> Dict:
         """
         Calcula estatísticas agregadas de múltiplas análises.
         
+        Para volumes grandes ou processamento em shards, use
+        `SentimentAggregator` diretamente e mescle os parciais.
+        
         Args:
-            results: Lista de resultados de análise
+            results: Lista de resultados de análise ou lote colunar
             
         Returns:
             Dict com estatísticas agregadas
         """
-        if not results:
-            return {}
-        
-        sentiments = [r.get("sentiment") for r in results if "sentiment" in r]
-        scores = [r.get("score", 0) for r in results if "score" in r]
-        
-        positive_count = sentiments.count("positive")
-        neutral_count = sentiments.count("neutral")
-        negative_count = sentiments.count("negative")
-        
-        return {
-            "total_analyzed": len(results),
-            "positive_count": positive_count,
-            "neutral_count": neutral_count,
-            "negative_count": negative_count,
-            "positive_percentage": (positive_count / len(results) * 100) if results else 0,
-            "average_score": sum(scores) / len(scores) if scores else 0,
-            "timestamp": datetime.now().isoformat()
-        }
+        if isinstance(results, SentimentResultBatch):
+            return results.stats()
+        return SentimentAggregator().update(results).summary()
 
 
 def main():
     """Função principal para teste do módulo."""
-    analyzer = SentimentAnalyzer()
+    analyzer = SentimentAnalyzer(lexicon=LexiconScorer())
     
     # Textos de exemplo para teste
     test_texts = [
@@ -174,6 +636,11 @@ def main():
     print("Estatísticas Agregadas:")
     print("=" * 60)
     print(json.dumps(stats, indent=2, ensure_ascii=False))
+    
+    routing = analyzer.get_routing_stats()
+    print()
+    print(f"Resolvidos localmente pelo léxico: {routing['local']} "
+          f"({routing['local_percentage']:.1f}%), enviados ao LLM: {routing['llm']}")
 
 
 if __name__ == "__main__":
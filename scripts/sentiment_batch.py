@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Representação colunar compacta de lotes de resultados de sentimento.
+
+`SentimentResultBatch` guarda cada campo do resultado em uma coluna NumPy:
+score e confidence como float32 (NaN = ausente), sentiment, intensity e
+tone como códigos categóricos int8/int16 sobre vocabulários pequenos,
+timestamp como int64 (microssegundos desde a época) e as palavras-chave
+em formato CSR (ids int32 + offsets) sobre um pool de strings internadas,
+com um bit por registro indicando se o campo `keywords` existia.
+Um milhão de resultados ocupa dezenas de MB em vez de gigabytes, e
+filtros e estatísticas são operações vetorizadas.
+
+Para compatibilidade, `batch[i]` e a iteração devolvem dicts no formato de
+`SentimentAnalyzer.analyze`.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from response_parsing import VALID_SENTIMENTS
+
+INTENSITIES = ("low", "medium", "high")
+TIMESTAMP_MISSING = np.iinfo(np.int64).min
+DEFAULT_PERCENTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Campos com coluna própria; os demais vão para `extras` (esparso)
+COLUMN_FIELDS = ("sentiment", "score", "intensity", "keywords", "insights", "tone",
+                 "confidence", "timestamp", "text_length")
+NUMERIC_COLUMNS = ("score", "confidence", "sentiment_codes", "intensity_codes", "tone_codes",
+                   "timestamps", "text_length", "keyword_ids", "keyword_offsets", "has_keywords")
+
+
+def _to_micros(value) -> int:
+    if not isinstance(value, str):
+        return TIMESTAMP_MISSING
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return TIMESTAMP_MISSING
+    return int(moment.timestamp()) * 1_000_000 + moment.microsecond
+
+
+def _from_micros(value: int) -> Optional[str]:
+    if value == TIMESTAMP_MISSING:
+        return None
+    seconds, micros = divmod(int(value), 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=micros).isoformat()
+
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+
+class _Vocabulary:
+    """Internação de strings: cada valor distinto recebe um código inteiro."""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values = list(values)
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value) -> int:
+        if not isinstance(value, str):
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class SentimentResultBatch:
+    """
+    Lote colunar de resultados de análise de sentimento.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], sentiments: Sequence[str], intensities: Sequence[str],
+                 tones: Sequence[str], keyword_pool: Sequence[str], insights: List[Optional[str]],
+                 extras: Optional[Dict[int, Dict]] = None):
+        """
+        Use `from_results` ou `load` para criar lotes; este construtor
+        recebe as colunas já montadas.
+
+        Args:
+            columns: Arrays de `NUMERIC_COLUMNS` (keyword_offsets tem N + 1 posições;
+                     has_keywords marca os registros que traziam `keywords`)
+            sentiments, intensities, tones: Vocabulários dos códigos categóricos
+            keyword_pool: Strings internadas apontadas por `keyword_ids`
+            insights: Texto de insights por registro
+            extras: Campos fora do esquema por índice (ex.: error, id, chunks)
+        """
+        for name in NUMERIC_COLUMNS:
+            setattr(self, name, columns[name])
+        self.sentiments = list(sentiments)
+        self.intensities = list(intensities)
+        self.tones = list(tones)
+        self.keyword_pool = list(keyword_pool)
+        self._keyword_codes = {keyword: code for code, keyword in enumerate(self.keyword_pool)}
+        self.insights = insights
+        self.extras = extras or {}
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict]) -> "SentimentResultBatch":
+        """Converte resultados no formato de `SentimentAnalyzer.analyze` (None = resultado ausente)."""
+        sentiments, intensities = _Vocabulary(VALID_SENTIMENTS), _Vocabulary(INTENSITIES)
+        tones, pool = _Vocabulary(), _Vocabulary()
+        score, confidence, sentiment_codes, intensity_codes, tone_codes = [], [], [], [], []
+        timestamps, text_length, keyword_ids, keyword_offsets, has_keywords = [], [], [], [0], []
+        insights, extras = [], {}
+        for index, result in enumerate(results):
+            result = result or {}
+            score.append(_number(result.get("score")))
+            confidence.append(_number(result.get("confidence")))
+            sentiment_codes.append(sentiments.code(result.get("sentiment")))
+            intensity_codes.append(intensities.code(result.get("intensity")))
+            tone_codes.append(tones.code(result.get("tone")))
+            timestamps.append(_to_micros(result.get("timestamp")))
+            length = result.get("text_length")
+            text_length.append(length if isinstance(length, int) else -1)
+            keywords = result.get("keywords")
+            if isinstance(keywords, list):
+                keyword_ids.extend(pool.code(keyword) for keyword in keywords if isinstance(keyword, str))
+            keyword_offsets.append(len(keyword_ids))
+            has_keywords.append(isinstance(keywords, list))
+            insight = result.get("insights")
+            insights.append(insight if isinstance(insight, str) else None)
+            extra = {key: value for key, value in result.items() if key not in COLUMN_FIELDS}
+            if extra:
+                extras[index] = extra
+
+        columns = {
+            "score": np.array(score, dtype=np.float32),
+            "confidence": np.array(confidence, dtype=np.float32),
+            "sentiment_codes": np.array(sentiment_codes, dtype=np.int8),
+            "intensity_codes": np.array(intensity_codes, dtype=np.int8),
+            "tone_codes": np.array(tone_codes, dtype=np.int16 if len(tones.values) < 32767 else np.int32),
+            "timestamps": np.array(timestamps, dtype=np.int64),
+            "text_length": np.array(text_length, dtype=np.int32),
+            "keyword_ids": np.array(keyword_ids, dtype=np.int32),
+            "keyword_offsets": np.array(keyword_offsets, dtype=np.int64),
+            "has_keywords": np.array(has_keywords, dtype=bool),
+        }
+        return cls(columns, sentiments.values, intensities.values, tones.values, pool.values, insights, extras)
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def keywords(self, index: int) -> List[str]:
+        """Palavras-chave do registro `index`."""
+        ids = self.keyword_ids[self.keyword_offsets[index]:self.keyword_offsets[index + 1]]
+        return [self.keyword_pool[i] for i in ids]
+
+    def record(self, index: int) -> Dict:
+        """Registro `index` como dict no formato de `SentimentAnalyzer.analyze`."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        record = {}
+        fields = (
+            ("sentiment", self.sentiments, self.sentiment_codes),
+            ("intensity", self.intensities, self.intensity_codes),
+            ("tone", self.tones, self.tone_codes),
+        )
+        for name, vocabulary, codes in fields:
+            if codes[index] >= 0:
+                record[name] = vocabulary[codes[index]]
+        for name, column in (("score", self.score), ("confidence", self.confidence)):
+            if not np.isnan(column[index]):
+                # float32 -> float com a precisão decimal original (ex.: 0.7, não 0.699999988)
+                record[name] = float(np.format_float_positional(column[index]))
+        if self.has_keywords[index]:
+            record["keywords"] = self.keywords(index)
+        if self.insights[index] is not None:
+            record["insights"] = self.insights[index]
+        timestamp = _from_micros(self.timestamps[index])
+        if timestamp is not None:
+            record["timestamp"] = timestamp
+        if self.text_length[index] >= 0:
+            record["text_length"] = int(self.text_length[index])
+        record.update(self.extras.get(index, {}))
+        return record
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray, Sequence[int]]):
+        """`batch[i]` devolve um dict; fatias, máscaras e listas de índices devolvem um novo lote."""
+        if isinstance(key, (int, np.integer)):
+            return self.record(int(key))
+        if isinstance(key, slice):
+            key = np.arange(len(self))[key]
+        key = np.asarray(key)
+        return self.take(np.flatnonzero(key) if key.dtype == bool else key)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def take(self, indices: np.ndarray) -> "SentimentResultBatch":
+        """Novo lote com os registros `indices` (vocabulários compartilhados)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        starts, ends = self.keyword_offsets[indices], self.keyword_offsets[indices + 1]
+        lengths = ends - starts
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Posição de cada palavra-chave selecionada no array original
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        columns = {
+            name: getattr(self, name)[indices]
+            for name in NUMERIC_COLUMNS if name not in ("keyword_ids", "keyword_offsets")
+        }
+        columns["keyword_ids"] = self.keyword_ids[positions]
+        columns["keyword_offsets"] = offsets
+        extras = {}
+        for new_index, old_index in enumerate(indices.tolist()):
+            if old_index in self.extras:
+                extras[new_index] = self.extras[old_index]
+        return SentimentResultBatch(columns, self.sentiments, self.intensities, self.tones, self.keyword_pool,
+                                    [self.insights[i] for i in indices.tolist()], extras)
+
+    def mask(self, sentiment: Optional[str] = None, min_score: Optional[float] = None,
+             max_score: Optional[float] = None, min_confidence: Optional[float] = None,
+             start: Optional[str] = None, end: Optional[str] = None, keyword: Optional[str] = None) -> np.ndarray:
+        """
+        Máscara booleana vetorizada dos registros que atendem a todos os filtros.
+
+        Args:
+            sentiment: Sentimento exato
+            min_score, max_score: Intervalo inclusivo do score
+            min_confidence: Confiança mínima
+            start, end: Intervalo de timestamp ISO 8601 (início inclusivo, fim exclusivo)
+            keyword: Palavra-chave presente (comparação exata)
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if sentiment is not None:
+            code = self.sentiments.index(sentiment) if sentiment in self.sentiments else -2
+            mask &= self.sentiment_codes == code
+        if min_score is not None:
+            mask &= self.score >= min_score
+        if max_score is not None:
+            mask &= self.score <= max_score
+        if min_confidence is not None:
+            mask &= self.confidence >= min_confidence
+        if start is not None:
+            mask &= self.timestamps >= _to_micros(start)
+        if end is not None:
+            mask &= (self.timestamps < _to_micros(end)) & (self.timestamps != TIMESTAMP_MISSING)
+        if keyword is not None:
+            hits = np.zeros(len(self), dtype=bool)
+            code = self._keyword_codes.get(keyword)
+            if code is not None:
+                matches = np.flatnonzero(self.keyword_ids == code)
+                hits[np.searchsorted(self.keyword_offsets, matches, side="right") - 1] = True
+            mask &= hits
+        return mask
+
+    def filter(self, **criteria) -> "SentimentResultBatch":
+        """Novo lote com os registros que atendem aos filtros de `mask`."""
+        return self.take(np.flatnonzero(self.mask(**criteria)))
+
+    def counts(self) -> Dict[str, int]:
+        """Contagem por sentimento."""
+        counts = np.bincount(self.sentiment_codes[self.sentiment_codes >= 0], minlength=len(self.sentiments))
+        return {sentiment: int(count) for sentiment, count in zip(self.sentiments, counts)}
+
+    def stats(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict:
+        """
+        Estatísticas agregadas no formato de `SentimentAnalyzer.get_summary_statistics`,
+        com percentis exatos em vez de aproximados pelo histograma.
+        """
+        total = len(self)
+        if not total:
+            return {}
+        counts = self.counts()
+        scores = self.score[~np.isnan(self.score)].astype(np.float64)
+        return {
+            "total_analyzed": total,
+            "positive_count": counts.get("positive", 0),
+            "neutral_count": counts.get("neutral", 0),
+            "negative_count": counts.get("negative", 0),
+            "positive_percentage": counts.get("positive", 0) / total * 100,
+            "average_score": float(scores.mean()) if len(scores) else 0.0,
+            "score_stddev": float(scores.std(ddof=1)) if len(scores) > 1 else 0.0,
+            "score_percentiles": {
+                f"p{int(round(q * 100))}": (
+                    round(float(np.quantile(scores, q, method="inverted_cdf")), 3) if len(scores) else 0.0)
+                for q in percentiles
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def to_jsonl(self, path: str) -> int:
+        """Grava um registro JSON por linha (sem materializar a lista de dicts). Retorna o total gravado."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in self:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return len(self)
+
+    def save(self, directory: str) -> None:
+        """
+        Exporta as colunas numéricas como arquivos `.npy` (gravados direto do
+        buffer dos arrays) e os vocabulários, insights e extras em `meta.json`.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in NUMERIC_COLUMNS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        meta = {
+            "sentiments": self.sentiments,
+            "intensities": self.intensities,
+            "tones": self.tones,
+            "keyword_pool": self.keyword_pool,
+            "insights": self.insights,
+            "extras": {str(index): extra for index, extra in self.extras.items()},
+        }
+        with open(os.path.join(directory, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "SentimentResultBatch":
+        """Carrega um lote salvo por `save` (colunas mapeadas em memória por padrão)."""
+        columns = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in NUMERIC_COLUMNS if os.path.exists(os.path.join(directory, f"{name}.npy"))
+        }
+        with open(os.path.join(directory, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if "has_keywords" not in columns:
+            # Lotes salvos antes do bit de presença: keywords em todo resultado válido sem erro
+            errors = [int(index) for index, extra in meta["extras"].items() if "error" in extra]
+            has_keywords = np.asarray(columns["sentiment_codes"]) >= 0
+            has_keywords[errors] = False
+            columns["has_keywords"] = has_keywords
+        return cls(columns, meta["sentiments"], meta["intensities"], meta["tones"], meta["keyword_pool"],
+                   meta["insights"], {int(index): extra for index, extra in meta["extras"].items()})
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Classificador de sentimento local baseado em léxico para português.
+
+Atende os casos óbvios ("Adorei o produto!", "Péssima experiência") sem
+chamar o LLM. A pontuação é vetorizada com NumPy sobre o lote inteiro:
+os textos são normalizados e tokenizados em uma única passada e as somas
+por texto são feitas com `np.bincount`. Trata negação ("não gostei") e
+intensificadores ("muito bom") em uma janela curta de tokens, que não
+atravessa fim de oração (`.`, `,`, `!`, `?`, `;`).
+"""
+
+import re
+import unicodedata
+from typing import Dict, List
+
+import numpy as np
+
+# Polaridade dos termos (palavras fortes = 2.0, moderadas = 1.0, fracas = 0.5)
+LEXICON = {
+    # Positivos
+    "adorei": 2.0, "adoro": 2.0, "amei": 2.0, "amo": 2.0, "excelente": 2.0, "excelentes": 2.0,
+    "perfeito": 2.0, "perfeita": 2.0, "maravilhoso": 2.0, "maravilhosa": 2.0, "incrível": 2.0,
+    "fantástico": 2.0, "fantástica": 2.0, "sensacional": 2.0, "espetacular": 2.0, "ótimo": 2.0,
+    "ótima": 2.0, "ótimos": 2.0, "ótimas": 2.0, "superou": 1.5, "recomendo": 1.5, "impecável": 2.0,
+    "bom": 1.0, "boa": 1.0, "bons": 1.0, "boas": 1.0, "gostei": 1.0, "gosto": 1.0, "feliz": 1.0,
+    "satisfeito": 1.0, "satisfeita": 1.0, "rápido": 1.0, "rápida": 1.0, "eficiente": 1.0,
+    "agradável": 1.0, "bonito": 1.0, "bonita": 1.0, "lindo": 1.5, "linda": 1.5, "qualidade": 0.5,
+    "útil": 1.0, "fácil": 1.0, "prático": 1.0, "prática": 1.0, "confiável": 1.0, "atencioso": 1.0,
+    "atenciosa": 1.0, "eficaz": 1.0, "parabéns": 1.5, "obrigado": 0.5, "obrigada": 0.5,
+    "melhor": 1.0, "top": 1.0, "show": 1.0, "funciona": 0.5, "ok": 0.5, "adequado": 0.5,
+    "especial": 0.5, "positivo": 1.0, "positiva": 1.0, "sucesso": 1.0, "confiança": 0.5,
+    "aumento": 0.5, "satisfação": 1.0,
+    # Negativos
+    "péssimo": -2.0, "péssima": -2.0, "horrível": -2.0, "horrorosa": -2.0, "horroroso": -2.0,
+    "terrível": -2.0, "odiei": -2.0, "odeio": -2.0, "lixo": -2.0, "decepcionante": -2.0,
+    "decepção": -2.0, "detestei": -2.0, "absurdo": -1.5, "vergonha": -1.5, "golpe": -2.0,
+    "ruim": -1.0, "ruins": -1.0, "defeito": -1.5, "defeituoso": -1.5, "quebrado": -1.5,
+    "quebrada": -1.5, "atraso": -1.0, "atrasado": -1.0, "atrasada": -1.0, "demora": -1.0,
+    "demorado": -1.0, "lento": -1.0, "lenta": -1.0, "caro": -0.5, "cara": -0.5, "problema": -1.0,
+    "problemas": -1.0, "reclamação": -1.0, "insatisfeito": -1.5, "insatisfeita": -1.5,
+    "triste": -1.0, "pior": -1.5, "piores": -1.5, "difícil": -0.5, "confuso": -1.0, "confusa": -1.0,
+    "falha": -1.0, "falhou": -1.0, "erro": -1.0, "errado": -1.0, "errada": -1.0, "frustrante": -1.5,
+    "frustrado": -1.5, "frustrada": -1.5, "inútil": -1.5, "mal": -1.0, "medo": -1.0,
+    "preocupação": -0.5, "arrependido": -1.5, "arrependida": -1.5, "negativo": -1.0, "negativa": -1.0,
+    "cancelar": -0.5, "reembolso": -0.5,
+}
+
+NEGATORS = ("não", "nao", "nunca", "jamais", "nem", "nada", "sem", "nenhum", "nenhuma")
+INTENSIFIERS = ("muito", "muita", "super", "extremamente", "bastante", "totalmente", "demais", "tão")
+
+NEGATION_WINDOW = 3
+INTENSIFIER_BOOST = 1.5
+# Suavização da normalização do score: score = soma / sqrt(soma² + ALPHA)
+ALPHA = 4.0
+# Escala da "cobertura": confiança cresce com a massa de termos polares
+COVERAGE_SCALE = 1.5
+
+_SEPARATOR = "\x00"
+# Pontuação que encerra a oração: zera as janelas de negação e intensificação
+_CLAUSE_BREAKS = ".,!?;"
+_TOKEN_RE = re.compile(r"[a-z]+|[\x00.,!?;]")
+
+
+def _fold(text: str) -> str:
+    """Remove acentos e converte para minúsculas."""
+    return unicodedata.normalize("NFD", text).encode("ascii", "ignore").decode("ascii").lower()
+
+
+class LexiconScorer:
+    """
+    Pontuador vetorizado de sentimento para lotes de textos em português.
+    """
+
+    def __init__(self, lexicon: Dict[str, float] = None):
+        """
+        Args:
+            lexicon: Mapa termo -> polaridade (padrão: `LEXICON`)
+        """
+        lexicon = LEXICON if lexicon is None else lexicon
+        # Código 0 = termo desconhecido, 1 = separador de textos, 2 = fim de oração
+        self._vocab = {_SEPARATOR: 1, **{mark: 2 for mark in _CLAUSE_BREAKS}}
+        polarity = [0.0, 0.0, 0.0]
+        negators = [False, False, False]
+        intensifiers = [False, False, False]
+
+        def code_for(term: str) -> int:
+            key = _fold(term)
+            if key not in self._vocab:
+                self._vocab[key] = len(polarity)
+                polarity.append(0.0)
+                negators.append(False)
+                intensifiers.append(False)
+            return self._vocab[key]
+
+        for term, value in lexicon.items():
+            polarity[code_for(term)] = value
+        for term in NEGATORS:
+            negators[code_for(term)] = True
+        for term in INTENSIFIERS:
+            intensifiers[code_for(term)] = True
+        self._polarity = np.array(polarity, dtype=np.float64)
+        self._is_negator = np.array(negators, dtype=bool)
+        self._is_intensifier = np.array(intensifiers, dtype=bool)
+
+    def score_arrays(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Pontua um lote de textos e retorna arrays alinhados com `texts`.
+
+        Returns:
+            Dict com arrays "score" (-1 a 1), "confidence" (0 a 1) e
+            "hits" (número de termos polares encontrados)
+        """
+        n = len(texts)
+        joined = _fold(_SEPARATOR.join(t.replace(_SEPARATOR, " ") for t in texts))
+        tokens = _TOKEN_RE.findall(joined)
+        vocab = self._vocab
+        codes = np.fromiter((vocab.get(t, 0) for t in tokens), dtype=np.int32, count=len(tokens))
+
+        doc = np.cumsum(codes == 1)
+        breaks = (codes == 1) | (codes == 2)
+        clause = np.cumsum(breaks)
+        keep = ~breaks
+        codes = codes[keep]
+        doc = doc[keep]
+        clause = clause[keep]
+
+        values = self._polarity[codes]
+        negators = self._is_negator[codes]
+        intensifiers = self._is_intensifier[codes]
+
+        # Negação e intensificação olham os tokens anteriores da mesma oração
+        negated = np.zeros(len(codes), dtype=bool)
+        for k in range(1, NEGATION_WINDOW + 1):
+            negated[k:] |= negators[:-k] & (clause[k:] == clause[:-k])
+        boosted = np.zeros(len(codes), dtype=bool)
+        boosted[1:] = intensifiers[:-1] & (clause[1:] == clause[:-1])
+        values = np.where(negated, -values, values)
+        values = np.where(boosted, values * INTENSIFIER_BOOST, values)
+
+        total = np.bincount(doc, weights=values, minlength=n)
+        mass = np.bincount(doc, weights=np.abs(values), minlength=n)
+        hits = np.bincount(doc, weights=values != 0, minlength=n).astype(np.int64)
+
+        score = total / np.sqrt(total * total + ALPHA)
+        agreement = np.divide(np.abs(total), mass, out=np.zeros(n), where=mass > 0)
+        confidence = agreement * (1.0 - np.exp(-mass / COVERAGE_SCALE))
+        return {"score": score, "confidence": confidence, "hits": hits}
+
+    def score(self, texts: List[str]) -> List[Dict]:
+        """
+        Pontua um lote de textos no mesmo esquema de `SentimentAnalyzer.analyze`.
+
+        Returns:
+            Lista de dicts com sentiment, score, intensity, confidence e metadados
+        """
+        arrays = self.score_arrays(texts)
+        scores = np.round(arrays["score"], 3).tolist()
+        confidences = np.round(arrays["confidence"], 3).tolist()
+        hits = arrays["hits"].tolist()
+        results = []
+        for text, score, confidence, hit_count in zip(texts, scores, confidences, hits):
+            results.append({
+                "sentiment": "positive" if score > 0.2 else "negative" if score < -0.2 else "neutral",
+                "score": score,
+                "intensity": "high" if abs(score) >= 0.7 else "medium" if abs(score) >= 0.35 else "low",
+                "keywords": [],
+                "insights": f"Classificação local por léxico ({hit_count} termos de polaridade).",
+                "tone": "indeterminado",
+                "confidence": confidence,
+                "source": "lexicon",
+                "text_length": len(text),
+            })
+        return results
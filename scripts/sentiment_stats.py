@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agregação incremental e mesclável de resultados de análise de sentimento.
+
+`SentimentAggregator` consome resultados um a um com memória O(1):
+contagens por sentimento, média/variância de Welford e um histograma de
+resolução fixa para percentis do score. Como o score é limitado a [-1, 1],
+o histograma tem tamanho constante e a mesclagem entre shards é exata.
+"""
+
+import math
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+SENTIMENTS = ("positive", "neutral", "negative")
+
+# Resolução do histograma de scores em [-1, 1] (erro máximo dos percentis)
+SCORE_RESOLUTION = 0.001
+_BINS = int(round(2 / SCORE_RESOLUTION)) + 1
+
+
+class SentimentAggregator:
+    """
+    Acumulador de estatísticas de sentimento em uma única passada.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.sentiment_counts = {sentiment: 0 for sentiment in SENTIMENTS}
+        self.score_count = 0
+        self.score_mean = 0.0
+        self._score_m2 = 0.0
+        self.score_min = math.inf
+        self.score_max = -math.inf
+        self._histogram = [0] * _BINS
+
+    def add(self, result: Dict) -> None:
+        """Incorpora um resultado de `SentimentAnalyzer.analyze`."""
+        self.total += 1
+        sentiment = result.get("sentiment")
+        if sentiment in self.sentiment_counts:
+            self.sentiment_counts[sentiment] += 1
+
+        score = result.get("score")
+        if not isinstance(score, (int, float)):
+            return
+        self.score_count += 1
+        delta = score - self.score_mean
+        self.score_mean += delta / self.score_count
+        self._score_m2 += delta * (score - self.score_mean)
+        self.score_min = min(self.score_min, score)
+        self.score_max = max(self.score_max, score)
+        clamped = min(1.0, max(-1.0, score))
+        self._histogram[int(round((clamped + 1) / SCORE_RESOLUTION))] += 1
+
+    def update(self, results: Iterable[Dict]) -> "SentimentAggregator":
+        """Incorpora vários resultados e retorna o próprio agregador."""
+        for result in results:
+            self.add(result)
+        return self
+
+    def merge(self, other: "SentimentAggregator") -> "SentimentAggregator":
+        """
+        Mescla outro agregador (ex.: de um shard paralelo) neste.
+
+        Usa a combinação de Chan et al. para média e variância.
+        """
+        self.total += other.total
+        for sentiment, count in other.sentiment_counts.items():
+            self.sentiment_counts[sentiment] += count
+
+        if other.score_count:
+            count = self.score_count + other.score_count
+            delta = other.score_mean - self.score_mean
+            self.score_mean += delta * other.score_count / count
+            self._score_m2 += other._score_m2 + delta * delta * self.score_count * other.score_count / count
+            self.score_count = count
+            self.score_min = min(self.score_min, other.score_min)
+            self.score_max = max(self.score_max, other.score_max)
+            self._histogram = [a + b for a, b in zip(self._histogram, other._histogram)]
+        return self
+
+    @property
+    def score_variance(self) -> float:
+        """Variância amostral dos scores."""
+        return self._score_m2 / (self.score_count - 1) if self.score_count > 1 else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Retorna o percentil `q` (0 a 1) dos scores, com erro de até
+        `SCORE_RESOLUTION`.
+        """
+        if not self.score_count:
+            return 0.0
+        target = max(1, math.ceil(q * self.score_count))
+        cumulative = 0
+        for index, count in enumerate(self._histogram):
+            cumulative += count
+            if cumulative >= target:
+                return round(index * SCORE_RESOLUTION - 1, 3)
+        return self.score_max
+
+    def summary(self, percentiles: List[float] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> Dict:
+        """
+        Retorna as estatísticas agregadas no formato de
+        `SentimentAnalyzer.get_summary_statistics`.
+        """
+        if not self.total:
+            return {}
+        positive = self.sentiment_counts["positive"]
+        return {
+            "total_analyzed": self.total,
+            "positive_count": positive,
+            "neutral_count": self.sentiment_counts["neutral"],
+            "negative_count": self.sentiment_counts["negative"],
+            "positive_percentage": positive / self.total * 100,
+            "average_score": self.score_mean,
+            "score_stddev": math.sqrt(self.score_variance),
+            "score_percentiles": {
+                f"p{int(round(q * 100))}": self.quantile(q) for q in percentiles
+            },
+            "timestamp": datetime.now().isoformat()
+        }
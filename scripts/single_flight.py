@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Coalescência de chamadas idênticas em andamento ("single-flight").
+
+Quando várias threads pedem o mesmo resultado ao mesmo tempo, só a
+primeira (líder) executa a chamada ao LLM; as demais esperam e recebem
+uma cópia do mesmo resultado. Com `lock_dir`, a líder também disputa um
+lock de arquivo por chave, de modo que processos diferentes (workers,
+instâncias da API) não repitam a chamada: quem espera o lock consulta
+`recheck` (tipicamente o cache compartilhado) antes de chamar o LLM.
+O arquivo de lock é removido por quem o libera, então o diretório só
+guarda locks de chamadas em andamento.
+
+Configuração:
+    COMUNICAPRO_SINGLE_FLIGHT_DIR  Diretório dos locks entre processos
+"""
+
+import copy
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: apenas coalescência dentro do processo
+    fcntl = None
+
+from metrics import counter
+
+COALESCED_CALLS = counter("single_flight_calls", "Chamadas por papel no single-flight (leader/follower/recheck)")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave em uma única execução.
+    """
+
+    def __init__(self, name: str, lock_dir: Optional[str] = None):
+        """
+        Args:
+            name: Nome usado nas métricas
+            lock_dir: Diretório dos locks entre processos (padrão:
+                      COMUNICAPRO_SINGLE_FLIGHT_DIR; None = só dentro do processo)
+        """
+        self.name = name
+        self.lock_dir = lock_dir or os.environ.get("COMUNICAPRO_SINGLE_FLIGHT_DIR") or None
+        if self.lock_dir and fcntl is not None:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _file_lock(self, key: str):
+        if not self.lock_dir or fcntl is None:
+            yield
+            return
+        path = os.path.join(self.lock_dir, f"{self.name}-{key}.lock")
+        while True:
+            f = open(path, "a")
+            fcntl.flock(f, fcntl.LOCK_EX)
+            # Quem liberou antes pode ter removido o arquivo enquanto esperávamos:
+            # o lock só vale se ainda for o arquivo presente no caminho
+            try:
+                if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            f.close()
+        try:
+            yield
+        finally:
+            # Remove ainda segurando o lock; quem esperava no arquivo antigo tenta de novo
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    def do(self, key: str, fn: Callable[[], Any], recheck: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Executa `fn` uma única vez para todas as chamadas simultâneas com `key`.
+
+        Args:
+            key: Identificador da requisição (ex.: chave de cache)
+            fn: Chamada cara a executar
+            recheck: Consulta barata feita pela líder (após obter o lock entre
+                     processos, se houver); um valor diferente de None evita `fn`
+
+        Returns:
+            O resultado de `fn` (as seguidoras recebem uma cópia profunda)
+
+        Raises:
+            A exceção de `fn`, repassada a todas as chamadas agrupadas
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+
+        if not leader:
+            COALESCED_CALLS.inc(name=self.name, role="follower")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        COALESCED_CALLS.inc(name=self.name, role="leader")
+        try:
+            with self._file_lock(key):
+                result = recheck() if recheck is not None else None
+                if result is not None:
+                    COALESCED_CALLS.inc(name=self.name, role="recheck")
+                else:
+                    result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # Sem novas seguidoras a partir daqui; a cópia protege o resultado
+            # de alterações feitas por quem chamou a líder
+            if call.followers and call.error is None:
+                call.result = copy.deepcopy(result)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Número de chaves com chamada em andamento."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do pipeline diário: um dia em que a análise de sentimento falha,
+seguido de um dia sem tendências novas, não pode perder os insights.
+
+Uso:
+    python3 -m unittest scripts/test_pipeline.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import daily_update
+import pipeline
+from near_duplicates import DuplicateIndex, insight_text
+
+TRENDS = {
+    "last_updated": "2026-01-01T08:00:00",
+    "trends": [
+        {"title": "Neuroplasticidade e aprendizagem de adultos", "summary": "Estudo sobre treino de atenção"},
+        {"title": "Comunicação não violenta em equipes remotas", "summary": "Pesquisa com gestores de produto"},
+    ],
+}
+
+
+class FakeAnalyzer:
+    """Analisador que falha enquanto `FakeAnalyzer.fail` for verdadeiro."""
+    fail = False
+    analyzed = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def batch_analyze(self, texts):
+        if FakeAnalyzer.fail:
+            raise RuntimeError("LLM indisponível")
+        FakeAnalyzer.analyzed.extend(texts)
+        return [{"text": text, "sentiment": "neutral", "score": 0.0} for text in texts]
+
+
+class FakeStore:
+    def append_many(self, results, source=None):
+        return len(results)
+
+    def close(self):
+        pass
+
+
+class FailedDayThenUnchangedDayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        data_dir = os.path.join(self.tmp, 'research_data')
+        findings_dir = os.path.join(self.tmp, 'research_findings')
+        os.makedirs(data_dir)
+        index_path = os.path.join(self.tmp, 'near_duplicates.sqlite')
+        self.state_path = os.path.join(self.tmp, 'pipeline_state.json')
+        FakeAnalyzer.fail = False
+        FakeAnalyzer.analyzed = []
+        patches = [
+            mock.patch.object(daily_update, 'RESEARCH_DATA_DIR', data_dir),
+            mock.patch.object(daily_update, 'RESEARCH_FINDINGS_DIR', findings_dir),
+            mock.patch.object(daily_update, 'DuplicateIndex', lambda: DuplicateIndex(index_path)),
+            mock.patch.object(pipeline, 'RESEARCH_DATA_DIR', data_dir),
+            mock.patch.object(pipeline, 'RESEARCH_FINDINGS_DIR', findings_dir),
+            mock.patch.object(pipeline, 'fetch_latest_trends', lambda: dict(TRENDS)),
+            mock.patch.object(pipeline, 'SentimentAnalyzer', FakeAnalyzer),
+            mock.patch.object(pipeline, 'ResponseCache', lambda: None),
+            mock.patch.object(pipeline, 'ResultStore', FakeStore),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def run_day(self, day):
+        steps = [step for step in pipeline.daily_pipeline(day)
+                 if step.name in ("fetch_trends", "sentiment_new_insights")]
+        return pipeline.Pipeline(steps, self.state_path).run()
+
+    def test_pending_insights_survive_failed_day(self):
+        FakeAnalyzer.fail = True
+        report = self.run_day(datetime(2026, 1, 1))
+        self.assertEqual(report["sentiment_new_insights"]["status"], "failed")
+        self.assertEqual(len(daily_update.pending_insights()), 2)
+
+        # Dia seguinte: a busca devolve as mesmas tendências (fetch_trends não seleciona nada)
+        FakeAnalyzer.fail = False
+        report = self.run_day(datetime(2026, 1, 2))
+        self.assertEqual(report["sentiment_new_insights"]["status"], "ran")
+        self.assertEqual(sorted(FakeAnalyzer.analyzed), sorted(insight_text(item) for item in TRENDS["trends"]))
+        self.assertEqual(daily_update.pending_insights(), [])
+
+        # Terceiro dia: nada pendente, nada reanalisado
+        report = self.run_day(datetime(2026, 1, 3))
+        self.assertEqual(report["sentiment_new_insights"]["status"], "ran")
+        self.assertEqual(len(FakeAnalyzer.analyzed), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
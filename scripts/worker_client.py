@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente leve do worker persistente do ComunicaPro (ver `llm_worker.py`).
+
+Usa apenas a biblioteca padrão para que a chamada a partir de cron ou
+scripts shell não pague a importação do SDK OpenAI. O protocolo é uma
+linha JSON por requisição e uma linha JSON por resposta sobre um socket
+Unix.
+
+Exemplos:
+    python3 scripts/worker_client.py analyze "Adorei o produto!"
+    python3 scripts/worker_client.py papp '{"visual": 60, "auditivo": 20, "cinestesico": 20, "objetivo": "React"}'
+    python3 scripts/worker_client.py bench
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_SOCKET_PATH = os.environ.get("COMUNICAPRO_WORKER_SOCKET", "/tmp/comunicapro-worker.sock")
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class WorkerError(Exception):
+    """Erro retornado pelo worker ao processar uma requisição."""
+
+
+def call(op: str, args: Optional[Dict] = None, socket_path: str = DEFAULT_SOCKET_PATH,
+         timeout: float = 300.0) -> Any:
+    """
+    Envia uma requisição ao worker e retorna o resultado.
+
+    Args:
+        op: Operação (ping, analyze, batch_analyze, papp, report, stats, shutdown)
+        args: Argumentos da operação
+        socket_path: Caminho do socket Unix do worker
+        timeout: Tempo máximo de espera em segundos
+
+    Returns:
+        O campo "result" da resposta do worker
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps({"op": op, "args": args or {}}, ensure_ascii=False).encode("utf-8") + b"\n")
+        with sock.makefile("r", encoding="utf-8") as reader:
+            response = json.loads(reader.readline())
+    if not response.get("ok"):
+        raise WorkerError(response.get("error", "erro desconhecido"))
+    return response.get("result")
+
+
+def benchmark(runs: int = 5, socket_path: str = DEFAULT_SOCKET_PATH) -> Dict:
+    """
+    Compara o custo de inicialização a frio com o caminho via worker.
+
+    - cold: novo interpretador que importa os módulos e cria os clientes
+    - daemon_cli: novo interpretador leve que chama o worker (ping)
+    - daemon_call: ida e volta ao worker a partir de um processo já aberto
+    """
+    cold_code = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "import generate_papp\n"
+        "from sentiment_analysis import SentimentAnalyzer\n"
+        "SentimentAnalyzer()\n" % SCRIPTS_DIR
+    )
+
+    def measure(func) -> Dict:
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return {"median_ms": round(statistics.median(samples), 2), "min_ms": round(min(samples), 2)}
+
+    results = {
+        "cold": measure(lambda: subprocess.run([sys.executable, "-c", cold_code], check=True,
+                                               stdout=subprocess.DEVNULL)),
+        "daemon_cli": measure(lambda: subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--socket", socket_path, "ping"],
+            check=True, stdout=subprocess.DEVNULL)),
+        "daemon_call": measure(lambda: call("ping", socket_path=socket_path)),
+    }
+    results["speedup_cli"] = round(results["cold"]["median_ms"] / results["daemon_cli"]["median_ms"], 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cliente do worker persistente do ComunicaPro")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Socket Unix do worker")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("ping", help="Verifica se o worker está ativo")
+    subparsers.add_parser("stats", help="Estatísticas do worker (cache, roteamento)")
+    subparsers.add_parser("shutdown", help="Encerra o worker")
+    analyze_parser = subparsers.add_parser("analyze", help="Analisa o sentimento de um texto")
+    analyze_parser.add_argument("text")
+    papp_parser = subparsers.add_parser("papp", help="Gera um PAPP a partir de um perfil JSON")
+    papp_parser.add_argument("profile", help="Perfil em JSON")
+    report_parser = subparsers.add_parser("report", help="Gera um relatório de mercado")
+    report_parser.add_argument("kind", choices=["market_summary", "market_analysis", "daily_summary"])
+    report_parser.add_argument("input", nargs="?", help="Arquivo JSON de entrada")
+    report_parser.add_argument("output", nargs="?", help="Arquivo Markdown de saída")
+    bench_parser = subparsers.add_parser("bench", help="Compara inicialização a frio x worker")
+    bench_parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        result = benchmark(args.runs, args.socket)
+    elif args.command == "analyze":
+        result = call("analyze", {"text": args.text}, args.socket)
+    elif args.command == "papp":
+        result = call("papp", {"profile": json.loads(args.profile)}, args.socket)
+    elif args.command == "report":
+        result = call("report", {"kind": args.kind, "input": args.input, "output": args.output}, args.socket)
+    else:
+        result = call(args.command, socket_path=args.socket)
+    print(json.dumps(result, indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (ConnectionError, FileNotFoundError) as e:
+        print(f"Worker indisponível: {e}", file=sys.stderr)
+        sys.exit(2)
+    except WorkerError as e:
+        print(f"Erro do worker: {e}", file=sys.stderr)
+        sys.exit(1)